@@ -26,9 +26,10 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
-import eth_ep
+import cosim
 import arp_ep
 import udp_ep
+import decode
 import gmii_ep
 
 module = 'fpga_core'
@@ -131,11 +132,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -209,14 +210,11 @@ def bench():
         gmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+test_frame.build_eth().build_axis_fcs().data)
 
         # wait for ARP request packet
-        while gmii_sink.empty():
-            yield clk.posedge
+        yield gmii_sink.wait()
 
         rx_frame = gmii_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = arp_ep.ARPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is arp_ep.ARPFrame
 
         print(check_frame)
 
@@ -250,14 +248,11 @@ def bench():
 
         gmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+arp_frame.build_eth().build_axis_fcs().data)
 
-        while gmii_sink.empty():
-            yield clk.posedge
+        yield gmii_sink.wait()
 
         rx_frame = gmii_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = udp_ep.UDPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is udp_ep.UDPFrame
 
         print(check_frame)
 
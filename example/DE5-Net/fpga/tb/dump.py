@@ -0,0 +1 @@
+../lib/eth/tb/dump.py
\ No newline at end of file
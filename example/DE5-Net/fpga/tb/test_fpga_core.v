@@ -98,10 +98,6 @@ initial begin
         sfp_d_txd,
         sfp_d_txc
     );
-
-    // dump file
-    $dumpfile("test_fpga_core.lxt");
-    $dumpvars(0, test_fpga_core);
 end
 
 fpga_core
@@ -26,10 +26,12 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
-import eth_ep
+import cosim
 import arp_ep
 import udp_ep
+import decode
 import xgmii_ep
+import throughput
 
 module = 'fpga_core'
 testbench = 'test_%s' % module
@@ -347,11 +349,11 @@ def bench():
     eth_l11_sink_logic = eth_l11_sink.create_logic(clk, rst, rxd=eth_l11_txd, rxc=eth_l11_txc, name='eth_l11_sink')
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -528,10 +530,8 @@ def bench():
             yield clk.posedge
 
         rx_frame = eth_l0_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = arp_ep.ARPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is arp_ep.ARPFrame
 
         print(check_frame)
 
@@ -569,10 +569,8 @@ def bench():
             yield clk.posedge
 
         rx_frame = eth_l0_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = udp_ep.UDPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is udp_ep.UDPFrame
 
         print(check_frame)
 
@@ -599,6 +597,13 @@ def bench():
 
         yield delay(100)
 
+        if throughput.enabled():
+            # UDP echo once the ARP entry is cached
+            test_frame.payload = bytearray(range(256))
+            test_frame.build()
+
+            yield throughput.stage(lambda k: eth_l0_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+test_frame.build_eth().build_axis_fcs().data), [eth_l0_sink])
+
         raise StopSimulation
 
     return (dut, clkgen, check, eth_r0_source_logic, eth_r0_sink_logic, eth_r1_source_logic, eth_r1_sink_logic, eth_r2_source_logic, eth_r2_sink_logic,
@@ -284,10 +284,6 @@ initial begin
         eth_l11_txd,
         eth_l11_txc
     );
-
-    // dump file
-    $dumpfile("test_fpga_core.lxt");
-    $dumpvars(0, test_fpga_core);
 end
 
 fpga_core
@@ -0,0 +1 @@
+../lib/eth/tb/throughput.py
\ No newline at end of file
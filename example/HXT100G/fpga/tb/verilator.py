@@ -0,0 +1 @@
+../lib/eth/tb/verilator.py
\ No newline at end of file
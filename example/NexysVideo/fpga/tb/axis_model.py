@@ -0,0 +1 @@
+../lib/eth/tb/axis_model.py
\ No newline at end of file
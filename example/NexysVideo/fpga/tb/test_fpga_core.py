@@ -26,9 +26,10 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
-import eth_ep
+import cosim
 import arp_ep
 import udp_ep
+import decode
 import rgmii_ep
 
 module = 'fpga_core'
@@ -130,11 +131,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         clk90=clk90,
         rst=rst,
@@ -216,14 +217,11 @@ def bench():
         rgmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+test_frame.build_eth().build_axis_fcs().data)
 
         # wait for ARP request packet
-        while rgmii_sink.empty():
-            yield clk.posedge
+        yield rgmii_sink.wait()
 
         rx_frame = rgmii_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = arp_ep.ARPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is arp_ep.ARPFrame
 
         print(check_frame)
 
@@ -257,14 +255,11 @@ def bench():
 
         rgmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+arp_frame.build_eth().build_axis_fcs().data)
 
-        while rgmii_sink.empty():
-            yield clk.posedge
+        yield rgmii_sink.wait()
 
         rx_frame = rgmii_sink.recv()
-        check_eth_frame = eth_ep.EthFrame()
-        check_eth_frame.parse_axis_fcs(rx_frame.data[8:])
-        check_frame = udp_ep.UDPFrame()
-        check_frame.parse_eth(check_eth_frame)
+        check_frame = decode.decode(rx_frame, fcs=True, preamble=True)
+        assert type(check_frame) is udp_ep.UDPFrame
 
         print(check_frame)
 
@@ -89,10 +89,6 @@ initial begin
         phy_reset_n,
         uart_txd
     );
-
-    // dump file
-    $dumpfile("test_fpga_core.lxt");
-    $dumpvars(0, test_fpga_core);
 end
 
 fpga_core #(
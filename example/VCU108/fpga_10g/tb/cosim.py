@@ -0,0 +1 @@
+../lib/eth/tb/cosim.py
\ No newline at end of file
@@ -0,0 +1 @@
+../lib/eth/tb/decode.py
\ No newline at end of file
@@ -0,0 +1 @@
+../lib/eth/tb/build_cache.py
\ No newline at end of file
@@ -0,0 +1 @@
+../lib/eth/tb/checksum.py
\ No newline at end of file
@@ -0,0 +1 @@
+../lib/eth/tb/eth_model.py
\ No newline at end of file
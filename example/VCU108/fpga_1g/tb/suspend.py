@@ -0,0 +1 @@
+../lib/eth/tb/suspend.py
\ No newline at end of file
@@ -93,10 +93,6 @@ initial begin
         uart_txd,
         uart_rts
     );
-
-    // dump file
-    $dumpfile("test_fpga_core.lxt");
-    $dumpvars(0, test_fpga_core);
 end
 
 fpga_core
@@ -23,9 +23,19 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
+from collections import deque
+import types
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 skip_asserts = False
 
+STATS_KEYS = ('cycles', 'beats', 'idle', 'tready_stall', 'tvalid_stall', 'bytes', 'frames')
+
 class AXIStreamFrame(object):
     def __init__(self, data=b'', keep=None, dest=None, user=None):
         self.B = 0
@@ -36,16 +46,25 @@ class AXIStreamFrame(object):
         self.keep = None
         self.dest = 0
         self.user = None
+        self.first_beat_time = None
+        self.last_beat_time = None
 
         if type(data) is bytes or type(data) is bytearray:
             self.data = bytearray(data)
             self.keep = keep
             self.dest = dest
             self.user = user
+        elif type(data) is memoryview:
+            # kept as a view without copying, e.g. a payload decoded in place
+            # by decode.py; copying the frame copies the view into a bytearray
+            self.data = data
+            self.keep = keep
+            self.dest = dest
+            self.user = user
         elif type(data) is AXIStreamFrame:
             self.N = data.N
             self.WL = data.WL
-            if type(data.data) is bytearray:
+            if type(data.data) is bytearray or type(data.data) is memoryview:
                 self.data = bytearray(data.data)
             else:
                 self.data = list(data.data)
@@ -61,6 +80,8 @@ class AXIStreamFrame(object):
                     self.user = data.user
                 else:
                     self.user = list(data.user)
+            self.first_beat_time = data.first_beat_time
+            self.last_beat_time = data.last_beat_time
         else:
             self.data = list(data)
             self.keep = keep
@@ -71,7 +92,7 @@ class AXIStreamFrame(object):
         if self.data is None:
             return
 
-        f = list(self.data)
+        f = self.data
         tdata = []
         tkeep = []
         tdest = []
@@ -89,32 +110,54 @@ class AXIStreamFrame(object):
             self.user = None
 
         if self.B == 0:
-            while len(f) > 0:
-                data = 0
-                keep = 0
-                for j in range(self.M):
-                    data = data | (f.pop(0) << (j*self.WL))
-                    keep = keep | (1 << j)
-                    if len(f) == 0: break
-                tdata.append(data)
-                if self.keep is None:
-                    tkeep.append(keep)
-                else:
-                    tkeep.append(self.keep[i])
-                if self.dest is None:
-                    tdest.append(dest)
-                else:
-                    tdest.append(self.dest[i])
-                if self.user is None:
-                    tuser.append(0)
-                else:
-                    tuser.append(self.user[i])
-                i += 1
+            if self.WL == 8:
+                # pack M byte lanes per beat with one int.from_bytes per beat
+                if type(f) is list:
+                    f = bytearray(f)
+                for k in range(0, len(f), self.M):
+                    chunk = f[k:k+self.M]
+                    tdata.append(int.from_bytes(chunk, 'little'))
+                    if self.keep is None:
+                        tkeep.append((1 << len(chunk)) - 1)
+                    else:
+                        tkeep.append(self.keep[i])
+                    if self.dest is None:
+                        tdest.append(dest)
+                    else:
+                        tdest.append(self.dest[i])
+                    if self.user is None:
+                        tuser.append(0)
+                    else:
+                        tuser.append(self.user[i])
+                    i += 1
+            else:
+                k = 0
+                while k < len(f):
+                    data = 0
+                    keep = 0
+                    for j in range(self.M):
+                        data = data | (f[k] << (j*self.WL))
+                        keep = keep | (1 << j)
+                        k += 1
+                        if k == len(f): break
+                    tdata.append(data)
+                    if self.keep is None:
+                        tkeep.append(keep)
+                    else:
+                        tkeep.append(self.keep[i])
+                    if self.dest is None:
+                        tdest.append(dest)
+                    else:
+                        tdest.append(self.dest[i])
+                    if self.user is None:
+                        tuser.append(0)
+                    else:
+                        tuser.append(self.user[i])
+                    i += 1
         else:
             # multiple tdata signals
-            while len(f) > 0:
-                data = 0
-                tdata.append(f.pop(0))
+            for k in range(len(f)):
+                tdata.append(f[k])
                 tkeep.append(0)
                 if self.dest is None:
                     tdest.append(dest)
@@ -142,48 +185,211 @@ class AXIStreamFrame(object):
             raise Exception("Invalid data")
 
         self.data = []
-        self.keep = []
-        self.dest = []
-        self.user = []
+        self.keep = list(tkeep)
+        self.dest = list(tdest)
+        self.user = list(tuser)
 
         if self.B == 0:
-            mask = 2**self.WL-1
-
-            for i in range(len(tdata)):
-                for j in range(self.M):
-                    if tkeep[i] & (1 << j):
-                        self.data.append((tdata[i] >> (j*self.WL)) & mask)
-                self.keep.append(tkeep[i])
-                self.dest.append(tdest[i])
-                self.user.append(tuser[i])
+            if self.WL == 8:
+                # unpack whole beats with int.to_bytes; only beats with
+                # partial tkeep need per-lane handling
+                M = self.M
+                full = (1 << M) - 1
+                data = bytearray()
+
+                for i in range(len(tdata)):
+                    k = tkeep[i]
+                    if k == full:
+                        data.extend(tdata[i].to_bytes(M, 'little'))
+                    elif k & (k+1) == 0:
+                        # contiguous from lane 0
+                        data.extend(tdata[i].to_bytes(M, 'little')[:k.bit_length()])
+                    else:
+                        for j in range(M):
+                            if k & (1 << j):
+                                data.append((tdata[i] >> (j*8)) & 0xff)
+
+                self.data = data
+            else:
+                mask = 2**self.WL-1
+
+                for i in range(len(tdata)):
+                    for j in range(self.M):
+                        if tkeep[i] & (1 << j):
+                            self.data.append((tdata[i] >> (j*self.WL)) & mask)
         else:
-            for i in range(len(tdata)):
-                self.data.append(tdata[i])
-                self.keep.append(tkeep[i])
-                self.dest.append(tdest[i])
-                self.user.append(tuser[i])
+            self.data = list(tdata)
 
-        if self.WL == 8:
-            self.data = bytearray(self.data)
+    def parse_numpy(self, tdata, tkeep, tdest, tuser):
+        # batch unpack of captured beat arrays, 8 bit lanes only
+        if numpy is None:
+            raise Exception("NumPy not available")
+        if len(tdata) != len(tkeep) or len(tdata) != len(tdest) or len(tdata) != len(tuser):
+            raise Exception("Invalid data")
+        assert self.B == 0 and self.WL == 8
+
+        M = self.M
+
+        if M <= 8:
+            lanes = numpy.asarray(tdata, dtype='<u8').view(numpy.uint8).reshape(-1, 8)[:, :M]
+        else:
+            lanes = numpy.frombuffer(b''.join(int(d).to_bytes(M, 'little') for d in tdata), dtype=numpy.uint8).reshape(-1, M)
+
+        if M <= 64:
+            keep = numpy.asarray(tkeep, dtype=numpy.uint64)
+            valid = ((keep[:, None] >> numpy.arange(M, dtype=numpy.uint64)) & 1).astype(bool)
+        else:
+            valid = numpy.array([[(int(k) >> j) & 1 for j in range(M)] for k in tkeep], dtype=bool)
+
+        self.data = bytearray(lanes[valid].tobytes())
+        self.keep = [int(k) for k in tkeep]
+        self.dest = [int(d) for d in tdest]
+        self.user = [int(u) for u in tuser]
 
     def __eq__(self, other):
         if type(other) is AXIStreamFrame:
-            return self.data == other.data
+            a = self.data
+            b = other.data
+            # memoryviews compare item by item, compare them as bytes
+            if type(a) is memoryview:
+                a = a.tobytes()
+            if type(b) is memoryview:
+                b = b.tobytes()
+            return a == b
 
     def __repr__(self):
-        return 'AXIStreamFrame(data=%s, keep=%s, dest=%s, user=%s)' % (repr(self.data), repr(self.keep), repr(self.dest), repr(self.user))
+        data = self.data
+        if type(data) is memoryview:
+            data = bytearray(data)
+        return 'AXIStreamFrame(data=%s, keep=%s, dest=%s, user=%s)' % (repr(data), repr(self.keep), repr(self.dest), repr(self.user))
 
     def __iter__(self):
         return self.data.__iter__()
 
 
-class AXIStreamSource(object):
+def stats_logic(ep, clk, rst, tdata, tkeep, tvalid, tready, tlast):
+    # sample the bus at each clock edge for ep.get_stats()
+    if type(tdata) is list or type(tdata) is tuple:
+        lane_bytes = 1
+    else:
+        lane_bytes = max(1, int(len(tdata)/len(tkeep)/8))
+
+    @instance
+    def logic():
+        while True:
+            yield clk.posedge
+
+            if rst:
+                continue
+
+            if tvalid and tready:
+                inc = (1, 1, 0, 0, 0, bin(int(tkeep)).count('1')*lane_bytes, int(bool(tlast)))
+            elif tvalid:
+                inc = (1, 0, 0, 1, 0, 0, 0)
+            elif tready:
+                inc = (1, 0, 0, 0, 1, 0, 0)
+            else:
+                inc = (1, 0, 1, 0, 0, 0, 0)
+
+            ep.stats_count = [a+b for a, b in zip(ep.stats_count, inc)]
+            ep.stats_edge = (now(), inc)
+
+    return logic
+
+
+class StatsMixin(object):
+    # get_stats() and reset_stats() over the counts kept by stats_logic()
+
+    def get_stats(self):
+        # counts cover the clock edges from the last reset_stats() up to,
+        # but not including, the current one
+        count = self.stats_count
+        if self.stats_edge is not None and self.stats_edge[0] == now():
+            count = [a-b for a, b in zip(count, self.stats_edge[1])]
+        stats = dict(zip(STATS_KEYS, count))
+        stats['bytes_per_cycle'] = float(stats['bytes'])/stats['cycles'] if stats['cycles'] else 0.0
+        return stats
+
+    def reset_stats(self):
+        self.stats_count = [0]*len(STATS_KEYS)
+        if self.stats_edge is not None and self.stats_edge[0] == now():
+            self.stats_count = list(self.stats_edge[1])
+
+
+class PayloadStatsMixin(object):
+    # for endpoints with a header and an AXI stream payload, the bus stats
+    # are those of the payload endpoint
+
+    def get_stats(self):
+        return self.payload_ep().get_stats()
+
+    def reset_stats(self):
+        self.payload_ep().reset_stats()
+
+    def payload_ep(self):
+        if hasattr(self, 'payload_sink'):
+            return self.payload_sink
+        return self.payload_source
+
+
+class SinkMixin(object):
+    # stream() and wait() for the sink endpoints, which queue frames in
+    # self.queue, toggle self.sync for each frame and set self.clk in
+    # create_logic()
+
+    def stream(self, consumer, history=0):
+        # hand each completed frame to consumer instead of queueing it;
+        # consumer is a callable or a generator that takes frames via send().
+        # history keeps only the last N frames in self.history for debugging
+        if isinstance(consumer, types.GeneratorType):
+            next(consumer)
+            consumer = consumer.send
+        self.consumer = consumer
+        self.history = deque(maxlen=history)
+
+    def wait(self, count=1, timeout=0):
+        # use as 'yield sink.wait()'; returns once count frames are queued.
+        # with a timeout, raises if they are not all queued within timeout
+        # clock cycles
+        if self.consumer is not None:
+            raise Exception("wait() counts queued frames and cannot be used after stream()")
+        if not timeout:
+            while self.count() < count:
+                yield self.sync
+            return
+        n = 0
+        while self.count() < count:
+            if n >= timeout:
+                raise Exception("Timed out after %d cycles waiting for %d frames, received %d" % (timeout, count, self.count()))
+            if n < 2:
+                # time the first two edges to get the clock period
+                yield self.clk.posedge
+                if n == 0:
+                    start = now()
+                n += 1
+                if n == 2:
+                    deadline = start + (timeout-1)*(now()-start)
+            else:
+                # then only wake for a frame or on the last edge
+                yield self.sync, delay(deadline-now())
+                if now() >= deadline:
+                    n = timeout
+            # let the sink finish a frame completed on this edge
+            yield delay(0)
+
+
+class AXIStreamSource(StatsMixin):
     def __init__(self):
         self.has_logic = False
-        self.queue = []
+        self.queue = deque()
+        self.wake = Signal(bool(0))
+        self.sent_hooks = []
+        self.stats_count = [0]*len(STATS_KEYS)
+        self.stats_edge = None
 
     def send(self, frame):
         self.queue.append(AXIStreamFrame(frame))
+        self.wake.next = not self.wake
 
     def write(self, data):
         self.send(data)
@@ -205,12 +411,14 @@ class AXIStreamSource(object):
                 tdest=Signal(intbv(0)),
                 tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         tready_int = Signal(bool(False))
         tvalid_int = Signal(bool(False))
@@ -227,6 +435,9 @@ class AXIStreamSource(object):
             keep = []
             dest = []
             user = []
+            ptr = 0
+            active = False
+            idle = False
             B = 0
             N = len(tdata)
             M = len(tkeep)
@@ -240,7 +451,11 @@ class AXIStreamSource(object):
                 WL = [1]*B
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     if B > 0:
@@ -253,26 +468,35 @@ class AXIStreamSource(object):
                     tuser.next = False
                     tvalid_int.next = False
                     tlast.next = False
+                    active = False
                 else:
                     if tready_int and tvalid:
-                        if len(data) > 0:
+                        if ptr == 1:
+                            frame.first_beat_time = now()
+                        if tlast:
+                            frame.last_beat_time = now()
+                            for hook in self.sent_hooks:
+                                hook(frame)
+                        if ptr < len(data):
                             if B > 0:
-                                l = data.pop(0)
+                                l = data[ptr]
                                 for i in range(B):
                                     tdata[i].next = l[i]
                             else:
-                                tdata.next = data.pop(0)
-                            tkeep.next = keep.pop(0)
-                            tdest.next = dest.pop(0)
-                            tuser.next = user.pop(0)
+                                tdata.next = data[ptr]
+                            tkeep.next = keep[ptr]
+                            tdest.next = dest[ptr]
+                            tuser.next = user[ptr]
+                            ptr += 1
                             tvalid_int.next = True
-                            tlast.next = len(data) == 0
+                            tlast.next = ptr == len(data)
                         else:
                             tvalid_int.next = False
                             tlast.next = False
+                            active = False
                     if (tlast and tready_int and tvalid) or not tvalid_int:
                         if len(self.queue) > 0:
-                            frame = self.queue.pop(0)
+                            frame = self.queue.popleft()
                             frame.B = B
                             frame.N = N
                             frame.M = M
@@ -281,34 +505,48 @@ class AXIStreamSource(object):
                             if name is not None:
                                 print("[%s] Sending frame %s" % (name, repr(frame)))
                             if B > 0:
-                                l = data.pop(0)
+                                l = data[0]
                                 for i in range(B):
                                     tdata[i].next = l[i]
                             else:
-                                tdata.next = data.pop(0)
-                            tkeep.next = keep.pop(0)
-                            tdest.next = dest.pop(0)
-                            tuser.next = user.pop(0)
+                                tdata.next = data[0]
+                            tkeep.next = keep[0]
+                            tdest.next = dest[0]
+                            tuser.next = user[0]
+                            ptr = 1
                             tvalid_int.next = True
-                            tlast.next = len(data) == 0
+                            tlast.next = ptr == len(data)
+                            active = True
 
-        return logic, pause_logic
+                idle = (suspend.enabled and not rst and
+                        not active and len(self.queue) == 0)
 
+        if stats:
+            return logic, pause_logic, stats_logic(self, clk, rst, tdata, tkeep, tvalid, tready, tlast), edge.logic()
 
-class AXIStreamSink(object):
+        return logic, pause_logic, edge.logic()
+
+
+class AXIStreamSink(SinkMixin, StatsMixin):
     def __init__(self):
         self.has_logic = False
-        self.queue = []
+        self.queue = deque()
         self.read_queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
+        self.recv_hooks = []
+        self.stats_count = [0]*len(STATS_KEYS)
+        self.stats_edge = None
 
     def recv(self):
         if len(self.queue) > 0:
-            return self.queue.pop(0)
+            return self.queue.popleft()
         return None
 
     def read(self, count=-1):
         while len(self.queue) > 0:
-            self.read_queue.extend(self.queue.pop(0).data)
+            self.read_queue.extend(self.queue.popleft().data)
         if count < 0:
             count = len(self.read_queue)
         data = self.read_queue[:count]
@@ -332,12 +570,14 @@ class AXIStreamSink(object):
                 tdest=Signal(intbv(0)),
                 tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         tready_int = Signal(bool(False))
         tvalid_int = Signal(bool(False))
@@ -359,6 +599,7 @@ class AXIStreamSink(object):
             M = len(tkeep)
             WL = int((len(tdata)+M-1)/M)
             first = True
+            idle = False
 
             if type(tdata) is list or type(tdata) is tuple:
                 # multiple tdata signals
@@ -368,7 +609,11 @@ class AXIStreamSink(object):
                 WL = [1]*B
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # ready and nothing on the bus; wait for tvalid or reset
+                    yield suspend.wait(clk, rst, tvalid_int.posedge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     tready_int.next = False
@@ -412,14 +657,24 @@ class AXIStreamSink(object):
                         keep.append(int(tkeep))
                         dest.append(int(tdest))
                         user.append(int(tuser))
+                        if first:
+                            frame.first_beat_time = now()
                         first = False
                         if tlast:
+                            frame.last_beat_time = now()
                             frame.B = B
                             frame.N = N
                             frame.M = M
                             frame.WL = WL
                             frame.parse(data, keep, dest, user)
-                            self.queue.append(frame)
+                            for hook in self.recv_hooks:
+                                hook(frame)
+                            if self.consumer is None:
+                                self.queue.append(frame)
+                            else:
+                                self.consumer(frame)
+                                self.history.append(frame)
+                            self.sync.next = not self.sync
                             if name is not None:
                                 print("[%s] Got frame %s" % (name, repr(frame)))
                             frame = AXIStreamFrame()
@@ -429,5 +684,10 @@ class AXIStreamSink(object):
                             user = []
                             first = True
 
+                idle = suspend.enabled and not rst and tready_int and not tvalid_int
+
+        if stats:
+            return logic, pause_logic, stats_logic(self, clk, rst, tdata, tkeep, tvalid, tready, tlast)
+
         return logic, pause_logic
 
@@ -0,0 +1,140 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+from myhdl import *
+import fnmatch
+
+import axis_ep
+
+# Transaction level models that stand in for the DUT when running with
+# SIM=model.  A model is built from the existing endpoints: a sink takes the
+# frames off the DUT inputs, process() turns them into output frames and a
+# source drives those onto the DUT outputs, so the bench and check() run
+# unchanged.  Models cover the data path only; error outputs are pulsed
+# through error(), and status outputs that a model does not drive stay at
+# zero.
+
+# (testbench name pattern, model class)
+models = []
+
+def register(pattern, cls):
+    models.append((pattern, cls))
+
+def ports(signals, prefix):
+    # the signals whose names start with prefix, with the prefix removed
+    return dict((k[len(prefix):], s) for k, s in signals.items() if k.startswith(prefix))
+
+def last_user(frame):
+    # tuser on the last beat of an AXIStreamFrame
+    if type(frame.user) is list:
+        return bool(frame.user) and bool(frame.user[-1])
+    return bool(frame.user)
+
+def find_model(testbench):
+    for pattern, cls in models:
+        if fnmatch.fnmatch(testbench, pattern):
+            return cls
+    return None
+
+def create_logic(testbench, **signals):
+    cls = find_model(testbench)
+    if cls is None:
+        raise Exception("No model for %s" % testbench)
+    return cls(testbench).create_logic(**signals)
+
+class FrameModel(object):
+    # passes each frame from the sink through process() to the source
+    sink_class = axis_ep.AXIStreamSink
+    source_class = axis_ep.AXIStreamSource
+    in_prefix = 'input_axis_'
+    out_prefix = 'output_axis_'
+    in_clk = 'clk'
+    in_rst = 'rst'
+    out_clk = 'clk'
+    out_rst = 'rst'
+
+    def __init__(self, testbench):
+        self.testbench = testbench
+        self.sink = self.sink_class()
+        self.source = self.source_class()
+        self.errors = []
+        self.error_wake = Signal(bool(0))
+
+    def process(self, frame):
+        # return the output frame, or None to drop the frame
+        return frame
+
+    def error(self, name):
+        # pulse an error output for one cycle
+        self.errors.append(name)
+        self.error_wake.next = not self.error_wake
+
+    def receive(self, frame):
+        frame = self.process(frame)
+        if frame is not None:
+            self.source.send(frame)
+
+    def create_logic(self, **signals):
+        self.signals = signals
+        self.sink.stream(self.receive)
+
+        kw = ports(signals, self.in_prefix)
+        sink_logic = self.sink.create_logic(signals[self.in_clk], signals[self.in_rst], **kw)
+
+        kw = ports(signals, self.out_prefix)
+        source_logic = self.source.create_logic(signals[self.out_clk], signals[self.out_rst], **kw)
+
+        return sink_logic, source_logic, self.error_logic()
+
+    def error_logic(self):
+        clk = self.signals[self.out_clk]
+
+        @instance
+        def logic():
+            while True:
+                yield self.error_wake
+                yield clk.posedge
+                pulsed = [self.signals[n] for n in self.errors]
+                del self.errors[:]
+                for s in pulsed:
+                    s.next = 1
+                yield clk.posedge
+                for s in pulsed:
+                    s.next = 0
+
+        return logic
+
+class AsyncFrameModel(FrameModel):
+    in_clk = 'input_clk'
+    in_rst = 'async_rst'
+    out_clk = 'output_clk'
+    out_rst = 'async_rst'
+
+for m in ('fifo', 'register', 'srl_fifo', 'srl_register'):
+    register('test_axis_%s' % m, FrameModel)
+    register('test_axis_%s_64' % m, FrameModel)
+
+register('test_axis_async_fifo', AsyncFrameModel)
+register('test_axis_async_fifo_64', AsyncFrameModel)
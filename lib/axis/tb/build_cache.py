@@ -0,0 +1,129 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import hashlib
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# compiled .vvp files are kept here, keyed on a hash of the sources,
+# options and compiler version; set IVERILOG_CACHE_DIR to '' to disable
+cache_dir = os.environ.get('IVERILOG_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'iverilog'))
+
+# iverilog options that take a value
+value_opts = 'BcDfgIMmNopPsTWy'
+
+version = None
+
+def iverilog_version():
+    global version
+    if version is None:
+        try:
+            p = subprocess.Popen(['iverilog', '-V'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            version = p.communicate()[0].splitlines()[0]
+        except (OSError, IndexError):
+            version = b''
+    return version
+
+def hash_file(h, name):
+    if os.path.isfile(name):
+        with open(name, 'rb') as f:
+            h.update(f.read())
+    h.update(b'\0')
+
+def hash_dir(h, name):
+    # include and library directories
+    if os.path.isdir(name):
+        for f in sorted(os.listdir(name)):
+            if f.endswith(('.v', '.vh', '.sv', '.svh')):
+                h.update(f.encode() + b'\0')
+                hash_file(h, os.path.join(name, f))
+
+def build(cmd):
+    # run an iverilog build command, copying the output from the cache when
+    # nothing that affects it has changed.  Returns the exit status, like
+    # os.system(cmd).
+    args = shlex.split(cmd)
+
+    if not cache_dir or not args or os.path.basename(args[0]) != 'iverilog' or not iverilog_version():
+        return os.system(cmd)
+
+    h = hashlib.sha256(iverilog_version() + b'\0')
+    output = 'a.out'
+
+    i = 1
+    while i < len(args):
+        a = args[i]
+        if len(a) > 1 and a[0] == '-' and a[1] in value_opts:
+            v = a[2:]
+            if not v and i+1 < len(args):
+                i += 1
+                v = args[i]
+            if a[1] == 'o':
+                output = v
+            else:
+                h.update(('-%s %s\0' % (a[1], v)).encode())
+                if a[1] in 'cf':
+                    hash_file(h, v)
+                elif a[1] in 'Iy':
+                    hash_dir(h, v)
+        else:
+            h.update(a.encode() + b'\0')
+            if a[0] != '-':
+                hash_file(h, a)
+        i += 1
+
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+
+    path = os.path.join(cache_dir, h.hexdigest() + '.vvp')
+
+    # hold the lock while checking, building and copying so that parallel
+    # runs never see a partially written file
+    with open(path + '.lock', 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        if os.path.isfile(path):
+            shutil.copyfile(path, output)
+            return 0
+
+        ret = os.system(cmd)
+        if ret:
+            return ret
+
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(output, tmp)
+        os.replace(tmp, path)
+
+    return 0
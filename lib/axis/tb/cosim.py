@@ -0,0 +1,78 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import myhdl
+import os
+import unittest
+
+import build_cache
+import dump
+
+# Simulator for the DUT, set with the SIM environment variable:
+#
+#   SIM=icarus      Icarus Verilog and vvp through myhdl.vpi (default)
+#   SIM=verilator   Verilator model loaded into the Python process
+#   SIM=model       Python transaction level model instead of the RTL, for
+#                   developing stimulus and checks (see axis_model.py)
+#
+# Testbenches build and connect the DUT through build() and Cosimulation()
+# so that check() and the endpoints run unchanged on any of them.
+
+sim = os.environ.get('SIM', 'icarus')
+
+if sim not in ('icarus', 'verilator', 'model'):
+    raise Exception("Unknown simulator %s" % sim)
+
+def models():
+    import axis_model
+    try:
+        # registers the Ethernet models, where available
+        import eth_model
+    except ImportError:
+        pass
+    return axis_model
+
+def build(testbench, srcs, build_cmd):
+    # returns the exit status of the build, like os.system().  With
+    # SIM=model, testbenches without a model are skipped (unittest.SkipTest,
+    # which pytest and run_tests.py report as skipped)
+    if sim == 'model':
+        if models().find_model(testbench) is None:
+            raise unittest.SkipTest("No model for %s" % testbench)
+        return 0
+    if sim == 'verilator':
+        import verilator
+        return verilator.build(testbench, srcs)
+    return build_cache.build(build_cmd + dump.build_args(testbench))
+
+def Cosimulation(testbench, **signals):
+    if sim == 'model':
+        return models().create_logic(testbench, **signals)
+    if sim == 'verilator':
+        import verilator
+        if dump.settings['enable']:
+            raise Exception("Waveform dumps are not supported with SIM=verilator")
+        return verilator.VerilatorCosimulation(testbench, **signals).create_logic()
+    return myhdl.Cosimulation("vvp -m myhdl %s.vvp %s" % (testbench, dump.vvp_args(testbench)), **signals)
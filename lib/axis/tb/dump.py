@@ -0,0 +1,66 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import os
+import shlex
+
+# Waveform dumps are off unless enabled through the environment:
+#
+#   DUMP=1          dump the whole testbench
+#   DUMP_SCOPE=a,b  dump only these scopes, relative to the testbench
+#                   module, e.g. UUT or UUT.fifo_inst
+#   DUMP_DEPTH=n    dump n levels below each scope (0 for all levels)
+#   DUMP_TEST=n     dump only while current_test is n
+#   DUMP_START=t    start dumping at simulation time t
+#   DUMP_STOP=t     stop dumping at simulation time t
+#
+# Setting any of the DUMP_* variables implies DUMP=1.  Times are in MyHDL
+# time steps.  A test can also change the entries of settings before
+# calling bench().
+
+settings = dict((k, os.environ.get('DUMP_'+k.upper()) or None) for k in ('scope', 'depth', 'test', 'start', 'stop'))
+settings['enable'] = os.environ.get('DUMP', '0') not in ('', '0') or any(settings.values())
+
+ctrl_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'dump_ctrl.v')
+
+def build_args(testbench):
+    # extra iverilog arguments for testbench.  The dump control module is
+    # always built in so that dumps can be switched on at run time, only
+    # selecting scopes needs a rebuild.
+    args = ' -DDUMP_TOP=%s' % testbench
+    if settings['scope']:
+        scopes = ['%s.%s' % (testbench, s.strip()) for s in settings['scope'].split(',')]
+        args += ' -DDUMP_SCOPE=%s' % ','.join(scopes)
+    return args + ' ' + shlex.quote(ctrl_file)
+
+def vvp_args(testbench):
+    # extra vvp arguments for testbench
+    if not settings['enable']:
+        return ''
+    args = ['-lxt2', '+dump', '+dump_file=%s.lxt' % testbench]
+    for k in ('depth', 'test', 'start', 'stop'):
+        if settings[k] is not None:
+            args.append('+dump_%s=%d' % (k, int(settings[k])))
+    return ' '.join(args)
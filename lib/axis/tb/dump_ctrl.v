@@ -0,0 +1,107 @@
+/*
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+*/
+
+// Language: Verilog 2001
+
+
+`timescale 1ps / 1ps
+
+/*
+ * Waveform dump control for MyHDL testbenches
+ *
+ * Built in as a second top level module alongside the testbench named by
+ * DUMP_TOP.  Nothing is dumped unless vvp is run with +dump.  Other
+ * plusargs select the dump file, depth, and a window on current_test or
+ * simulation time (in MyHDL time steps).  DUMP_SCOPE may be defined as a
+ * comma separated list of hierarchical scopes to dump instead of the
+ * whole testbench.
+ */
+module dump_ctrl;
+
+`ifndef DUMP_SCOPE
+`define DUMP_SCOPE `DUMP_TOP
+`endif
+
+reg [8*256-1:0] file_name = "dump.lxt";
+integer depth = 0;
+integer test = -1;
+reg [63:0] start = 0;
+reg [63:0] stop = 0;
+
+reg enable = 0;
+reg in_window = 1;
+reg on = 1;
+
+initial begin
+    if ($test$plusargs("dump")) begin
+        enable = 1;
+        if ($value$plusargs("dump_file=%s", file_name)) begin end
+        if ($value$plusargs("dump_depth=%d", depth)) begin end
+        if ($value$plusargs("dump_test=%d", test)) begin end
+        if ($value$plusargs("dump_start=%d", start)) begin end
+        if ($value$plusargs("dump_stop=%d", stop)) begin end
+
+        $dumpfile(file_name);
+        $dumpvars(depth, `DUMP_SCOPE);
+
+        in_window = start == 0;
+        update;
+
+        if (start > 0) begin
+            #(start);
+            in_window = 1;
+            update;
+        end
+
+        if (stop > start) begin
+            #(stop-start);
+            in_window = 0;
+            update;
+        end
+    end
+end
+
+always @(`DUMP_TOP.current_test) begin
+    if (enable) begin
+        update;
+    end
+end
+
+task update;
+begin
+    if (in_window && (test < 0 || `DUMP_TOP.current_test == test)) begin
+        if (!on) begin
+            $dumpon;
+            on = 1;
+        end
+    end else begin
+        if (on) begin
+            $dumpoff;
+            on = 0;
+        end
+    end
+end
+endtask
+
+endmodule
@@ -0,0 +1,169 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import math
+from collections import deque
+
+def payload_key(frame):
+    # match frames on a hash of their payload contents, so that frames in
+    # flight are not kept alive by their keys
+    if type(frame.data) is bytearray or type(frame.data) is memoryview:
+        return hash(bytes(frame.data))
+    return hash(tuple(frame.data))
+
+class LatencyTracker(object):
+    def __init__(self, key=payload_key, period=1, edge='first', bins=1024):
+        # key(frame) gives the value used to pair sent and received frames,
+        # e.g. a sequence number carried in the payload.  Latencies are
+        # measured between first beats (edge='first') or last beats
+        # (edge='last') and reported in units of period.  They are counted
+        # in at most bins histogram bins, one period wide until the spread
+        # needs wider ones, so memory does not grow with the frame count.
+        assert edge in ('first', 'last')
+        self.key = key
+        self.period = period
+        self.attr = edge + '_beat_time'
+        self.max_bins = bins
+        self.reset()
+
+    def reset(self):
+        self.sent_times = {}
+        self.recv_times = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.width = 1
+        self.bins = {}
+
+    def add_source(self, source, key=None):
+        # key overrides the tracker's key for frames from this source, e.g.
+        # when a source sends a preamble that the sink does not see
+        source = getattr(source, 'payload_source', source)
+        key = key or self.key
+        source.sent_hooks.append(lambda frame: self.sent(frame, key))
+
+    def add_sink(self, sink, key=None):
+        sink = getattr(sink, 'payload_sink', sink)
+        key = key or self.key
+        sink.recv_hooks.append(lambda frame: self.received(frame, key))
+
+    def sent(self, frame, key=None):
+        # source and sink hooks can run in either order within a clock edge
+        self.match((key or self.key)(frame), getattr(frame, self.attr), None)
+
+    def received(self, frame, key=None):
+        self.match((key or self.key)(frame), None, getattr(frame, self.attr))
+
+    def match(self, k, t_sent, t_recv):
+        if t_sent is not None:
+            q = self.recv_times.get(k)
+            if not q:
+                self.sent_times.setdefault(k, deque()).append(t_sent)
+                return
+            t_recv = q.popleft()
+            if not q:
+                del self.recv_times[k]
+        else:
+            q = self.sent_times.get(k)
+            if not q:
+                self.recv_times.setdefault(k, deque()).append(t_recv)
+                return
+            t_sent = q.popleft()
+            if not q:
+                del self.sent_times[k]
+        self.add((t_recv - t_sent) / float(self.period))
+
+    def add(self, v):
+        self.count += 1
+        self.total += v
+        if self.min is None or v < self.min:
+            self.min = v
+        if self.max is None or v > self.max:
+            self.max = v
+        b = int(math.floor(v / self.width))
+        self.bins[b] = self.bins.get(b, 0) + 1
+        while len(self.bins) > self.max_bins:
+            # merge pairs of bins
+            self.width *= 2
+            bins = {}
+            for b, n in self.bins.items():
+                bins[b // 2] = bins.get(b // 2, 0) + n
+            self.bins = bins
+
+    def outstanding(self):
+        # frames sent but not yet received
+        return sum(len(q) for q in self.sent_times.values())
+
+    def unmatched(self):
+        # frames received that no source sent
+        return sum(len(q) for q in self.recv_times.values())
+
+    def percentile(self, p):
+        # nearest rank over the histogram, exact while the bins are one
+        # period wide and latencies are whole periods
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(p/100.0*self.count)))
+        for b in sorted(self.bins):
+            rank -= self.bins[b]
+            if rank <= 0:
+                return min(max(b*self.width, self.min), self.max)
+
+    def get_stats(self):
+        stats = {
+            'count': self.count,
+            'unmatched': self.unmatched(),
+            'outstanding': self.outstanding(),
+            'min': self.min,
+            'mean': None,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+        if self.count:
+            stats['mean'] = self.total / self.count
+        return stats
+
+    def histogram(self, bins=10):
+        # list of (low, high, count) with equal width bins from min to max
+        if not self.count:
+            return []
+        lo = self.min
+        hi = self.max
+        width = float(hi - lo) / bins or 1.0
+        counts = [0]*bins
+        for b, n in self.bins.items():
+            v = min(max(b*self.width, lo), hi)
+            counts[min(int((v - lo) / width), bins-1)] += n
+        return [(lo + i*width, lo + (i+1)*width, counts[i]) for i in range(bins)]
+
+    def report(self):
+        stats = self.get_stats()
+        lines = ["latency: %d frames, %d unmatched, %d outstanding" % (stats['count'], stats['unmatched'], stats['outstanding'])]
+        if stats['count']:
+            lines.append("min %g mean %g p50 %g p99 %g max %g" % (stats['min'], stats['mean'], stats['p50'], stats['p99'], stats['max']))
+            for lo, hi, n in self.histogram():
+                lines.append("%10g - %-10g %d" % (lo, hi, n))
+        return '\n'.join(lines)
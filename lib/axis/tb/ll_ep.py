@@ -23,14 +23,17 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
 
 class LocalLinkSource(object):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.wake = Signal(bool(0))
 
     def send(self, frame):
         self.queue.append(bytearray(frame))
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -52,6 +55,7 @@ class LocalLinkSource(object):
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         src_rdy_out_n_int = Signal(bool(True))
         dst_rdy_in_n_int = Signal(bool(True))
@@ -64,15 +68,22 @@ class LocalLinkSource(object):
         @instance
         def logic():
             frame = []
+            active = False
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     data_out.next = 0
                     src_rdy_out_n_int.next = True
                     sof_out_n.next = True
                     eof_out_n.next = True
+                    active = False
                 else:
                     if not dst_rdy_in_n_int and not src_rdy_out_n:
                         if len(frame) > 0:
@@ -83,6 +94,7 @@ class LocalLinkSource(object):
                         else:
                             src_rdy_out_n_int.next = True
                             eof_out_n.next = True
+                            active = False
                     if (not eof_out_n and not dst_rdy_in_n_int and not src_rdy_out_n) or src_rdy_out_n_int:
                         if len(self.queue) > 0:
                             frame = self.queue.pop(0)
@@ -92,8 +104,12 @@ class LocalLinkSource(object):
                             src_rdy_out_n_int.next = False
                             sof_out_n.next = False
                             eof_out_n.next = len(frame) != 0
+                            active = True
 
-        return logic, pause_logic
+                idle = (suspend.enabled and not rst and
+                        not active and len(self.queue) == 0)
+
+        return logic, pause_logic, edge.logic()
 
 
 class LocalLinkSink(object):
@@ -138,9 +154,14 @@ class LocalLinkSink(object):
         @instance
         def logic():
             frame = []
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # ready and nothing offered; wait for src_rdy or reset
+                    yield suspend.wait(clk, rst, src_rdy_in_n_int.negedge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     dst_rdy_out_n_int.next = True
@@ -158,5 +179,7 @@ class LocalLinkSink(object):
                                 print("[%s] Got frame %s" % (name, repr(frame)))
                             frame = []
 
+                idle = suspend.enabled and not rst and not dst_rdy_out_n_int and src_rdy_in_n_int
+
         return logic, pause_logic
 
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+from myhdl import *
+import time
+
+import axis_ep
+import suspend
+
+def bench_build(width, frame_len, frame_count):
+    M = int(width/8)
+
+    frames = []
+    for k in range(frame_count):
+        frame = axis_ep.AXIStreamFrame(bytearray(frame_len))
+        frame.M = M
+        frames.append(frame)
+
+    beats = 0
+    start = time.time()
+
+    for frame in frames:
+        tdata, tkeep, tdest, tuser = frame.build()
+        beats += len(tdata)
+
+    return beats, time.time() - start
+
+def bench_loopback(width, frame_len, frame_count):
+    M = int(width/8)
+
+    clk = Signal(bool(0))
+    rst = Signal(bool(0))
+
+    tdata = Signal(intbv(0)[width:])
+    tkeep = Signal(intbv(0)[M:])
+    tvalid = Signal(bool(0))
+    tready = Signal(bool(0))
+    tlast = Signal(bool(0))
+    tuser = Signal(bool(0))
+
+    source = axis_ep.AXIStreamSource()
+
+    source_logic = source.create_logic(
+        clk,
+        rst,
+        tdata=tdata,
+        tkeep=tkeep,
+        tvalid=tvalid,
+        tready=tready,
+        tlast=tlast,
+        tuser=tuser
+    )
+
+    sink = axis_ep.AXIStreamSink()
+
+    sink_logic = sink.create_logic(
+        clk,
+        rst,
+        tdata=tdata,
+        tkeep=tkeep,
+        tvalid=tvalid,
+        tready=tready,
+        tlast=tlast,
+        tuser=tuser
+    )
+
+    @always(delay(4))
+    def clkgen():
+        clk.next = not clk
+
+    @instance
+    def check():
+        yield clk.posedge
+        rst.next = 1
+        yield clk.posedge
+        rst.next = 0
+
+        for k in range(frame_count):
+            source.send(bytearray(frame_len))
+
+        while sink.count() < frame_count:
+            yield clk.posedge
+
+        raise StopSimulation
+
+    start = time.time()
+    sim = Simulation(clkgen, check, source_logic, sink_logic)
+    sim.run(quiet=1)
+
+    beats = frame_count * int((frame_len+M-1)/M)
+
+    return beats, time.time() - start
+
+def bench_idle(width, pairs, cycles, gap):
+    M = int(width/8)
+
+    clk = Signal(bool(0))
+    rst = Signal(bool(0))
+
+    sources = []
+    logic = []
+
+    for k in range(pairs):
+        tdata = Signal(intbv(0)[width:])
+        tkeep = Signal(intbv(0)[M:])
+        tvalid = Signal(bool(0))
+        tready = Signal(bool(0))
+        tlast = Signal(bool(0))
+
+        source = axis_ep.AXIStreamSource()
+        sink = axis_ep.AXIStreamSink()
+
+        logic.append(source.create_logic(clk, rst, tdata=tdata, tkeep=tkeep, tvalid=tvalid, tready=tready, tlast=tlast))
+        logic.append(sink.create_logic(clk, rst, tdata=tdata, tkeep=tkeep, tvalid=tvalid, tready=tready, tlast=tlast))
+
+        sources.append(source)
+
+    @always(delay(4))
+    def clkgen():
+        clk.next = not clk
+
+    @instance
+    def check():
+        yield clk.posedge
+        rst.next = 1
+        yield clk.posedge
+        rst.next = 0
+
+        for k in range(int(cycles/gap)):
+            for source in sources:
+                source.send(bytearray(64))
+
+            for i in range(gap):
+                yield clk.posedge
+
+        raise StopSimulation
+
+    start = time.time()
+    sim = Simulation(clkgen, check, logic)
+    sim.run(quiet=1)
+
+    return cycles, time.time() - start
+
+def main():
+    frame_len = 9000
+
+    for width in [8, 64]:
+        beats, t = bench_build(width, frame_len, 200)
+        print("build    %2d bit: %9.0f beats/s" % (width, beats/t))
+
+        beats, t = bench_loopback(width, frame_len, 4 if width == 8 else 32)
+        print("loopback %2d bit: %9.0f beats/s" % (width, beats/t))
+
+    # mostly idle bus, as seen by endpoints around a DUT
+    for enabled in [False, True]:
+        suspend.enabled = enabled
+        cycles, t = bench_idle(64, 6, 20000, 500)
+        print("idle     64 bit: %9.0f cycles/s (suspend.enabled=%s)" % (cycles/t, enabled))
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,160 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+from collections import deque
+
+from latency import payload_key
+
+# header field names of each frame class, found from a default instance
+header_fields = {}
+
+def frame_key(frame):
+    # match frames on their header fields and payload contents
+    payload = getattr(frame, 'payload', None)
+    if payload is None:
+        return payload_key(frame)
+    cls = type(frame)
+    if cls not in header_fields:
+        header_fields[cls] = sorted(k for k, v in vars(cls()).items()
+            if k != 'payload' and (v is None or isinstance(v, int)))
+    return (cls.__name__,) + tuple(getattr(frame, k) for k in header_fields[cls]) + (payload_key(payload),)
+
+class Scoreboard(object):
+    def __init__(self, key=frame_key, name=None):
+        # Checks frames through muxes, demuxes and switches without
+        # depending on the arrival order across streams.  Expected frames
+        # are queued per (source, destination) stream, frames must arrive
+        # in order within a stream, and key(frame) indexes the streams that
+        # have a frame outstanding so that each received frame is matched
+        # without searching.
+        self.key = key
+        self.name = name
+        self.sinks = []
+        self.reset()
+
+    def reset(self):
+        self.streams = {}
+        self.index = {}
+        self.matched_keys = {}
+        self.matched = 0
+        self.errors = []
+        self.duplicated = 0
+        self.unexpected = 0
+        self.misrouted = 0
+        self.reordered = 0
+
+    def expect(self, frame, source=0, dest=0):
+        k = self.key(frame)
+        self.streams.setdefault((source, dest), deque()).append(k)
+        self.index.setdefault(k, []).append((source, dest))
+
+    def received(self, frame, dest=0):
+        k = self.key(frame)
+        streams = self.index.get(k)
+
+        if not streams:
+            if k in self.matched_keys:
+                self.duplicated += 1
+                self.error("duplicate frame on output %s" % (dest,), frame)
+            else:
+                self.unexpected += 1
+                self.error("unexpected frame on output %s" % (dest,), frame)
+            return False
+
+        candidates = [s for s in streams if s[1] == dest]
+        if not candidates:
+            self.misrouted += 1
+            self.error("frame for output %s on output %s" % (streams[0][1], dest), frame)
+            return False
+
+        # prefer a stream where this frame is next in line
+        for s in candidates:
+            if self.streams[s][0] == k:
+                self.streams[s].popleft()
+                break
+        else:
+            s = candidates[0]
+            self.streams[s].remove(k)
+            self.reordered += 1
+            self.error("frame from input %s to output %s out of order" % s, frame)
+
+        streams.remove(s)
+        if not streams:
+            del self.index[k]
+        if not self.streams[s]:
+            del self.streams[s]
+        self.matched_keys[k] = self.matched_keys.get(k, 0) + 1
+        self.matched += 1
+        return True
+
+    def add_sink(self, sink, dest=0):
+        # sink for output dest, read by collect_all() and wait()
+        self.sinks.append((sink, dest))
+
+    def collect(self, sink, dest=0):
+        # match every frame queued on sink
+        while not sink.empty():
+            self.received(sink.recv(), dest)
+
+    def collect_all(self):
+        for sink, dest in self.sinks:
+            self.collect(sink, dest)
+
+    def wait(self, clk, timeout=0):
+        # use as 'yield board.wait(clk)'; collects frames from the sinks
+        # until none are outstanding, or for at most timeout clock cycles
+        n = 0
+        while True:
+            self.collect_all()
+            if not self.streams or (timeout and n >= timeout):
+                return
+            yield clk.posedge
+            n += 1
+
+    def error(self, msg, frame):
+        self.errors.append("%s: %s" % (msg, repr(frame)))
+        if self.name is not None:
+            print("[%s] %s" % (self.name, self.errors[-1]))
+
+    def outstanding(self):
+        # frames expected but not yet received
+        return sum(len(q) for q in self.streams.values())
+
+    def missing(self):
+        # outstanding frames per (source, destination) stream
+        return dict((s, len(q)) for s, q in self.streams.items())
+
+    def passed(self):
+        return not self.errors and not self.streams
+
+    def report(self):
+        lines = ["scoreboard: %d matched, %d missing, %d duplicated, %d unexpected, %d misrouted, %d out of order" % (
+            self.matched, self.outstanding(), self.duplicated, self.unexpected, self.misrouted, self.reordered)]
+        for s, n in sorted(self.missing().items()):
+            lines.append("missing %d frames from input %s to output %s" % (n, s[0], s[1]))
+        lines.extend(self.errors[:20])
+        if len(self.errors) > 20:
+            lines.append("... %d more errors" % (len(self.errors) - 20))
+        return '\n'.join(lines)
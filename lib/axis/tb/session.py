@@ -0,0 +1,141 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+from myhdl import *
+import time
+import traceback
+import types
+
+class Session(object):
+    # runs several scenarios against one build and one simulator process,
+    # resetting the DUT and the endpoints between them.  Use from a bench
+    # check() as 'yield session.run()'.
+    def __init__(self, clk, rst, endpoints=[], signals=[], reset_cycles=1, settle=100):
+        self.clk = clk
+        self.rst = rst
+        self.endpoints = list(endpoints)
+        # signals are returned to their initial values before each scenario
+        self.signals = [(s, s.val) for s in signals]
+        self.reset_cycles = reset_cycles
+        self.settle = settle
+        self.scenarios = []
+        self.results = []
+
+    def add(self, name, scenario, *args, **kwargs):
+        # scenario is a generator function, called as scenario(*args, **kwargs)
+        self.scenarios.append((name, scenario, args, kwargs))
+
+    def passed(self):
+        return all(r['status'] == 'pass' for r in self.results)
+
+    def clear_endpoints(self):
+        eps = list(self.endpoints)
+        while eps:
+            ep = eps.pop()
+            for attr in ('queue', 'header_queue', 'read_queue'):
+                q = getattr(ep, attr, None)
+                if q is not None:
+                    q.clear()
+            if hasattr(ep, 'reset_stats'):
+                ep.reset_stats()
+            for attr in ('payload_source', 'payload_sink'):
+                if hasattr(ep, attr):
+                    eps.append(getattr(ep, attr))
+
+    def reset(self):
+        for s, v in self.signals:
+            s.next = v
+        self.clear_endpoints()
+
+        yield self.clk.posedge
+        self.rst.next = 1
+        for i in range(self.reset_cycles):
+            yield self.clk.posedge
+        self.rst.next = 0
+        yield self.clk.posedge
+
+        # anything received while in reset belongs to the previous scenario
+        self.clear_endpoints()
+
+        yield delay(self.settle)
+        yield self.clk.posedge
+
+    def step(self, gen):
+        # run gen as MyHDL would, but step the sub-generators it yields on
+        # their own here too, so that an exception in one (e.g. a
+        # sink.wait() timeout) is thrown into the generator that yielded it
+        # rather than ending the simulation.  Sub-generators yielded in a
+        # tuple or join() are still run by MyHDL.
+        stack = [gen]
+        exc = None
+        while stack:
+            try:
+                if exc is None:
+                    clause = next(stack[-1])
+                else:
+                    e, exc = exc, None
+                    clause = stack[-1].throw(e)
+            except StopIteration:
+                stack.pop()
+                continue
+            except StopSimulation:
+                raise
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                exc = e
+                continue
+            if isinstance(clause, types.GeneratorType):
+                stack.append(clause)
+            else:
+                yield clause
+
+    def run(self):
+        for name, scenario, args, kwargs in self.scenarios:
+            yield self.reset()
+
+            result = {'name': name, 'status': 'pass', 'sim_time': now()}
+            start = time.time()
+            print("scenario %s" % name)
+
+            # step the scenario here rather than yielding it so that a
+            # failure ends only this scenario
+            try:
+                for clause in self.step(scenario(*args, **kwargs)):
+                    yield clause
+            except StopSimulation:
+                raise
+            except Exception:
+                traceback.print_exc()
+                result['status'] = 'fail'
+
+            result['time'] = time.time() - start
+            result['sim_time'] = now() - result['sim_time']
+            self.results.append(result)
+            print("scenario: %s %s %d %.3f" % (name, result['status'], result['sim_time'], result['time']))
+
+        for r in self.results:
+            print("%-7s %-50s %12d %8.3f s" % (r['status'].upper(), r['name'], r['sim_time'], r['time']))
@@ -0,0 +1,155 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import time
+
+import myhdl
+from myhdl._always import _Always
+from myhdl._instance import _Instantiator
+
+# profilers created by ProfiledSimulation, most recent last
+profilers = []
+
+def timed_gen(gen, rec):
+    # run gen one step per wakeup, timing each step
+    while True:
+        t = time.perf_counter()
+        try:
+            clause = next(gen)
+        except StopIteration:
+            return
+        finally:
+            rec[0] += time.perf_counter() - t
+            rec[1] += 1
+        yield clause
+
+def timed_func(func, rec):
+    def f():
+        t = time.perf_counter()
+        try:
+            func()
+        finally:
+            rec[0] += time.perf_counter() - t
+            rec[1] += 1
+    return f
+
+def timed_method(method, rec):
+    def f(*args):
+        t = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            rec[0] += time.perf_counter() - t
+            rec[1] += 1
+    return f
+
+def flatten(args):
+    for a in args:
+        if isinstance(a, (list, tuple)):
+            for b in flatten(a):
+                yield b
+        else:
+            yield a
+
+class Profiler(object):
+    def __init__(self):
+        # label: [seconds, wakeups]
+        self.stats = {}
+        self.total = 0.0
+
+    def label(self, inst, names):
+        # endpoint instances are labelled with the name passed to
+        # create_logic(), or the class name if there was none
+        ep = inst.symdict.get('self')
+        if ep is not None and hasattr(ep, 'has_logic'):
+            return '%s.%s' % (names[id(ep)], inst.name)
+        return inst.name
+
+    def endpoint_names(self, insts):
+        names = {}
+        count = {}
+        eps = []
+        for inst in insts:
+            ep = inst.symdict.get('self')
+            if ep is None or not hasattr(ep, 'has_logic') or id(ep) in names:
+                continue
+            name = inst.symdict.get('name')
+            if name is None:
+                cls = type(ep).__name__
+                count[cls] = count.get(cls, 0) + 1
+                name = '%s%d' % (cls, count[cls])
+            names[id(ep)] = name
+            eps.append(ep)
+
+        # payload endpoints inside frame endpoints take the parent's name
+        for ep in eps:
+            for attr in ('payload_source', 'payload_sink'):
+                child = getattr(ep, attr, None)
+                if child is not None and id(child) in names:
+                    names[id(child)] = names[id(ep)] + '.payload'
+
+        return names
+
+    def wrap(self, *args):
+        # instrument the instances in args in place and return them
+        insts = [a for a in flatten(args) if isinstance(a, _Instantiator)]
+        names = self.endpoint_names(insts)
+
+        for a in flatten(args):
+            if isinstance(a, _Always):
+                rec = self.stats.setdefault(self.label(a, names), [0.0, 0])
+                a.func = timed_func(a.func, rec)
+            elif isinstance(a, _Instantiator):
+                rec = self.stats.setdefault(self.label(a, names), [0.0, 0])
+                a.gen = timed_gen(a.gen, rec)
+            elif isinstance(a, myhdl.Cosimulation):
+                # _get blocks until vvp has run to the next time step
+                a._get = timed_method(a._get, self.stats.setdefault('cosim pipe read', [0.0, 0]))
+                a._put = timed_method(a._put, self.stats.setdefault('cosim pipe write', [0.0, 0]))
+
+        return args
+
+    def report(self):
+        lines = ["%-50s %10s %10s %10s" % ('instance', 'time (s)', 'wakeups', 'us/wakeup')]
+        for label, (t, n) in sorted(self.stats.items(), key=lambda x: -x[1][0]):
+            lines.append("%-50s %10.3f %10d %10.1f" % (label, t, n, t*1e6/n if n else 0))
+        other = self.total - sum(t for t, n in self.stats.values())
+        lines.append("%-50s %10.3f" % ('scheduler and other', other))
+        lines.append("%-50s %10.3f" % ('total', self.total))
+        return '\n'.join(lines)
+
+class ProfiledSimulation(myhdl.Simulation):
+    # drop-in replacement for Simulation that profiles its instances
+    def __init__(self, *args):
+        self.profiler = Profiler()
+        profilers.append(self.profiler)
+        super(ProfiledSimulation, self).__init__(*self.profiler.wrap(*args))
+
+    def run(self, *args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return super(ProfiledSimulation, self).run(*args, **kwargs)
+        finally:
+            self.profiler.total += time.perf_counter() - t
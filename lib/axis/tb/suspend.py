@@ -0,0 +1,76 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Idle suspension for the bus endpoints: an endpoint with nothing to send or
+# receive sleeps on an event (send(), the bus becoming active, or reset)
+# instead of waking on every clock edge.
+
+from myhdl import *
+
+# set to False to wake every endpoint on every clock edge
+enabled = True
+
+class EdgeRecorder(object):
+    def __init__(self, clk):
+        # records the time of the last rising edge of clk for
+        # wait(..., edge=...).  A source creates one with its logic and
+        # returns logic() among its instances
+        self.clk = clk
+        self.time = None
+        self.running = False
+
+    def logic(self):
+        @instance
+        def logic():
+            self.running = True
+            while True:
+                yield self.clk.posedge
+                self.time = now()
+
+        return logic
+
+def wait(clk, rst, *events, edge=None):
+    # use as 'yield suspend.wait(clk, rst, ...)' in place of waiting for the
+    # next clock edge while idle.  Sleeps until one of events or reset, then
+    # resumes on the clock edge on which an endpoint woken on every edge
+    # would have acted.
+    #
+    # Bus signals that change on an edge are only sampled on the following
+    # edge, so by default this waits for the next edge.  With an
+    # EdgeRecorder for clk, for send() and other calls made by processes
+    # that run on the edge, an edge in the current time step counts: an
+    # endpoint woken on every edge sees a frame queued by a process that ran
+    # before it on that edge.
+    if edge is not None and not edge.running:
+        raise Exception("Edge recorder not running; pass every instance returned by create_logic() to the Simulation")
+    yield events + (rst.posedge,)
+    if rst:
+        return
+    if edge is not None:
+        # let the rest of the time step run, so that the recorder has seen
+        # any clock edge in it
+        yield delay(0)
+        if edge.time == now():
+            return
+    yield clk.posedge, rst.posedge
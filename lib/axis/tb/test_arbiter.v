@@ -63,10 +63,6 @@ initial begin
         grant_valid,
         grant_encoded
     );
-
-    // dump file
-    $dumpfile("test_arbiter.lxt");
-    $dumpvars(0, test_arbiter);
 end
 
 arbiter #(
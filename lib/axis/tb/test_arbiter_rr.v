@@ -63,10 +63,6 @@ initial begin
         grant_valid,
         grant_encoded
     );
-
-    // dump file
-    $dumpfile("test_arbiter_rr.lxt");
-    $dumpvars(0, test_arbiter_rr);
 end
 
 arbiter #(
@@ -78,10 +78,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_adapter_64_8.lxt");
-    $dumpvars(0, test_axis_adapter_64_8);
 end
 
 axis_adapter #(
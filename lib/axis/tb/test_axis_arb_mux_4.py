@@ -26,6 +26,7 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
 
 module = 'axis_arb_mux_4'
@@ -161,11 +162,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
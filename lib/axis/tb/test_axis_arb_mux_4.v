@@ -103,10 +103,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_arb_mux_4.lxt");
-    $dumpvars(0, test_axis_arb_mux_4);
 end
 
 axis_arb_mux_4 #(
@@ -79,10 +79,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_async_fifo_64.lxt");
-    $dumpvars(0, test_axis_async_fifo_64);
 end
 
 axis_async_fifo_64 #(
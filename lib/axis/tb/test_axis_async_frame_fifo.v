@@ -85,10 +85,6 @@ initial begin
         output_status_bad_frame,
         output_status_good_frame
     );
-
-    // dump file
-    $dumpfile("test_axis_async_frame_fifo.lxt");
-    $dumpvars(0, test_axis_async_frame_fifo);
 end
 
 axis_async_frame_fifo #(
@@ -90,10 +90,6 @@ initial begin
         output_status_bad_frame,
         output_status_good_frame
     );
-
-    // dump file
-    $dumpfile("test_axis_async_frame_fifo_64.lxt");
-    $dumpvars(0, test_axis_async_frame_fifo_64);
 end
 
 axis_async_frame_fifo_64 #(
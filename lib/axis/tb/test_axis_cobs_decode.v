@@ -70,10 +70,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_cobs_decode.lxt");
-    $dumpvars(0, test_axis_cobs_decode);
 end
 
 axis_cobs_decode
@@ -71,10 +71,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_cobs_encode_zero_frame.lxt");
-    $dumpvars(0, test_axis_cobs_encode_zero_frame);
 end
 
 axis_cobs_encode #(
@@ -141,10 +141,6 @@ initial begin
         output_3_axis_tlast,
         output_3_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_crosspoint_64_4x4.lxt");
-    $dumpvars(0, test_axis_crosspoint_64_4x4);
 end
 
 axis_crosspoint_64_4x4 #(
@@ -108,10 +108,6 @@ initial begin
         output_3_axis_tlast,
         output_3_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_demux_4.lxt");
-    $dumpvars(0, test_axis_demux_4);
 end
 
 axis_demux_4 #(
@@ -72,10 +72,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_fifo.lxt");
-    $dumpvars(0, test_axis_fifo);
 end
 
 axis_fifo #(
@@ -26,7 +26,9 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
+import throughput
 
 module = 'axis_fifo_64'
 testbench = 'test_%s' % module
@@ -102,11 +104,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -143,6 +145,9 @@ def bench():
 
         yield clk.posedge
 
+        if throughput.enabled():
+            yield throughput.stage(lambda k: source.send(bytearray(range(256))), [sink])
+
         yield clk.posedge
         print("test 1: test packet")
         current_test.next = 1
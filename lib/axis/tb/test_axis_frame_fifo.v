@@ -77,10 +77,6 @@ initial begin
         bad_frame,
         good_frame
     );
-
-    // dump file
-    $dumpfile("test_axis_frame_fifo.lxt");
-    $dumpvars(0, test_axis_frame_fifo);
 end
 
 axis_frame_fifo #(
@@ -82,10 +82,6 @@ initial begin
         bad_frame,
         good_frame
     );
-
-    // dump file
-    $dumpfile("test_axis_frame_fifo_64.lxt");
-    $dumpvars(0, test_axis_frame_fifo_64);
 end
 
 axis_frame_fifo_64 #(
@@ -106,10 +106,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_frame_join_4.lxt");
-    $dumpvars(0, test_axis_frame_join_4);
 end
 
 axis_frame_join_4 #(
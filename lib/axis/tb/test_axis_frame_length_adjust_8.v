@@ -92,10 +92,6 @@ initial begin
         status_frame_length,
         status_frame_original_length
     );
-
-    // dump file
-    $dumpfile("test_axis_frame_length_adjust_8.lxt");
-    $dumpvars(0, test_axis_frame_length_adjust_8);
 end
 
 axis_frame_length_adjust #(
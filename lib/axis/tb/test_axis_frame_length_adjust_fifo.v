@@ -89,10 +89,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_frame_length_adjust_fifo.lxt");
-    $dumpvars(0, test_axis_frame_length_adjust_fifo);
 end
 
 axis_frame_length_adjust_fifo #(
@@ -69,10 +69,6 @@ initial begin
         ll_src_rdy_out_n,
         axis_tready
     );
-
-    // dump file
-    $dumpfile("test_axis_ll_bridge.lxt");
-    $dumpvars(0, test_axis_ll_bridge);
 end
 
 axis_ll_bridge #(
@@ -26,7 +26,9 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
+from session import Session
 
 module = 'axis_rate_limit'
 testbench = 'test_%s' % module
@@ -96,15 +98,16 @@ def bench():
         tlast=output_axis_tlast,
         tuser=output_axis_tuser,
         pause=sink_pause,
+        stats=True,
         name='sink'
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -130,51 +133,11 @@ def bench():
     def clkgen():
         clk.next = not clk
 
-    reset_stats = Signal(bool(False))
-    cur_frame = Signal(bool(False))
-    tick_count = Signal(intbv(0))
-    byte_count = Signal(intbv(0))
-    frame_count = Signal(intbv(0))
-
-    @always(clk.posedge)
-    def monitor():
-        ctc = int(tick_count)
-        cbc = int(byte_count)
-        cfc = int(frame_count)
-        if reset_stats:
-            ctc = 0
-            cbc = 0
-            cfc = 0
-            reset_stats.next = 0
-        ctc += 1
-        if output_axis_tready and output_axis_tvalid:
-            cbc += 1
-            if output_axis_tlast:
-                cur_frame.next = False
-            elif not cur_frame:
-                cfc += 1
-                cur_frame.next = True
-        tick_count.next = ctc
-        byte_count.next = cbc
-        frame_count.next = cfc
-
     @instance
     def check():
         yield delay(100)
-        yield clk.posedge
-        rst.next = 1
-        yield clk.posedge
-        rst.next = 0
-        yield clk.posedge
-        yield delay(100)
-        yield clk.posedge
-
-        yield clk.posedge
-        rate_num.next = 1
-        rate_denom.next = 4
-        rate_by_frame.next = 1
 
-        for frame_mode in (True, False):
+        def frame_mode_test(frame_mode):
             print("test frame mode %s" % frame_mode)
             rate_by_frame.next = frame_mode
 
@@ -408,8 +371,8 @@ def bench():
                 rate_num.next = rate[0]
                 rate_denom.next = rate[1]
 
-                reset_stats.next = 1
                 yield clk.posedge
+                sink.reset_stats()
                 start_time = now()
 
                 lens = [32, 48, 64, 96, 128, 256]
@@ -432,6 +395,7 @@ def bench():
                     yield clk.posedge
 
                 stop_time = now()
+                stats = sink.get_stats()
 
                 rx_frame = []
 
@@ -447,16 +411,16 @@ def bench():
                 cycle = (stop_time - start_time) / 8
 
                 print("cycles %d" % cycle)
-                print("tick count %d" % tick_count)
-                print("byte count %d" % byte_count)
-                print("frame count %d" % frame_count)
+                print("tick count %d" % stats['cycles'])
+                print("byte count %d" % stats['bytes'])
+                print("frame count %d" % stats['frames'])
 
-                assert tick_count == cycle
-                assert byte_count == sum(len(f.data) for f in test_frame)
-                assert frame_count == len(test_frame)
+                assert stats['cycles'] == cycle
+                assert stats['bytes'] == sum(len(f.data) for f in test_frame)
+                assert stats['frames'] == len(test_frame)
 
                 test_rate = float(rate_num) / float(rate_denom)
-                meas_rate = float(byte_count) / float(tick_count)
+                meas_rate = stats['bytes_per_cycle']
                 error = (test_rate - meas_rate) / test_rate
 
                 print("test rate %f" % test_rate)
@@ -467,9 +431,21 @@ def bench():
 
                 yield delay(100)
 
+        session = Session(clk, rst,
+            endpoints=[source, sink],
+            signals=[current_test, source_pause, sink_pause, rate_num, rate_denom, rate_by_frame]
+        )
+
+        for frame_mode in (True, False):
+            session.add("frame mode %s" % frame_mode, frame_mode_test, frame_mode)
+
+        yield session.run()
+
+        assert session.passed()
+
         raise StopSimulation
 
-    return dut, source_logic, sink_logic, clkgen, monitor, check
+    return dut, source_logic, sink_logic, clkgen, check
 
 def test_bench():
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
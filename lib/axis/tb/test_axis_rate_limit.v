@@ -77,10 +77,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_rate_limit.lxt");
-    $dumpvars(0, test_axis_rate_limit);
 end
 
 axis_rate_limit #(
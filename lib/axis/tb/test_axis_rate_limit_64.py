@@ -26,7 +26,9 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
+from session import Session
 
 module = 'axis_rate_limit_64'
 testbench = 'test_%s' % module
@@ -105,11 +107,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -168,20 +170,8 @@ def bench():
     @instance
     def check():
         yield delay(100)
-        yield clk.posedge
-        rst.next = 1
-        yield clk.posedge
-        rst.next = 0
-        yield clk.posedge
-        yield delay(100)
-        yield clk.posedge
-
-        yield clk.posedge
-        rate_num.next = 1
-        rate_denom.next = 4
-        rate_by_frame.next = 1
 
-        for frame_mode in (True, False):
+        def frame_mode_test(frame_mode):
             print("test frame mode %s" % frame_mode)
             rate_by_frame.next = frame_mode
 
@@ -474,6 +464,18 @@ def bench():
 
                 yield delay(100)
 
+        session = Session(clk, rst,
+            endpoints=[source, sink],
+            signals=[current_test, source_pause, sink_pause, rate_num, rate_denom, rate_by_frame]
+        )
+
+        for frame_mode in (True, False):
+            session.add("frame mode %s" % frame_mode, frame_mode_test, frame_mode)
+
+        yield session.run()
+
+        assert session.passed()
+
         raise StopSimulation
 
     return dut, source_logic, sink_logic, clkgen, monitor, check
@@ -82,10 +82,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_rate_limit_64.lxt");
-    $dumpvars(0, test_axis_rate_limit_64);
 end
 
 axis_rate_limit_64 #(
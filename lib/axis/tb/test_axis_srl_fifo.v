@@ -75,10 +75,6 @@ initial begin
         output_axis_tuser,
         count
     );
-
-    // dump file
-    $dumpfile("test_axis_srl_fifo.lxt");
-    $dumpvars(0, test_axis_srl_fifo);
 end
 
 axis_srl_fifo #(
@@ -80,10 +80,6 @@ initial begin
         output_axis_tuser,
         count
     );
-
-    // dump file
-    $dumpfile("test_axis_srl_fifo_64.lxt");
-    $dumpvars(0, test_axis_srl_fifo_64);
 end
 
 axis_srl_fifo_64 #(
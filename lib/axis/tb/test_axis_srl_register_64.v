@@ -76,10 +76,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_srl_register_64.lxt");
-    $dumpvars(0, test_axis_srl_register_64);
 end
 
 axis_srl_register_64 #(
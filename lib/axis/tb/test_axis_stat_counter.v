@@ -88,10 +88,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_stat_counter.lxt");
-    $dumpvars(0, test_axis_stat_counter);
 end
 
 axis_stat_counter #(
@@ -26,7 +26,10 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
+import scoreboard
+import throughput
 
 module = 'axis_switch_64_4x4'
 testbench = 'test_%s' % module
@@ -266,11 +269,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -385,6 +388,14 @@ def bench():
 
         # testbench stimulus
 
+        if throughput.enabled():
+            # each source to every sink in turn
+            def send(k):
+                for i, source in enumerate([source_0, source_1, source_2, source_3]):
+                    source.send(axis_ep.AXIStreamFrame(bytearray(range(256)), dest=(k+i) % 4))
+
+            yield throughput.stage(send, [sink_0, sink_1, sink_2, sink_3])
+
         yield clk.posedge
         print("test 1: 0123 -> 0123")
         current_test.next = 1
@@ -541,6 +552,32 @@ def bench():
 
             yield delay(100)
 
+        yield clk.posedge
+        print("test 5: all to all, full load")
+        current_test.next = 5
+
+        sources = [source_0, source_1, source_2, source_3]
+        board = scoreboard.Scoreboard()
+        board.add_sink(sink_0, 0)
+        board.add_sink(sink_1, 1)
+        board.add_sink(sink_2, 2)
+        board.add_sink(sink_3, 3)
+
+        # every input sends to every output, with some rounds all to one
+        # output and others a permutation
+        for k in range(16):
+            for i in range(4):
+                dest = (i*k + k) % 4
+                test_frame = axis_ep.AXIStreamFrame(bytearray([5, i, dest, k]) + bytearray(range(k+4)), dest=dest)
+                board.expect(test_frame, i, dest)
+                sources[i].send(test_frame)
+
+        yield board.wait(clk, 10000)
+
+        assert board.passed()
+
+        yield delay(100)
+
         yield clk.posedge
         print("test 1: bad decoding")
         current_test.next = 1
@@ -179,10 +179,6 @@ initial begin
         output_3_axis_tdest,
         output_3_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_switch_64_4x4.lxt");
-    $dumpvars(0, test_axis_switch_64_4x4);
 end
 
 axis_switch_64_4x4 #(
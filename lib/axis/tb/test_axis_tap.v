@@ -71,10 +71,6 @@ initial begin
         output_axis_tlast,
         output_axis_tuser
     );
-
-    // dump file
-    $dumpfile("test_axis_tap.lxt");
-    $dumpvars(0, test_axis_tap);
 end
 
 axis_tap #(
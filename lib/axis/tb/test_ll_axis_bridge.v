@@ -69,10 +69,6 @@ initial begin
         axis_tlast,
         ll_dst_rdy_out_n
     );
-
-    // dump file
-    $dumpfile("test_ll_axis_bridge.lxt");
-    $dumpvars(0, test_ll_axis_bridge);
 end
 
 ll_axis_bridge #(
@@ -59,10 +59,6 @@ initial begin
         output_encoded,
         output_unencoded
     );
-
-    // dump file
-    $dumpfile("test_priority_encoder.lxt");
-    $dumpvars(0, test_priority_encoder);
 end
 
 priority_encoder #(
@@ -0,0 +1,47 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+# Throughput stage for tb/perf_sim.py.  A bench that perf_sim.py measures
+# checks enabled() once its DUT is out of reset and, if set, runs stage() in
+# place of its normal tests.
+
+from myhdl import *
+
+# frames sent by each source; set by tb/perf_sim.py, 0 runs the normal tests
+frames = 0
+
+def enabled():
+    return frames > 0
+
+def stage(send, sinks):
+    # use as 'yield throughput.stage(...)'.  Calls send(k) for each of the
+    # frames, waits for every sink to receive that many frames, and stops
+    # the simulation
+    for k in range(frames):
+        send(k)
+
+    for sink in sinks:
+        yield sink.wait(frames)
+
+    raise StopSimulation
@@ -0,0 +1,327 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+from myhdl import *
+import ctypes
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+
+import build_cache
+
+# Runs a testbench on a Verilator model loaded into the Python process in
+# place of vvp.  The testbench module is rewritten so that the signals passed
+# to $from_myhdl/$to_myhdl become its ports, and a small C shim gives access
+# to them by index.  The model is evaluated on the first input change in a
+# time step, normally a clock edge, before the endpoints respond to it, and
+# once more after the rest of the time step has settled, rather than on
+# every delta cycle in between.  Its outputs are driven one delta cycle
+# later, the same as the Icarus cosimulation, so endpoints and check() see
+# identical values.
+
+verilator_flags = ['-Wno-fatal', '-O3', '--x-assign', 'fast', '--x-initial', 'fast']
+cxx = os.environ.get('CXX', 'g++')
+
+version = None
+
+shim_template = """
+#include <cstdint>
+#include "verilated.h"
+#include "V%(top)s.h"
+
+template <typename T> static inline uint64_t get(const T &s) { return s; }
+template <std::size_t N> static inline uint64_t get(const VlWide<N> &s) { return s[0] | (uint64_t)s[1] << 32; }
+template <typename T> static inline void set(T &s, uint64_t v) { s = v; }
+template <std::size_t N> static inline void set(VlWide<N> &s, uint64_t v) { s[0] = v; s[1] = v >> 32; }
+template <typename T> static inline void get_wide(const T &s, uint32_t *w) { w[0] = s; w[1] = (uint64_t)s >> 32; }
+template <std::size_t N> static inline void get_wide(const VlWide<N> &s, uint32_t *w) { for (std::size_t i = 0; i < N; i++) w[i] = s[i]; }
+template <typename T> static inline void set_wide(T &s, const uint32_t *w) { s = w[0] | (uint64_t)w[1] << 32; }
+template <std::size_t N> static inline void set_wide(VlWide<N> &s, const uint32_t *w) { for (std::size_t i = 0; i < N; i++) s[i] = w[i]; }
+
+extern "C" {
+
+void *vl_new() { return new V%(top)s; }
+void vl_eval(void *p) { ((V%(top)s *)p)->eval(); }
+void vl_final(void *p) { ((V%(top)s *)p)->final(); delete (V%(top)s *)p; }
+
+void vl_set(void *p, int i, uint64_t v) {
+    V%(top)s *top = (V%(top)s *)p;
+    switch (i) {
+%(set)s
+    }
+}
+
+uint64_t vl_get(void *p, int i) {
+    V%(top)s *top = (V%(top)s *)p;
+    switch (i) {
+%(get)s
+    }
+    return 0;
+}
+
+void vl_set_wide(void *p, int i, const uint32_t *w) {
+    V%(top)s *top = (V%(top)s *)p;
+    switch (i) {
+%(set_wide)s
+    }
+}
+
+void vl_get_wide(void *p, int i, uint32_t *w) {
+    V%(top)s *top = (V%(top)s *)p;
+    switch (i) {
+%(get_wide)s
+    }
+}
+
+}
+"""
+
+def obj_dir(testbench):
+    return '%s_vl' % testbench
+
+def make_top(src, testbench):
+    # turn the MyHDL testbench module into one whose ports are the
+    # cosimulation signals; returns the new source and the port names
+    m = re.search(r'initial\s+begin\s*(?://[^\n]*\s*)*\$from_myhdl\s*\((.*?)\);\s*\$to_myhdl\s*\((.*?)\);\s*end\b', src, re.S)
+    if not m:
+        raise Exception("No $from_myhdl/$to_myhdl block in %s" % testbench)
+
+    inputs = [s.strip() for s in m.group(1).split(',') if s.strip()]
+    outputs = [s.strip() for s in m.group(2).split(',') if s.strip()]
+
+    src = src[:m.start()] + src[m.end():]
+
+    for n in inputs:
+        src, k = re.subn(r'^(\s*)reg\b\s*(\[[^\]]*\]\s*)?%s\s*(=[^;]*)?;' % n, r'\1input wire \2%s;' % n, src, count=1, flags=re.M)
+        if not k:
+            raise Exception("No declaration for input %s in %s" % (n, testbench))
+    for n in outputs:
+        src, k = re.subn(r'^(\s*)wire\b\s*(\[[^\]]*\]\s*)?%s\s*;' % n, r'\1output wire \2%s;' % n, src, count=1, flags=re.M)
+        if not k:
+            raise Exception("No declaration for output %s in %s" % (n, testbench))
+
+    src, k = re.subn(r'\bmodule\s+%s\s*;' % testbench, 'module %s(%s);' % (testbench, ', '.join(inputs+outputs)), src, count=1)
+    if not k:
+        raise Exception("No module %s" % testbench)
+
+    return src, inputs, outputs
+
+def make_shim(testbench, inputs, outputs):
+    d = {'top': testbench}
+    for k, names in (('set', inputs), ('set_wide', inputs), ('get', outputs), ('get_wide', outputs)):
+        lines = []
+        for n in names:
+            i = (inputs+outputs).index(n)
+            if k.startswith('set'):
+                arg = 'w' if k == 'set_wide' else 'v'
+                lines.append('    case %d: %s(top->%s, %s); break;' % (i, k, n, arg))
+            elif k == 'get':
+                lines.append('    case %d: return get(top->%s);' % (i, n))
+            else:
+                lines.append('    case %d: get_wide(top->%s, w); break;' % (i, n))
+        d[k] = '\n'.join(lines)
+    return shim_template % d
+
+def lib_name(testbench):
+    return os.path.join(obj_dir(testbench), 'lib%s.so' % testbench)
+
+def verilator_version():
+    global version
+    if version is None:
+        try:
+            version = subprocess.check_output(['verilator', '--version'], stderr=subprocess.STDOUT).splitlines()[0]
+        except (OSError, subprocess.CalledProcessError, IndexError):
+            version = b''
+    return version
+
+def build_hash(srcs):
+    # hash of everything that affects the library, the same way that
+    # build_cache.py keys .vvp files
+    h = hashlib.sha256(verilator_version() + b'\0')
+    for a in verilator_flags + [cxx]:
+        h.update(a.encode() + b'\0')
+    for s in list(srcs) + [os.path.realpath(__file__)]:
+        h.update(s.encode() + b'\0')
+        build_cache.hash_file(h, s)
+    return h.hexdigest()
+
+def build(testbench, srcs):
+    # build the model as a shared library, skipping the build when the
+    # sources, options and Verilator version are the same as last time
+    lib = lib_name(testbench)
+    d = obj_dir(testbench)
+    stamp = os.path.join(d, 'build.sha256')
+    digest = build_hash(srcs)
+    if os.path.isfile(lib) and os.path.isfile(stamp):
+        with open(stamp) as f:
+            if f.read() == digest:
+                return 0
+
+    if not os.path.isdir(d):
+        os.makedirs(d)
+    if os.path.isfile(stamp):
+        os.remove(stamp)
+
+    tb_src = '%s.v' % testbench
+    with open(tb_src) as f:
+        src, inputs, outputs = make_top(f.read(), testbench)
+
+    top_file = os.path.join(d, tb_src)
+    with open(top_file, 'w') as f:
+        f.write(src)
+
+    shim_file = os.path.join(d, '%s_shim.cpp' % testbench)
+    with open(shim_file, 'w') as f:
+        f.write(make_shim(testbench, inputs, outputs))
+
+    with open(os.path.join(d, 'ports.json'), 'w') as f:
+        json.dump({'inputs': inputs, 'outputs': outputs}, f)
+
+    cmd = ['verilator', '--cc', '--build', '-Mdir', d, '--top-module', testbench,
+        '-CFLAGS', '-fPIC'] + verilator_flags + [top_file] + [s for s in srcs if s != tb_src]
+    print(' '.join(shlex.quote(a) for a in cmd))
+    ret = subprocess.call(cmd)
+    if ret:
+        return ret
+
+    root = subprocess.check_output(['verilator', '--getenv', 'VERILATOR_ROOT']).decode().strip()
+
+    cmd = [cxx, '-shared', '-fPIC', '-O2', '-o', lib,
+        '-I', d, '-I', os.path.join(root, 'include'), '-I', os.path.join(root, 'include', 'vltstd'),
+        shim_file, os.path.join(d, 'V%s__ALL.a' % testbench), os.path.join(d, 'libverilated.a'), '-lpthread']
+    print(' '.join(shlex.quote(a) for a in cmd))
+    ret = subprocess.call(cmd)
+    if ret:
+        return ret
+
+    with open(stamp, 'w') as f:
+        f.write(digest)
+
+    return 0
+
+class VerilatorCosimulation(object):
+    def __init__(self, testbench, **signals):
+        with open(os.path.join(obj_dir(testbench), 'ports.json')) as f:
+            ports = json.load(f)
+
+        for n in ports['inputs'] + ports['outputs']:
+            if n not in signals:
+                raise Exception("No signal for port %s" % n)
+
+        self.lib = ctypes.CDLL(os.path.abspath(lib_name(testbench)))
+        self.lib.vl_new.restype = ctypes.c_void_p
+        self.lib.vl_eval.argtypes = [ctypes.c_void_p]
+        self.lib.vl_final.argtypes = [ctypes.c_void_p]
+        self.lib.vl_set.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_uint64]
+        self.lib.vl_get.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.lib.vl_get.restype = ctypes.c_uint64
+        self.lib.vl_set_wide.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
+        self.lib.vl_get_wide.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
+
+        self.top = self.lib.vl_new()
+
+        names = ports['inputs'] + ports['outputs']
+        self.inputs = [(names.index(n), signals[n]) for n in ports['inputs']]
+        self.outputs = [(names.index(n), signals[n]) for n in ports['outputs']]
+
+    def final(self):
+        if self.top:
+            self.lib.vl_final(self.top)
+            self.top = None
+
+    def create_logic(self):
+        lib = self.lib
+        top = self.top
+        vl_set = lib.vl_set
+        vl_get = lib.vl_get
+        vl_eval = lib.vl_eval
+
+        # (index, signal, word buffer for signals wider than 64 bits)
+        def port(i, s):
+            n = (len(s)+31)//32 if len(s) > 64 else 0
+            return i, s, (ctypes.c_uint32*max(n, 2))() if n else None
+
+        inputs = [port(i, s) for i, s in self.inputs]
+        outputs = [(i, s, buf, isinstance(s.val, bool)) for i, s, buf in (port(i, s) for i, s in self.outputs)]
+        sens = tuple(s for i, s in self.inputs)
+
+        def evaluate(last):
+            # returns False if no input has changed since the last evaluation
+            changed = False
+            for k, (i, s, buf) in enumerate(inputs):
+                v = int(s.val)
+                if v != last[k]:
+                    last[k] = v
+                    changed = True
+                    if buf is None:
+                        vl_set(top, i, v)
+                    else:
+                        for j in range(len(buf)):
+                            buf[j] = (v >> 32*j) & 0xffffffff
+                        lib.vl_set_wide(top, i, buf)
+
+            if not changed:
+                return False
+
+            vl_eval(top)
+
+            for i, s, buf, b in outputs:
+                if buf is None:
+                    v = vl_get(top, i)
+                else:
+                    lib.vl_get_wide(top, i, buf)
+                    v = 0
+                    for j in range(len(buf)):
+                        v |= buf[j] << 32*j
+                if v != s.val:
+                    s.next = bool(v) if b else v
+
+            return True
+
+        @instance
+        def logic():
+            last = [None]*len(inputs)
+            t = None
+
+            evaluate(last)
+
+            while True:
+                yield sens
+
+                if now() != t:
+                    # first change in this time step; flops must sample the
+                    # inputs from before the endpoints respond to the edge
+                    t = now()
+                    evaluate(last)
+
+                # a zero delay resumes once every delta cycle at this time
+                # has run, so combinational outputs see settled inputs
+                yield delay(0)
+                evaluate(last)
+
+        return logic
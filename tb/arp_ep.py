@@ -23,9 +23,11 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
 import axis_ep
 import eth_ep
 import struct
+from collections import deque
 
 class ARPFrame(object):
     def __init__(self,
@@ -160,9 +162,11 @@ class ARPFrameSource():
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.wake = Signal(bool(0))
 
     def send(self, frame):
         self.queue.append(ARPFrame(frame))
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -194,6 +198,7 @@ class ARPFrameSource():
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         frame_ready_int = Signal(bool(False))
         frame_valid_int = Signal(bool(False))
@@ -206,15 +211,23 @@ class ARPFrameSource():
         @instance
         def logic():
             frame = dict()
+            active = False
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame_valid_int.next = False
+                    active = False
                 else:
                     if frame_ready_int:
                         frame_valid_int.next = False
+                        active = False
                     if (frame_ready_int and frame_valid) or not frame_valid_int:
                         if len(self.queue) > 0:
                             frame = self.queue.pop(0)
@@ -235,14 +248,21 @@ class ARPFrameSource():
                                 print("[%s] Sending frame %s" % (name, repr(frame)))
 
                             frame_valid_int.next = True
+                            active = True
 
-        return logic, pause_logic
+                idle = (suspend.enabled and not rst and
+                        not active and len(self.queue) == 0)
+
+        return logic, pause_logic, edge.logic()
 
 
-class ARPFrameSink():
+class ARPFrameSink(axis_ep.SinkMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
 
     def recv(self):
         if len(self.queue) > 0:
@@ -278,6 +298,7 @@ class ARPFrameSink():
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         frame_ready_int = Signal(bool(False))
         frame_valid_int = Signal(bool(False))
@@ -289,8 +310,14 @@ class ARPFrameSink():
 
         @instance
         def logic():
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # ready and nothing offered; wait for frame_valid or reset
+                    yield suspend.wait(clk, rst, frame_valid_int.posedge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame_ready_int.next = False
@@ -311,10 +338,17 @@ class ARPFrameSink():
                         frame.arp_spa = int(arp_spa)
                         frame.arp_tha = int(arp_tha)
                         frame.arp_tpa = int(arp_tpa)
-                        self.queue.append(frame)
+                        if self.consumer is None:
+                            self.queue.append(frame)
+                        else:
+                            self.consumer(frame)
+                            self.history.append(frame)
+                        self.sync.next = not self.sync
 
                         if name is not None:
                             print("[%s] Got frame %s" % (name, repr(frame)))
 
+                idle = suspend.enabled and not rst and frame_ready_int and not frame_valid_int
+
         return logic, pause_logic
 
@@ -0,0 +1 @@
+../lib/axis/tb/axis_model.py
\ No newline at end of file
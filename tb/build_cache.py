@@ -0,0 +1 @@
+../lib/axis/tb/build_cache.py
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Internet (ones complement) checksums for the IP and UDP endpoints.
+#
+# The 16 bit ones complement sum of a buffer is congruent to the buffer read
+# as one big endian integer modulo 0xffff, since 2**16 == 1 (mod 0xffff), so
+# a whole payload is summed with a single int.from_bytes() and one modulo
+# instead of a loop over the bytes.  Long buffers are summed as an array of
+# 16 bit words with numpy when it is installed.
+
+# buffers of at least this many bytes are summed with numpy, when available
+numpy_threshold = 4096
+
+def fold(s):
+    # reduce a non-negative sum of 16 bit words to 16 bits with end around
+    # carry; the result is only zero when the sum is zero
+    if s == 0:
+        return 0
+    return s % 0xffff or 0xffff
+
+def word_sum(data):
+    # sum of data as big endian 16 bit words, an odd final byte padded with
+    # zero; not folded, but possibly reduced modulo 0xffff, so only ever
+    # zero when every word is zero
+    n = len(data)
+    if numpy is not None and n >= numpy_threshold:
+        s = int(numpy.frombuffer(data, dtype='>u2', count=n >> 1).sum(dtype=numpy.uint64))
+        if n & 1:
+            s += data[-1] << 8
+        return s
+    s = int.from_bytes(data, 'big')
+    if n & 1:
+        s <<= 8
+    return fold(s)
+
+def ones_sum(data, start=0):
+    # 16 bit ones complement sum of data plus the unfolded sum start
+    return fold(word_sum(data) + start)
+
+def inet_checksum(data, start=0):
+    # ones complement of the ones complement sum, as carried in IP and UDP
+    # headers
+    return ~ones_sum(data, start) & 0xffff
+
+def pseudo_header_sum(source_ip, dest_ip, protocol, length):
+    # unfolded sum of the IPv4 pseudo header of a UDP or TCP segment
+    s = (source_ip >> 16) + (source_ip & 0xffff)
+    s += (dest_ip >> 16) + (dest_ip & 0xffff)
+    return s + protocol + length
+
+def ip_header_sum(frame):
+    # unfolded sum of the IPv4 header fields of frame, less the checksum
+    s = frame.ip_version << 12 | frame.ip_ihl << 8 | frame.ip_dscp << 2 | frame.ip_ecn
+    s += frame.ip_length
+    s += frame.ip_identification
+    s += frame.ip_flags << 13 | frame.ip_fragment_offset
+    s += frame.ip_ttl << 8 | frame.ip_protocol
+    s += (frame.ip_source_ip >> 16) + (frame.ip_source_ip & 0xffff)
+    s += (frame.ip_dest_ip >> 16) + (frame.ip_dest_ip & 0xffff)
+    return s
+
+def ip_header_checksum(frame):
+    # header checksum of an IPFrame or UDPFrame
+    return ~fold(ip_header_sum(frame)) & 0xffff
+
+def udp_checksum(frame):
+    # checksum of a UDPFrame over the pseudo header, UDP header and payload;
+    # a zero checksum means none was computed, so it is sent as 0xffff
+    # instead (RFC 768)
+    s = pseudo_header_sum(frame.ip_source_ip, frame.ip_dest_ip, frame.ip_protocol, frame.udp_length)
+    s += frame.udp_source_port + frame.udp_dest_port + frame.udp_length
+    return inet_checksum(frame.payload.data, s) or 0xffff
+
+# Incremental update (RFC 1624): when header fields change from m to m',
+# the checksum HC is patched to HC' = ~(~HC + ~m + m') from the old and new
+# field values alone, without summing the rest of the header or the payload.
+
+# shift of each field within the 16 bit words of the IPv4 header
+ip_header_fields = {
+    'ip_version': 12,
+    'ip_ihl': 8,
+    'ip_dscp': 2,
+    'ip_ecn': 0,
+    'ip_length': 0,
+    'ip_identification': 0,
+    'ip_flags': 13,
+    'ip_fragment_offset': 0,
+    'ip_ttl': 8,
+    'ip_protocol': 0,
+    'ip_source_ip': 0,
+    'ip_dest_ip': 0
+}
+
+# number of times each field is summed into the UDP checksum; the length
+# appears in both the pseudo header and the UDP header
+udp_fields = {
+    'ip_source_ip': 1,
+    'ip_dest_ip': 1,
+    'ip_protocol': 1,
+    'udp_length': 2,
+    'udp_source_port': 1,
+    'udp_dest_port': 1
+}
+
+def ip_header_fields_sum(fields):
+    # unfolded contribution of the named fields to the IPv4 header sum
+    s = 0
+    for name, value in fields.items():
+        if name in ip_header_fields:
+            v = value << ip_header_fields[name]
+            s += (v >> 16) + (v & 0xffff)
+    return s
+
+def udp_fields_sum(fields):
+    # unfolded contribution of the named fields to the UDP checksum sum
+    s = 0
+    for name, value in fields.items():
+        if name in udp_fields:
+            s += ((value >> 16) + (value & 0xffff)) * udp_fields[name]
+    return s
+
+def update(cksum, old_sum, new_sum):
+    # patch cksum for header words summing to old_sum changing to new_sum
+    s = (~cksum & 0xffff) + (~fold(old_sum) & 0xffff) + fold(new_sum)
+    return ~fold(s) & 0xffff
+
+def update_ip_header_checksum(cksum, old, new):
+    # patch an IPv4 header checksum for the fields in the dict old changing
+    # to the values in the dict new
+    return update(cksum, ip_header_fields_sum(old), ip_header_fields_sum(new))
+
+def update_udp_checksum(cksum, old, new):
+    # patch a UDP checksum for the fields in the dict old changing to the
+    # values in the dict new; a zero result is sent as 0xffff, as for
+    # udp_checksum()
+    return update(cksum, udp_fields_sum(old), udp_fields_sum(new)) or 0xffff
@@ -0,0 +1 @@
+../lib/axis/tb/cosim.py
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import axis_ep
+import eth_ep
+import ip_ep
+import udp_ep
+import arp_ep
+import struct
+
+# Single pass decoder from received bytes to the matching frame object.
+#
+# The headers are unpacked in place with precompiled structs and the payload
+# is a memoryview into the received data, instead of copying the frame into
+# an EthFrame, then an IPFrame, then a UDPFrame with a struct.unpack() per
+# field at each step.
+
+ETH_TYPE_IP = 0x0800
+ETH_TYPE_ARP = 0x0806
+IP_PROTOCOL_UDP = 0x11
+
+# MAC addresses are unpacked as 16 bit and 32 bit halves
+eth_struct = struct.Struct('>HLHLH')
+ip_struct = struct.Struct('>BBHHHBBHLL')
+udp_struct = struct.Struct('>HHHH')
+arp_struct = struct.Struct('>HHBBHHLLHLL')
+
+class LazyField(object):
+    # header field decoded from the raw header bytes on first read; a write
+    # replaces it and marks the frame as modified
+    def __init__(self, name, offset, size, shift=0, mask=None):
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.shift = shift
+        self.mask = mask
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        try:
+            return obj._fields[self.name]
+        except KeyError:
+            v = int.from_bytes(obj._header[self.offset:self.offset+self.size], 'big') >> self.shift
+            if self.mask is not None:
+                v &= self.mask
+            obj._fields[self.name] = v
+            return v
+
+    def __set__(self, obj, value):
+        obj._fields[self.name] = value
+        obj._modified = True
+
+def add_lazy_fields(cls, fields):
+    # add LazyField attributes to cls from (name, offset, size, shift, mask)
+    # tuples, offsets counted from the destination MAC
+    for f in fields:
+        setattr(cls, f[0], LazyField(*f))
+
+eth_fields = (
+    ('eth_dest_mac', 0, 6),
+    ('eth_src_mac', 6, 6),
+    ('eth_type', 12, 2)
+)
+
+ip_fields = eth_fields + (
+    ('ip_version', 14, 1, 4, 0xF),
+    ('ip_ihl', 14, 1, 0, 0xF),
+    ('ip_dscp', 15, 1, 2, 0x3F),
+    ('ip_ecn', 15, 1, 0, 0x3),
+    ('ip_length', 16, 2),
+    ('ip_identification', 18, 2),
+    ('ip_flags', 20, 2, 13, 0x7),
+    ('ip_fragment_offset', 20, 2, 0, 0x1FFF),
+    ('ip_ttl', 22, 1),
+    ('ip_protocol', 23, 1),
+    ('ip_header_checksum', 24, 2),
+    ('ip_source_ip', 26, 4),
+    ('ip_dest_ip', 30, 4)
+)
+
+udp_fields = ip_fields + (
+    ('udp_source_port', 34, 2),
+    ('udp_dest_port', 36, 2),
+    ('udp_length', 38, 2),
+    ('udp_checksum', 40, 2)
+)
+
+class LazyFrame(object):
+    # Mixin for received frames that keep the raw header bytes and decode
+    # each header field on first read.  Two unmodified lazy frames of the
+    # same type compare their raw headers and payloads, anything else falls
+    # back to comparing fields.  repr() decodes every field.
+    def __init__(self, header, payload):
+        self._header = memoryview(header)
+        self._fields = {}
+        self._modified = False
+        self._payload = axis_ep.AXIStreamFrame(payload)
+
+    def __eq__(self, other):
+        if type(other) is type(self) and not self._modified and not other._modified:
+            return self._header.tobytes() == other._header.tobytes() and self.payload == other.payload
+        return super(LazyFrame, self).__eq__(other)
+
+class LazyEthFrame(LazyFrame, eth_ep.EthFrame):
+    def __init__(self, header, payload, eth_fcs=None):
+        LazyFrame.__init__(self, header, payload)
+        self.eth_fcs = eth_fcs
+
+class LazyIPFrame(LazyFrame, ip_ep.IPFrame):
+    pass
+
+class LazyUDPFrame(LazyFrame, udp_ep.UDPFrame):
+    pass
+
+add_lazy_fields(LazyEthFrame, eth_fields)
+add_lazy_fields(LazyIPFrame, ip_fields)
+add_lazy_fields(LazyUDPFrame, udp_fields)
+
+def decode_lazy(data, eth_fcs=None):
+    # as decode(), returning a LazyUDPFrame, LazyIPFrame or LazyEthFrame;
+    # only the fields needed to find the type and the payload are decoded
+    eth_type = struct.unpack_from('>H', data, 12)[0]
+
+    if eth_type == ETH_TYPE_IP and len(data) >= 34:
+        ip_length = struct.unpack_from('>H', data, 16)[0]
+        ip_payload = data[34:14+ip_length]
+
+        if data[23] == IP_PROTOCOL_UDP and len(ip_payload) >= 8:
+            udp_length = struct.unpack_from('>H', data, 38)[0]
+            return LazyUDPFrame(data[:42], ip_payload[8:udp_length])
+
+        return LazyIPFrame(data[:34], ip_payload)
+
+    if eth_type == ETH_TYPE_ARP and len(data) >= 42:
+        return decode(data)
+
+    return LazyEthFrame(data[:14], data[14:], eth_fcs)
+
+def decode(data, fcs=False, preamble=False, lazy=False):
+    # decode an Ethernet frame into a UDPFrame, IPFrame, ARPFrame, or an
+    # EthFrame for any other ethertype or a truncated IP or ARP header.
+    # data is bytes, a bytearray, a memoryview, or a frame received by an
+    # AXI stream, GMII or XGMII sink, with the Ethernet frame starting at
+    # the destination MAC, or after the preamble and SFD with preamble=True.
+    # With fcs=True the last four bytes are the FCS; it is kept in eth_fcs
+    # of an EthFrame and dropped otherwise.  Header fields are decoded as
+    # by the parse_eth() and parse_ip() methods, including the truncation
+    # of the payloads to ip_length and udp_length.  With lazy=True, UDP, IP
+    # and other Ethernet frames are returned as LazyUDPFrame, LazyIPFrame
+    # and LazyEthFrame, which decode header fields only when they are read.
+    if hasattr(data, 'data'):
+        data = data.data
+    if type(data) is list:
+        data = bytearray(data)
+    data = memoryview(data)
+    if preamble:
+        data = data[8:]
+    eth_fcs = None
+    if fcs:
+        eth_fcs = struct.unpack_from('<L', data, len(data)-4)[0]
+        data = data[:-4]
+
+    if lazy:
+        return decode_lazy(data, eth_fcs)
+
+    dest_hi, dest_lo, src_hi, src_lo, eth_type = eth_struct.unpack_from(data)
+    eth_dest_mac = dest_hi << 32 | dest_lo
+    eth_src_mac = src_hi << 32 | src_lo
+
+    if eth_type == ETH_TYPE_IP and len(data) >= 34:
+        v, d, ip_length, ip_identification, f, ip_ttl, ip_protocol, ip_header_checksum, ip_source_ip, ip_dest_ip = ip_struct.unpack_from(data, 14)
+        ip_payload = data[34:14+ip_length]
+
+        if ip_protocol == IP_PROTOCOL_UDP and len(ip_payload) >= 8:
+            udp_source_port, udp_dest_port, udp_length, udp_checksum = udp_struct.unpack_from(ip_payload)
+            frame = udp_ep.UDPFrame(
+                    b'',
+                    eth_dest_mac,
+                    eth_src_mac,
+                    eth_type,
+                    v >> 4,
+                    v & 0xF,
+                    d >> 2,
+                    d & 0x3,
+                    ip_length,
+                    ip_identification,
+                    f >> 13,
+                    f & 0x1FFF,
+                    ip_ttl,
+                    ip_protocol,
+                    ip_header_checksum,
+                    ip_source_ip,
+                    ip_dest_ip,
+                    udp_source_port,
+                    udp_dest_port,
+                    udp_length,
+                    udp_checksum
+                )
+            # set _payload directly, the payload setter would copy the view
+            frame._payload = axis_ep.AXIStreamFrame(ip_payload[8:udp_length])
+            return frame
+
+        frame = ip_ep.IPFrame(
+                b'',
+                eth_dest_mac,
+                eth_src_mac,
+                eth_type,
+                v >> 4,
+                v & 0xF,
+                d >> 2,
+                d & 0x3,
+                ip_length,
+                ip_identification,
+                f >> 13,
+                f & 0x1FFF,
+                ip_ttl,
+                ip_protocol,
+                ip_header_checksum,
+                ip_source_ip,
+                ip_dest_ip
+            )
+        frame._payload = axis_ep.AXIStreamFrame(ip_payload)
+        return frame
+
+    if eth_type == ETH_TYPE_ARP and len(data) >= 42:
+        htype, ptype, hlen, plen, oper, sha_hi, sha_lo, spa, tha_hi, tha_lo, tpa = arp_struct.unpack_from(data, 14)
+        return arp_ep.ARPFrame(
+                eth_dest_mac,
+                eth_src_mac,
+                eth_type,
+                htype,
+                ptype,
+                hlen,
+                plen,
+                oper,
+                sha_hi << 32 | sha_lo,
+                spa,
+                tha_hi << 32 | tha_lo,
+                tpa
+            )
+
+    frame = eth_ep.EthFrame(b'', eth_dest_mac, eth_src_mac, eth_type, eth_fcs)
+    frame._payload = axis_ep.AXIStreamFrame(data[14:])
+    return frame
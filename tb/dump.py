@@ -0,0 +1 @@
+../lib/axis/tb/dump.py
\ No newline at end of file
@@ -23,9 +23,11 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
 import axis_ep
 import struct
 import zlib
+from collections import deque
 
 class EthFrame(object):
     def __init__(self, payload=b'', eth_dest_mac=0, eth_src_mac=0, eth_type=0, eth_fcs=None):
@@ -45,7 +47,7 @@ class EthFrame(object):
             payload = bytearray(payload)
         if type(payload) is bytearray or type(payload) is axis_ep.AXIStreamFrame:
             self.payload = axis_ep.AXIStreamFrame(payload)
-        if type(payload) is EthFrame:
+        if isinstance(payload, EthFrame):
             self.payload = axis_ep.AXIStreamFrame(payload.payload)
             self.eth_dest_mac = payload.eth_dest_mac
             self.eth_src_mac = payload.eth_src_mac
@@ -104,7 +106,7 @@ class EthFrame(object):
         self.eth_fcs = struct.unpack('<L', data[-4:])[0]
 
     def __eq__(self, other):
-        if type(other) is EthFrame:
+        if isinstance(other, EthFrame):
             return (
                     self.eth_src_mac == other.eth_src_mac and
                     self.eth_dest_mac == other.eth_dest_mac and
@@ -120,14 +122,16 @@ class EthFrame(object):
         return 'EthFrame(payload=%s, eth_dest_mac=0x%012x, eth_src_mac=0x%012x, eth_type=0x%04x, eth_fcs=%s)' % (repr(self.payload), self.eth_dest_mac, self.eth_src_mac, self.eth_type, fcs)
 
 
-class EthFrameSource():
+class EthFrameSource(axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
         self.payload_source = axis_ep.AXIStreamSource()
+        self.wake = Signal(bool(0))
 
     def send(self, frame):
         self.queue.append(EthFrame(frame))
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -150,12 +154,14 @@ class EthFrameSource():
                 eth_payload_tlast=Signal(bool(False)),
                 eth_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         eth_hdr_ready_int = Signal(bool(False))
         eth_hdr_valid_int = Signal(bool(False))
@@ -171,6 +177,7 @@ class EthFrameSource():
             tlast=eth_payload_tlast,
             tuser=eth_payload_tuser,
             pause=eth_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -182,15 +189,23 @@ class EthFrameSource():
         @instance
         def logic():
             frame = EthFrame()
+            active = False
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     eth_hdr_valid_int.next = False
+                    active = False
                 else:
                     if eth_hdr_ready_int:
                         eth_hdr_valid_int.next = False
+                        active = False
                     if (eth_payload_tlast and eth_hdr_ready_int and eth_hdr_valid) or not eth_hdr_valid_int:
                         if len(self.queue) > 0:
                             frame = self.queue.pop(0)
@@ -203,14 +218,21 @@ class EthFrameSource():
                                 print("[%s] Sending frame %s" % (name, repr(frame)))
 
                             eth_hdr_valid_int.next = True
+                            active = True
+
+                idle = (suspend.enabled and not rst and
+                        not active and len(self.queue) == 0)
 
-        return logic, pause_logic, eth_payload_source
+        return logic, pause_logic, eth_payload_source, edge.logic()
 
 
-class EthFrameSink():
+class EthFrameSink(axis_ep.SinkMixin, axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
         self.payload_sink = axis_ep.AXIStreamSink()
 
     def recv(self):
@@ -239,12 +261,14 @@ class EthFrameSink():
                 eth_payload_tlast=Signal(bool(True)),
                 eth_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         eth_hdr_ready_int = Signal(bool(False))
         eth_hdr_valid_int = Signal(bool(False))
@@ -261,7 +285,8 @@ class EthFrameSink():
             tready=eth_payload_tready,
             tlast=eth_payload_tlast,
             tuser=eth_payload_tuser,
-            pause=eth_payload_pause
+            pause=eth_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -272,8 +297,14 @@ class EthFrameSink():
 
         @instance
         def logic():
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing pending; wait for a header, a payload or reset
+                    yield suspend.wait(clk, rst, eth_hdr_valid_int.posedge, self.payload_sink.sync)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     eth_hdr_ready_int.next = False
@@ -290,10 +321,18 @@ class EthFrameSink():
                     if not self.payload_sink.empty() and len(eth_header_queue) > 0:
                         frame = eth_header_queue.pop(0)
                         frame.payload = self.payload_sink.recv()
-                        self.queue.append(frame)
+                        if self.consumer is None:
+                            self.queue.append(frame)
+                        else:
+                            self.consumer(frame)
+                            self.history.append(frame)
+                        self.sync.next = not self.sync
 
                         if name is not None:
                             print("[%s] Got frame %s" % (name, repr(frame)))
 
+                idle = (suspend.enabled and not rst and eth_hdr_ready_int and not eth_hdr_valid_int and
+                        (len(eth_header_queue) == 0 or self.payload_sink.empty()))
+
         return logic, pause_logic, eth_payload_sink
 
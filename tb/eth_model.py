@@ -0,0 +1,283 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+from myhdl import *
+import struct
+import zlib
+
+import axis_ep
+import eth_ep
+import ip_ep
+import udp_ep
+import xgmii_ep
+from axis_model import FrameModel, register, ports, last_user
+
+# Transaction level models of the Ethernet, IP and UDP modules, see
+# axis_model.py
+
+PREAMBLE = b'\x55\x55\x55\x55\x55\x55\x55\xD5'
+
+def fcs(data):
+    return struct.pack('<L', zlib.crc32(bytes(data)) & 0xffffffff)
+
+def check_fcs(data):
+    # returns the frame without its FCS and whether the FCS was correct
+    return data[:-4], len(data) >= 4 and fcs(data[:-4]) == bytes(data[-4:])
+
+def set_user(frame, user):
+    # assert tuser on the last payload beat
+    frame.payload.user = 1 if user else None
+    return frame
+
+class FCSInsertModel(FrameModel):
+    def process(self, frame):
+        data = bytearray(frame.data)
+        if self.testbench.endswith('_pad') and len(data) < 60:
+            data += bytearray(60-len(data))
+        return axis_ep.AXIStreamFrame(data + fcs(data), user=last_user(frame) or None)
+
+class FCSCheckModel(FrameModel):
+    def process(self, frame):
+        data, ok = check_fcs(frame.data)
+        if not ok:
+            self.error('error_bad_fcs')
+        return axis_ep.AXIStreamFrame(data, user=(not ok or last_user(frame)) or None)
+
+class HeaderFrameModel(FrameModel):
+    # Models with a header and payload input.  The header fields are taken
+    # straight off the input signals and the payload from an AXI stream
+    # sink, so frames reach process() on the edge that accepts the last
+    # payload beat; the frame sink endpoints take one more cycle, which
+    # benches that wait for tvalid to drop would see as a gap in the output.
+    frame_class = None
+    hdr_prefix = None
+
+    def __init__(self, testbench):
+        super(HeaderFrameModel, self).__init__(testbench)
+        self.sink = axis_ep.AXIStreamSink()
+        self.headers = []
+        self.payloads = []
+
+    def pair(self):
+        while self.headers and self.payloads:
+            frame = self.frame_class()
+            for k, v in self.headers.pop(0).items():
+                setattr(frame, k, v)
+            frame.payload = self.payloads.pop(0)
+            self.receive(frame)
+
+    def receive_payload(self, frame):
+        self.payloads.append(frame)
+        self.pair()
+
+    def create_logic(self, **signals):
+        self.signals = signals
+        clk = signals[self.in_clk]
+        rst = signals[self.in_rst]
+
+        hdr = ports(signals, self.in_prefix)
+        hdr_valid = hdr.pop(self.hdr_prefix + 'hdr_valid')
+        hdr_ready = hdr.pop(self.hdr_prefix + 'hdr_ready')
+        payload_prefix = self.hdr_prefix + 'payload_'
+        fields = [(k, s) for k, s in hdr.items() if not k.startswith(payload_prefix)]
+
+        self.sink.stream(self.receive_payload)
+        kw = ports(hdr, payload_prefix)
+        sink_logic = self.sink.create_logic(clk, rst, **kw)
+
+        @instance
+        def header_logic():
+            while True:
+                yield clk.posedge, rst.posedge
+
+                if rst:
+                    hdr_ready.next = False
+                    del self.headers[:]
+                    del self.payloads[:]
+                else:
+                    hdr_ready.next = True
+                    if hdr_ready and hdr_valid:
+                        self.headers.append(dict((k, int(s)) for k, s in fields))
+                        self.pair()
+
+        kw = ports(signals, self.out_prefix)
+        source_logic = self.source.create_logic(signals[self.out_clk], signals[self.out_rst], **kw)
+
+        return header_logic, sink_logic, source_logic, self.error_logic()
+
+class EthAxisTxModel(HeaderFrameModel):
+    frame_class = eth_ep.EthFrame
+    in_prefix = 'input_'
+    hdr_prefix = 'eth_'
+
+    def process(self, frame):
+        out = frame.build_axis()
+        out.user = last_user(frame.payload) or None
+        return out
+
+class EthAxisRxModel(FrameModel):
+    source_class = eth_ep.EthFrameSource
+    out_prefix = 'output_'
+
+    def process(self, frame):
+        # a header with no payload is truncated as well
+        if len(frame.data) <= 14:
+            self.error('error_header_early_termination')
+            return None
+        eth_frame = eth_ep.EthFrame()
+        eth_frame.parse_axis(frame)
+        return set_user(eth_frame, last_user(frame))
+
+class IPEthTxModel(HeaderFrameModel):
+    frame_class = ip_ep.IPFrame
+    source_class = eth_ep.EthFrameSource
+    in_prefix = 'input_'
+    out_prefix = 'output_'
+    hdr_prefix = 'ip_'
+
+    def process(self, frame):
+        user = last_user(frame.payload)
+        data = frame.payload.data[:frame.ip_length-20]
+        if len(data) < frame.ip_length-20:
+            self.error('error_payload_early_termination')
+            user = True
+        frame.payload = data
+        # the header checksum is generated by the DUT
+        frame.ip_header_checksum = None
+        return set_user(frame.build_eth(), user)
+
+class IPEthRxModel(HeaderFrameModel):
+    frame_class = eth_ep.EthFrame
+    source_class = ip_ep.IPFrameSource
+    in_prefix = 'input_'
+    out_prefix = 'output_'
+    hdr_prefix = 'eth_'
+
+    def process(self, frame):
+        data = frame.payload.data
+        if len(data) <= 20:
+            self.error('error_header_early_termination')
+            return None
+        ip_frame = ip_ep.IPFrame()
+        ip_frame.parse_eth(frame)
+        if ip_frame.ip_version != 4 or ip_frame.ip_ihl != 5:
+            self.error('error_invalid_header')
+            return None
+        if ip_frame.calc_checksum() != ip_frame.ip_header_checksum:
+            self.error('error_invalid_checksum')
+            return None
+        user = last_user(frame.payload)
+        if len(data) < ip_frame.ip_length:
+            self.error('error_payload_early_termination')
+            user = True
+        return set_user(ip_frame, user)
+
+class UDPIPTxModel(HeaderFrameModel):
+    frame_class = udp_ep.UDPFrame
+    source_class = ip_ep.IPFrameSource
+    in_prefix = 'input_'
+    out_prefix = 'output_'
+    hdr_prefix = 'udp_'
+
+    def process(self, frame):
+        user = last_user(frame.payload)
+        data = frame.payload.data[:frame.udp_length-8]
+        if len(data) < frame.udp_length-8:
+            self.error('error_payload_early_termination')
+            user = True
+        frame.payload = data
+        frame.ip_length = frame.udp_length + 20
+        return set_user(frame.build_ip(), user)
+
+class UDPIPRxModel(HeaderFrameModel):
+    frame_class = ip_ep.IPFrame
+    source_class = udp_ep.UDPFrameSource
+    in_prefix = 'input_'
+    out_prefix = 'output_'
+    hdr_prefix = 'ip_'
+
+    def process(self, frame):
+        data = frame.payload.data
+        if len(data) <= 8:
+            self.error('error_header_early_termination')
+            return None
+        udp_frame = udp_ep.UDPFrame()
+        udp_frame.parse_ip(frame)
+        user = last_user(frame.payload)
+        if len(data) < udp_frame.udp_length:
+            self.error('error_payload_early_termination')
+            user = True
+        return set_user(udp_frame, user)
+
+class MAC10GModel(object):
+    # eth_mac_10g: padding and FCS insertion on transmit, FCS check and
+    # removal on receive
+    def __init__(self, testbench):
+        self.testbench = testbench
+        self.tx_sink = axis_ep.AXIStreamSink()
+        self.tx_source = xgmii_ep.XGMIISource()
+        self.rx_sink = xgmii_ep.XGMIISink()
+        self.rx_source = axis_ep.AXIStreamSource()
+
+    def transmit(self, frame):
+        data = bytearray(frame.data)
+        if len(data) < 60:
+            data += bytearray(60-len(data))
+        self.tx_source.send(PREAMBLE + data + fcs(data))
+
+    def receive(self, frame):
+        if bytes(frame.data[:8]) != PREAMBLE:
+            return
+        data, ok = check_fcs(frame.data[8:])
+        self.rx_source.send(axis_ep.AXIStreamFrame(data, user=None if ok else 1))
+
+    def create_logic(self, **signals):
+        self.tx_sink.stream(self.transmit)
+        self.rx_sink.stream(self.receive)
+
+        kw = ports(signals, 'tx_axis_')
+        tx_sink_logic = self.tx_sink.create_logic(signals['tx_clk'], signals['tx_rst'], **kw)
+
+        tx_source_logic = self.tx_source.create_logic(signals['tx_clk'], signals['tx_rst'],
+            txd=signals['xgmii_txd'], txc=signals['xgmii_txc'])
+
+        rx_sink_logic = self.rx_sink.create_logic(signals['rx_clk'], signals['rx_rst'],
+            rxd=signals['xgmii_rxd'], rxc=signals['xgmii_rxc'])
+
+        kw = ports(signals, 'rx_axis_')
+        rx_source_logic = self.rx_source.create_logic(signals['rx_clk'], signals['rx_rst'], **kw)
+
+        return tx_sink_logic, tx_source_logic, rx_sink_logic, rx_source_logic
+
+register('test_axis_eth_fcs_insert*', FCSInsertModel)
+register('test_axis_eth_fcs_check*', FCSCheckModel)
+for w in ('', '_64'):
+    register('test_eth_axis_tx%s' % w, EthAxisTxModel)
+    register('test_eth_axis_rx%s' % w, EthAxisRxModel)
+    register('test_ip_eth_tx%s' % w, IPEthTxModel)
+    register('test_ip_eth_rx%s' % w, IPEthRxModel)
+    register('test_udp_ip_tx%s' % w, UDPIPTxModel)
+    register('test_udp_ip_rx%s' % w, UDPIPRxModel)
+register('test_eth_mac_10g', MAC10GModel)
@@ -23,15 +23,22 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
+import axis_ep
+from collections import deque
 
 class GMIIFrame(object):
     def __init__(self, data=b'', error=None):
         self.data = b''
         self.error = None
+        self.first_beat_time = None
+        self.last_beat_time = None
 
         if type(data) is GMIIFrame:
             self.data = data.data
             self.error = data.error
+            self.first_beat_time = data.first_beat_time
+            self.last_beat_time = data.last_beat_time
         else:
             self.data = bytearray(data)
 
@@ -85,9 +92,12 @@ class GMIISource(object):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.wake = Signal(bool(0))
+        self.sent_hooks = []
 
     def send(self, frame):
         self.queue.append(GMIIFrame(frame))
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -101,24 +111,38 @@ class GMIISource(object):
                 txd,
                 tx_en,
                 tx_er,
+                ifg=12,
+                insert_preamble=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         assert len(txd) == 8
 
+        # minimum IFG in bytes, and whether send() data starts at the
+        # destination MAC instead of the preamble
+        self.bw = 1
+        self.ifg = ifg
+        self.insert_preamble = insert_preamble
+
         @instance
         def logic():
             frame = None
             d = []
             er = []
             ifg_cnt = 0
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame = None
@@ -129,6 +153,16 @@ class GMIISource(object):
                     er = []
                     ifg_cnt = 0
                 else:
+                    if frame is not None:
+                        # the byte driven at the previous edge is sampled now
+                        if frame.first_beat_time is None:
+                            frame.first_beat_time = now()
+                        if len(d) == 0:
+                            frame.last_beat_time = now()
+                            for hook in self.sent_hooks:
+                                hook(frame)
+                            frame = None
+
                     if ifg_cnt > 0:
                         ifg_cnt -= 1
                         txd.next = 0
@@ -139,10 +173,14 @@ class GMIISource(object):
                         tx_er.next = er.pop(0)
                         tx_en.next = 1
                         if len(d) == 0:
-                            ifg_cnt = 12
+                            ifg_cnt = ifg
                     elif len(self.queue) > 0:
                         frame = GMIIFrame(self.queue.pop(0))
+                        frame.first_beat_time = None
                         d, er = frame.build()
+                        if insert_preamble:
+                            d = [0x55]*7 + [0xd5] + d
+                            er = [0]*8 + er
                         if name is not None:
                             print("[%s] Sending frame %s" % (name, repr(frame)))
                         txd.next = d.pop(0)
@@ -153,13 +191,20 @@ class GMIISource(object):
                         tx_er.next = 0
                         tx_en.next = 0
 
-        return logic
+                idle = (suspend.enabled and not rst and
+                        ifg_cnt == 0 and len(d) == 0 and frame is None and len(self.queue) == 0)
+
+        return logic, edge.logic()
 
 
-class GMIISink(object):
+class GMIISink(axis_ep.SinkMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
+        self.recv_hooks = []
 
     def recv(self):
         if len(self.queue) > 0:
@@ -184,6 +229,7 @@ class GMIISink(object):
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         assert len(rxd) == 8
 
@@ -192,9 +238,14 @@ class GMIISink(object):
             frame = None
             d = []
             er = []
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # no frame in progress; wait for rx_dv or reset
+                    yield suspend.wait(clk, rst, rx_dv.posedge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame = None
@@ -204,19 +255,30 @@ class GMIISink(object):
                     if rx_dv:
                         if frame is None:
                             frame = GMIIFrame()
+                            frame.first_beat_time = now()
                             d = []
                             er = []
                         d.append(int(rxd))
                         er.append(int(rx_er))
+                        frame.last_beat_time = now()
                     elif frame is not None:
                         if len(d) > 0:
                             frame.parse(d, er)
-                            self.queue.append(frame)
+                            for hook in self.recv_hooks:
+                                hook(frame)
+                            if self.consumer is None:
+                                self.queue.append(frame)
+                            else:
+                                self.consumer(frame)
+                                self.history.append(frame)
+                            self.sync.next = not self.sync
                             if name is not None:
                                 print("[%s] Got frame %s" % (name, repr(frame)))
                         frame = None
                         d = []
                         er = []
 
+                idle = suspend.enabled and not rst and not rx_dv and frame is None
+
         return logic
 
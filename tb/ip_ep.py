@@ -23,9 +23,16 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
 import axis_ep
 import eth_ep
+import checksum
 import struct
+from collections import deque
+
+# patch header checksums incrementally in set_fields(); set to False to
+# recompute them in full instead, e.g. to cross check the patched values
+incremental_checksum = True
 
 class IPFrame(object):
     def __init__(self,
@@ -88,7 +95,7 @@ class IPFrame(object):
             payload = bytearray(payload)
         if type(payload) is bytearray or type(payload) is axis_ep.AXIStreamFrame:
             self.payload = axis_ep.AXIStreamFrame(payload)
-        if type(payload) is IPFrame:
+        if isinstance(payload, IPFrame):
             self.payload = axis_ep.AXIStreamFrame(payload.payload)
             self.eth_dest_mac = payload.eth_dest_mac
             self.eth_src_mac = payload.eth_src_mac
@@ -119,22 +126,28 @@ class IPFrame(object):
         self.ip_length = len(self.payload.data) + 20
 
     def calc_checksum(self):
-        cksum = self.ip_version << 12 | self.ip_ihl << 8 | self.ip_dscp << 2 | self.ip_ecn
-        cksum += self.ip_length
-        cksum += self.ip_identification
-        cksum += self.ip_flags << 13 | self.ip_fragment_offset
-        cksum += self.ip_ttl << 8 | self.ip_protocol
-        cksum += self.ip_source_ip & 0xffff
-        cksum += (self.ip_source_ip >> 16) & 0xffff
-        cksum += self.ip_dest_ip & 0xffff
-        cksum += (self.ip_dest_ip >> 16) & 0xffff
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        return ~cksum & 0xffff
+        return checksum.ip_header_checksum(self)
 
     def update_checksum(self):
         self.ip_header_checksum = self.calc_checksum()
 
+    def set_fields(self, full=False, **fields):
+        # set header fields by keyword, patching a header checksum that is
+        # already set for the changes (RFC 1624) rather than leaving it
+        # stale; full=True recomputes it from the whole header instead
+        old = {}
+        for name, value in fields.items():
+            if not hasattr(self, name):
+                raise Exception("Unknown field %s" % name)
+            old[name] = getattr(self, name)
+            setattr(self, name, value)
+        if self.ip_header_checksum is None or 'ip_header_checksum' in fields:
+            return
+        if full or not incremental_checksum or None in old.values():
+            self.update_checksum()
+        else:
+            self.ip_header_checksum = checksum.update_ip_header_checksum(self.ip_header_checksum, old, fields)
+
     def build(self):
         if self.ip_length is None:
             self.update_length()
@@ -193,7 +206,7 @@ class IPFrame(object):
         self.payload = axis_ep.AXIStreamFrame(data.payload.data[20:self.ip_length])
 
     def __eq__(self, other):
-        if type(other) is IPFrame:
+        if isinstance(other, IPFrame):
             return (
                     self.eth_src_mac == other.eth_src_mac and
                     self.eth_dest_mac == other.eth_dest_mac and
@@ -237,12 +250,13 @@ class IPFrame(object):
             )
 
 
-class IPFrameSource():
+class IPFrameSource(axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
         self.payload_source = axis_ep.AXIStreamSource()
         self.header_queue = []
+        self.wake = Signal(bool(0))
 
     def send(self, frame):
         frame = IPFrame(frame)
@@ -251,6 +265,7 @@ class IPFrameSource():
             self.payload_source.send(frame.payload)
         else:
             self.queue.append(frame)
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -286,12 +301,14 @@ class IPFrameSource():
                 ip_payload_tlast=Signal(bool(False)),
                 ip_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         ip_hdr_ready_int = Signal(bool(False))
         ip_hdr_valid_int = Signal(bool(False))
@@ -307,6 +324,7 @@ class IPFrameSource():
             tlast=ip_payload_tlast,
             tuser=ip_payload_tuser,
             pause=ip_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -317,14 +335,23 @@ class IPFrameSource():
 
         @instance
         def logic():
+            active = False
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     ip_hdr_valid_int.next = False
+                    active = False
                 else:
                     if ip_hdr_ready_int:
                         ip_hdr_valid_int.next = False
+                        active = False
                     if (ip_hdr_ready_int and ip_hdr_valid) or not ip_hdr_valid_int:
                         if len(self.header_queue) > 0:
                             frame = self.header_queue.pop(0)
@@ -350,19 +377,26 @@ class IPFrameSource():
                                 print("[%s] Sending frame %s" % (name, repr(frame)))
 
                             ip_hdr_valid_int.next = True
+                            active = True
 
                     if len(self.queue) > 0 and len(self.header_queue) == 0:
                         frame = self.queue.pop(0)
                         self.header_queue.append(frame)
                         self.payload_source.send(frame.payload)
 
-        return logic, pause_logic, ip_payload_source
+                idle = (suspend.enabled and not rst and not active and
+                        len(self.header_queue) == 0 and len(self.queue) == 0)
 
+        return logic, pause_logic, ip_payload_source, edge.logic()
 
-class IPFrameSink():
+
+class IPFrameSink(axis_ep.SinkMixin, axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
         self.payload_sink = axis_ep.AXIStreamSink()
         self.header_queue = []
 
@@ -405,12 +439,14 @@ class IPFrameSink():
                 ip_payload_tlast=Signal(bool(True)),
                 ip_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         ip_hdr_ready_int = Signal(bool(False))
         ip_hdr_valid_int = Signal(bool(False))
@@ -425,7 +461,8 @@ class IPFrameSink():
             tready=ip_payload_tready,
             tlast=ip_payload_tlast,
             tuser=ip_payload_tuser,
-            pause=ip_payload_pause
+            pause=ip_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -436,8 +473,14 @@ class IPFrameSink():
 
         @instance
         def logic():
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing pending; wait for a header, a payload or reset
+                    yield suspend.wait(clk, rst, ip_hdr_valid_int.posedge, self.payload_sink.sync)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     ip_hdr_ready_int.next = False
@@ -467,7 +510,12 @@ class IPFrameSink():
                     if not self.payload_sink.empty() and len(self.header_queue) > 0:
                         frame = self.header_queue.pop(0)
                         frame.payload = self.payload_sink.recv()
-                        self.queue.append(frame)
+                        if self.consumer is None:
+                            self.queue.append(frame)
+                        else:
+                            self.consumer(frame)
+                            self.history.append(frame)
+                        self.sync.next = not self.sync
 
                         if name is not None:
                             print("[%s] Got frame %s" % (name, repr(frame)))
@@ -476,5 +524,8 @@ class IPFrameSink():
                         if len(self.header_queue) == 0:
                             assert self.payload_sink.empty()
 
+                idle = (suspend.enabled and not rst and ip_hdr_ready_int and not ip_hdr_valid_int and
+                        (len(self.header_queue) == 0 or self.payload_sink.empty()))
+
         return logic, pause_logic, ip_payload_sink
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import run_tests
+
+# representative benches, frames sent per port by their throughput stage,
+# and clock period
+benches = [
+    ('lib/axis/tb/test_axis_fifo_64.py', 2000, 8),
+    ('lib/axis/tb/test_axis_switch_64_4x4.py', 500, 8),
+    ('tb/test_eth_mac_10g.py', 500, 8),
+    ('tb/test_udp_complete_64.py', 500, 8),
+    ('example/HXT100G/fpga/tb/test_fpga_core.py', 200, 8),
+]
+
+def cpu_time(r):
+    return r.ru_utime + r.ru_stime
+
+def max_rss(r):
+    # ru_maxrss is in kilobytes on Linux
+    return r.ru_maxrss * 1024
+
+def reap_with_wait4(child, usage):
+    # Simulation reaps vvp with child.wait() when it finishes; use wait4 so
+    # that the usage of the vvp process itself is kept, as RUSAGE_CHILDREN
+    # also covers the iverilog compile run by bench()
+    def wait(timeout=None):
+        if child.returncode is None:
+            pid, status, usage[child.pid] = os.wait4(child.pid, 0)
+            child.returncode = os.waitstatus_to_exitcode(status)
+        return child.returncode
+
+    child.wait = wait
+
+def run_child(name, frames):
+    # run the throughput stage of one bench and print the measurements
+    import myhdl
+
+    sys.path.insert(0, os.path.dirname(name))
+    import throughput
+    throughput.frames = frames
+    mod = importlib.import_module(os.path.basename(name)[:-3])
+
+    # bench() builds the testbench and starts vvp
+    tb = mod.bench()
+
+    sim = myhdl.Simulation(tb)
+
+    vvp_usage = {}
+    for c in sim._cosims:
+        reap_with_wait4(c._child, vvp_usage)
+
+    py_cpu = cpu_time(resource.getrusage(resource.RUSAGE_SELF))
+    start = time.time()
+
+    sim.run(quiet=1)
+
+    # vvp has exited and been reaped; with verilator or the models there is
+    # no vvp process and everything runs in Python
+    result = {
+        'wall': time.time() - start,
+        'sim_time': myhdl.now(),
+        'python_cpu': cpu_time(resource.getrusage(resource.RUSAGE_SELF)) - py_cpu,
+        'vvp_cpu': sum(cpu_time(r) for r in vvp_usage.values()),
+        'python_rss': max_rss(resource.getrusage(resource.RUSAGE_SELF)),
+        'vvp_rss': max([max_rss(r) for r in vvp_usage.values()] or [0])
+    }
+
+    print('perf_sim: ' + json.dumps(result))
+
+def run_bench(name, frames, period, work, sim='icarus'):
+    cwd = run_tests.make_scratch(os.path.join(work, sim), name)
+
+    env = dict(os.environ, SIM=sim)
+    p = subprocess.Popen([sys.executable, os.path.realpath(__file__), '--child', os.path.join(run_tests.root, name), str(frames)],
+        cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    out = p.communicate()[0].decode()
+
+    r = None
+    for l in out.splitlines():
+        if l.startswith('perf_sim: '):
+            r = json.loads(l[10:])
+
+    if p.returncode or r is None:
+        print(out[-4000:])
+        return None
+
+    cycles = r['sim_time'] / period
+    r['cycles'] = cycles
+    r['frames'] = frames
+    r['cycles_per_s'] = cycles / r['wall']
+    r['frames_per_s'] = frames / r['wall']
+    r['python_fraction'] = r['python_cpu'] / max(r['python_cpu'] + r['vvp_cpu'], 1e-9)
+    return r
+
+def key(name, sim):
+    # history entries for the default simulator keep the plain bench name
+    return name if sim == 'icarus' else '%s [%s]' % (name, sim)
+
+def run_sim(name, sim, frames, period, work, threshold, prev, results, slow):
+    r = run_bench(name, frames, period, work, sim)
+    k = key(name, sim)
+    if r is None:
+        print("%-45s FAILED" % k)
+        return
+
+    r['sim'] = sim
+    results[k] = r
+
+    change = ''
+    if k in prev and r['frames'] == prev[k]['frames']:
+        d = (r['cycles_per_s'] / prev[k]['cycles_per_s'] - 1) * 100
+        change = '%+6.1f%%' % d
+        if d < -threshold:
+            slow.append(k)
+
+    print("%-45s %9.0f cycles/s %7.1f frames/s  python %3.0f%%  rss %4.0f/%4.0f MB %s" % (k,
+        r['cycles_per_s'], r['frames_per_s'], r['python_fraction']*100,
+        r['python_rss']/2**20, r['vvp_rss']/2**20, change))
+
+def git_rev():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=run_tests.root, stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure co-simulation speed")
+    parser.add_argument('patterns', nargs='*', help="only run benches matching these names")
+    parser.add_argument('--history', default='perf_sim.json', help="JSON history file to append to")
+    parser.add_argument('--scale', type=float, default=1.0, help="scale the number of frames")
+    parser.add_argument('--sim', default='icarus', help="comma separated simulators to run each bench on (icarus, verilator)")
+    parser.add_argument('--threshold', type=float, default=10.0, help="flag slowdowns larger than this many percent")
+    parser.add_argument('--child', nargs=2, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if resource is None:
+        print("perf_sim needs the resource module")
+        return 1
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return 0
+
+    history = []
+    if os.path.isfile(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+
+    # most recent earlier result for each bench
+    prev = {}
+    for h in history:
+        prev.update(h['results'])
+
+    work = tempfile.mkdtemp(prefix='perf-sim-')
+    results = {}
+    slow = []
+
+    sims = args.sim.split(',')
+
+    for name, frames, period in benches:
+        if args.patterns and not any(p in name for p in args.patterns):
+            continue
+
+        for sim in sims:
+            run_sim(name, sim, max(1, int(frames*args.scale)), period, work, args.threshold, prev, results, slow)
+
+        if len(sims) > 1 and all(key(name, s) in results for s in sims):
+            # speed of each simulator relative to the first, kept in the
+            # history so the comparison can be followed across revisions
+            base = results[key(name, sims[0])]['cycles_per_s']
+            for s in sims[1:]:
+                results[key(name, s)]['speedup'] = results[key(name, s)]['cycles_per_s'] / base
+            print("%-45s %s" % ('', '  '.join('%s %.2fx' % (s, results[key(name, s)]['speedup']) for s in sims[1:])))
+
+    shutil.rmtree(work)
+
+    if results:
+        history.append({
+            'date': datetime.datetime.now().isoformat(),
+            'rev': git_rev(),
+            'results': results
+        })
+
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2, sort_keys=True)
+
+    for name in slow:
+        print("slower than the previous run by more than %.0f%%: %s" % (args.threshold, name))
+
+    return 1 if slow else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
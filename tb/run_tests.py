@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import argparse
+import fnmatch
+import glob
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import xml.etree.ElementTree as ET
+
+root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# directories searched for test_*.py benches, relative to the repository root
+test_dirs = ['tb', 'lib/axis/tb', 'example/*/*/tb']
+
+# written into every scratch directory the runner creates, so that -w only
+# ever cleans out a directory that it made itself
+marker = '.run_tests'
+
+def find_tests(patterns=None):
+    tests = []
+    for d in test_dirs:
+        for f in sorted(glob.glob(os.path.join(root, d, 'test_*.py'))):
+            name = os.path.relpath(f, root)
+            if patterns and not any(fnmatch.fnmatch(name, p) or p in name for p in patterns):
+                continue
+            tests.append(name)
+    return tests
+
+def make_scratch(work, name):
+    # mirror the test directory and its siblings with symlinks so that the
+    # relative source paths in the bench resolve while the .vvp and dump
+    # files land in a private directory
+    src = os.path.dirname(os.path.join(root, name))
+    parent = os.path.dirname(src)
+    base = os.path.join(work, name.replace(os.sep, '_').replace('.py', ''))
+    cwd = os.path.join(base, os.path.basename(src))
+    os.makedirs(cwd)
+
+    for f in os.listdir(parent):
+        if f != os.path.basename(src):
+            os.symlink(os.path.join(parent, f), os.path.join(base, f))
+
+    for f in os.listdir(src):
+        if f == '__pycache__' or f.endswith(('.vvp', '.lxt', '.vcd', '_vl')):
+            continue
+        os.symlink(os.path.join(src, f), os.path.join(cwd, f))
+
+    return cwd
+
+def run_test(name, work, timeout=None, profile=False):
+    cwd = make_scratch(work, name)
+    log = os.path.join(cwd, 'run.log')
+
+    result = {'name': name, 'status': 'fail', 'time': 0.0, 'sim_time': None, 'log': log}
+
+    # run the bench through its symlink in the scratch directory, as benches
+    # chdir to the directory of __file__ before building
+    cmd = [sys.executable, os.path.realpath(__file__), '--child', os.path.join(cwd, os.path.basename(name))]
+    if profile:
+        cmd.append('--profile')
+
+    start = time.time()
+    with open(log, 'w') as f:
+        p = subprocess.Popen(cmd, cwd=cwd, stdout=f, stderr=subprocess.STDOUT)
+        try:
+            ret = p.wait(timeout)
+        except subprocess.TimeoutExpired:
+            p.kill()
+            p.wait()
+            result['status'] = 'timeout'
+            ret = None
+    result['time'] = time.time() - start
+
+    with open(log) as f:
+        lines = f.read().splitlines()
+
+    for l in reversed(lines):
+        if l.startswith('sim_time: '):
+            result['sim_time'] = int(l.split()[1])
+            break
+
+    # benches built on session.Session report each scenario separately
+    scenarios = []
+    for l in lines:
+        if l.startswith('scenario: '):
+            n, status, sim_time, t = l[10:].rsplit(' ', 3)
+            scenarios.append({'name': n, 'status': status, 'sim_time': int(sim_time), 'time': float(t)})
+    if scenarios:
+        result['scenarios'] = scenarios
+
+    if profile and os.path.isfile(os.path.join(cwd, 'profile.json')):
+        with open(os.path.join(cwd, 'profile.json')) as f:
+            result['profile'] = json.load(f)
+
+    if ret == 0:
+        result['status'] = 'pass'
+        for l in lines:
+            if l.startswith('skip: '):
+                result['status'] = 'skip'
+                result['output'] = l[6:]
+    else:
+        result['output'] = '\n'.join(lines[-50:])
+
+    return result
+
+def run_script(name):
+    # run a bench as a script and report the simulated time it reached, or
+    # why it was skipped (e.g. no model with SIM=model)
+    import myhdl
+    try:
+        runpy.run_path(name, run_name='__main__')
+    except unittest.SkipTest as e:
+        print('skip: %s' % e)
+        return
+    print('sim_time: %d' % myhdl.now())
+
+def run_child(name, profile=False):
+    import myhdl
+    sys.path.insert(0, os.path.dirname(name))
+    sys.argv = [name]
+
+    if not profile:
+        run_script(name)
+        return
+
+    # benches pick up Simulation via 'from myhdl import *', so swap it
+    # before the bench is loaded
+    import sim_profile
+    myhdl.Simulation = sim_profile.ProfiledSimulation
+
+    try:
+        run_script(name)
+    finally:
+        stats = []
+        for p in sim_profile.profilers:
+            print(p.report())
+            stats.append({'total': p.total, 'instances': dict((k, {'time': t, 'wakeups': n}) for k, (t, n) in p.stats.items())})
+        with open('profile.json', 'w') as f:
+            json.dump(stats, f, indent=2, sort_keys=True)
+
+def write_json(results, file_name):
+    with open(file_name, 'w') as f:
+        json.dump({'tests': results}, f, indent=2, sort_keys=True)
+
+def write_junit(results, file_name):
+    scenarios = [s for r in results for s in r.get('scenarios', [])]
+    suite = ET.Element('testsuite', name='verilog-ethernet', tests=str(len(results)+len(scenarios)),
+        failures=str(sum(r['status'] not in ('pass', 'skip') for r in results+scenarios)),
+        skipped=str(sum(r['status'] == 'skip' for r in results)),
+        time='%.3f' % sum(r['time'] for r in results))
+
+    for r in results:
+        case = ET.SubElement(suite, 'testcase', classname=os.path.dirname(r['name']).replace(os.sep, '.'),
+            name=os.path.basename(r['name']), time='%.3f' % r['time'])
+        if r['status'] == 'skip':
+            ET.SubElement(case, 'skipped', message=r.get('output', ''))
+        elif r['status'] != 'pass':
+            e = ET.SubElement(case, 'failure', message=r['status'])
+            e.text = r.get('output', '')
+        if r['sim_time'] is not None:
+            ET.SubElement(case, 'system-out').text = 'sim_time: %d' % r['sim_time']
+        for s in r.get('scenarios', []):
+            case = ET.SubElement(suite, 'testcase', classname=os.path.splitext(r['name'])[0].replace(os.sep, '.'),
+                name=s['name'], time='%.3f' % s['time'])
+            if s['status'] != 'pass':
+                ET.SubElement(case, 'failure', message=s['status'])
+            ET.SubElement(case, 'system-out').text = 'sim_time: %d' % s['sim_time']
+
+    ET.ElementTree(suite).write(file_name, encoding='utf-8', xml_declaration=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run testbenches in parallel")
+    parser.add_argument('patterns', nargs='*', help="only run tests matching these names or globs")
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(), help="number of tests to run at once")
+    parser.add_argument('-t', '--timeout', type=float, default=None, help="per-test timeout in seconds")
+    parser.add_argument('-w', '--work', default=None, help="scratch directory, must be empty or from an earlier run (default: temporary, removed afterwards)")
+    parser.add_argument('--json', default=None, help="write JSON report; an existing report is used to start the slowest tests first")
+    parser.add_argument('--junit', default=None, help="write JUnit XML report")
+    parser.add_argument('-l', '--list', action='store_true', help="list tests and exit")
+    parser.add_argument('--profile', action='store_true', help="profile time spent in each endpoint and in the cosimulation pipe")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.profile)
+        return 0
+
+    tests = find_tests(args.patterns)
+
+    if args.list:
+        for t in tests:
+            print(t)
+        return 0
+
+    # start the longest tests first so the slowest one is not left until last
+    if args.json and os.path.isfile(args.json):
+        with open(args.json) as f:
+            prev = dict((r['name'], r['time']) for r in json.load(f)['tests'])
+        tests.sort(key=lambda t: -prev.get(t, float('inf')))
+
+    work = args.work
+    if work is None:
+        work = tempfile.mkdtemp(prefix='verilog-ethernet-')
+    else:
+        work = os.path.abspath(work)
+        if os.path.exists(work) and os.listdir(work):
+            if not os.path.isfile(os.path.join(work, marker)):
+                print("%s is not empty and was not created by run_tests.py, refusing to use it" % work)
+                return 2
+            shutil.rmtree(work)
+        if not os.path.exists(work):
+            os.makedirs(work)
+    open(os.path.join(work, marker), 'w').close()
+
+    results = []
+    pending = list(tests)
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                name = pending.pop(0)
+            r = run_test(name, work, args.timeout, args.profile)
+            with lock:
+                results.append(r)
+                print("%-7s %-60s %8.1f s" % (r['status'].upper(), name, r['time']))
+                sys.stdout.flush()
+
+    start = time.time()
+    threads = [threading.Thread(target=worker) for i in range(max(1, args.jobs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.time() - start
+
+    results.sort(key=lambda r: r['name'])
+    failed = [r for r in results if r['status'] not in ('pass', 'skip')]
+    skipped = [r for r in results if r['status'] == 'skip']
+
+    if args.json:
+        write_json(results, args.json)
+    if args.junit:
+        write_junit(results, args.junit)
+
+    print("%d passed, %d skipped, %d failed in %.1f s (%.1f s total test time)" % (
+        len(results)-len(failed)-len(skipped), len(skipped), len(failed), wall, sum(r['time'] for r in results)))
+    for r in failed:
+        print("%s: %s, log in %s" % (r['status'].upper(), r['name'], r['log']))
+
+    if args.work is None and not failed:
+        shutil.rmtree(work)
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
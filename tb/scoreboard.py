@@ -0,0 +1 @@
+../lib/axis/tb/scoreboard.py
\ No newline at end of file
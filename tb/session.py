@@ -0,0 +1 @@
+../lib/axis/tb/session.py
\ No newline at end of file
@@ -0,0 +1 @@
+../lib/axis/tb/sim_profile.py
\ No newline at end of file
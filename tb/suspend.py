@@ -0,0 +1 @@
+../lib/axis/tb/suspend.py
\ No newline at end of file
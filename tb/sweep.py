@@ -0,0 +1,513 @@
+#!/usr/bin/env python
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import run_tests
+
+# directories holding the module generators and the fixed modules they use
+rtl_dirs = ['rtl', 'lib/axis/rtl']
+
+# generators covered by the sweep; each is run for the 8 bit and the _64
+# variant
+kinds = [
+    'axis_mux', 'axis_arb_mux', 'axis_demux', 'axis_switch',
+    'eth_mux', 'eth_arb_mux', 'eth_demux',
+    'ip_mux', 'ip_arb_mux', 'ip_demux',
+    'udp_mux', 'udp_arb_mux', 'udp_demux'
+]
+
+verilog_keywords = ['module', 'always', 'assign', 'begin', 'end', 'case', 'if', 'else', 'initial', 'for', 'generate', 'wire', 'reg', 'integer']
+
+def module_name(kind, ports, width):
+    kind = kind if width == 8 else kind + '_64'
+    if kind.startswith('axis_switch'):
+        return '%s_%dx%d' % (kind, ports, ports)
+    return '%s_%d' % (kind, ports)
+
+def find_source(name):
+    # fixed module in one of the rtl directories, or None
+    for d in rtl_dirs:
+        f = os.path.join(run_tests.root, d, name + '.v')
+        if os.path.isfile(f):
+            return f
+    return None
+
+def generate(name, srcs):
+    # generate module name (and the generated modules it instantiates) in
+    # the current directory, and add them and their fixed dependencies to
+    # srcs
+    m = re.match(r'(\w+?)_(\d+)(?:x(\d+))?$', name)
+    gen = importlib.import_module(m.group(1))
+    if m.group(3):
+        gen.generate(ports=[int(m.group(2)), int(m.group(3))], name=name)
+    else:
+        gen.generate(ports=int(m.group(2)), name=name)
+    srcs.append(name + '.v')
+    add_dependencies(name + '.v', srcs)
+
+def add_dependencies(file_name, srcs):
+    with open(file_name) as f:
+        text = f.read()
+
+    for sub in re.findall(r'^\s*(\w+)\s*(?:#\s*\(|\w+\s*\()', text, re.M):
+        if sub in verilog_keywords:
+            continue
+        f = find_source(sub)
+        if f is not None:
+            if f not in srcs:
+                srcs.append(f)
+                add_dependencies(f, srcs)
+        elif sub + '.v' not in srcs and re.match(r'\w+_\d+(x\d+)?$', sub):
+            generate(sub, srcs)
+
+def eval_param(value, params):
+    value = re.sub(r"\d*'([bdh])([0-9a-fA-F_]+)", lambda m: str(int(m.group(2).replace('_', ''), {'b': 2, 'd': 10, 'h': 16}[m.group(1)])), value)
+    try:
+        return eval(value.replace('/', '//'), {}, dict(params))
+    except Exception:
+        return None
+
+def parse_module(file_name):
+    # parameter defaults and (direction, name, width) ports of the module
+    with open(file_name) as f:
+        text = f.read()
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'//.*', '', text)
+
+    start = text.index('module')
+    header = text[start:text.index(');', start)]
+
+    params = {}
+    for k, v in re.findall(r'parameter\s+(\w+)\s*=\s*([^,\n]+)', header):
+        params[k] = eval_param(v.strip(), params)
+
+    ports = []
+    for d, msb, lsb, n in re.findall(r'\b(input|output)\s+wire\s*(?:\[([^:\]]+):([^\]]+)\])?\s*(\w+)', header):
+        w = eval_param(msb, params) - eval_param(lsb, params) + 1 if msb else 1
+        ports.append((d, n, w))
+
+    return params, ports
+
+def write_testbench(name, ports):
+    # testbench module connecting every DUT port to MyHDL
+    testbench = 'test_%s' % name
+    inputs = [p for p in ports if p[0] == 'input' and p[1] not in ('clk', 'rst')]
+    outputs = [p for p in ports if p[0] == 'output']
+
+    def decl(t, w, n):
+        return '%s %s%s' % (t, '[%d:0] ' % (w-1) if w > 1 else '', n)
+
+    l = []
+    l.append('// Language: Verilog 2001')
+    l.append('')
+    l.append('`timescale 1ns / 1ps')
+    l.append('')
+    l.append('/*')
+    l.append(' * Testbench for %s, generated by sweep.py' % name)
+    l.append(' */')
+    l.append('module %s;' % testbench)
+    l.append('')
+    l.append('// Inputs')
+    l.append('reg clk = 0;')
+    l.append('reg rst = 0;')
+    l.append('reg [7:0] current_test = 0;')
+    l.append('')
+    for d, n, w in inputs:
+        l.append(decl('reg', w, n) + ' = 0;')
+    l.append('')
+    l.append('// Outputs')
+    for d, n, w in outputs:
+        l.append(decl('wire', w, n) + ';')
+    l.append('')
+    l.append('initial begin')
+    l.append('    // myhdl integration')
+    l.append('    $from_myhdl(')
+    l.append(',\n'.join('        ' + n for n in ['clk', 'rst', 'current_test'] + [p[1] for p in inputs]))
+    l.append('    );')
+    l.append('    $to_myhdl(')
+    l.append(',\n'.join('        ' + p[1] for p in outputs))
+    l.append('    );')
+    l.append('end')
+    l.append('')
+    l.append(name)
+    l.append('UUT (')
+    l.append(',\n'.join('    .%s(%s)' % (p[1], p[1]) for p in ports))
+    l.append(');')
+    l.append('')
+    l.append('endmodule')
+
+    with open(testbench + '.v', 'w') as f:
+        f.write('\n'.join(l) + '\n')
+
+    return testbench
+
+def interfaces(ports, direction):
+    # (prefix, protocol) of each AXI stream or frame interface, in port order
+    l = []
+    for d, n, w in ports:
+        m = re.match(r'(%s_(?:\d+_)?)(?:(axis)_tdata|(eth|ip|udp)_hdr_valid)$' % direction, n)
+        if m:
+            if m.group(2):
+                l.append((m.group(1) + 'axis_', 'axis'))
+            else:
+                l.append((m.group(1), m.group(3)))
+    return l
+
+def stream(prefix, proto, sig):
+    # name of a payload stream signal of an interface
+    return prefix + ('t' if proto == 'axis' else proto + '_payload_t') + sig
+
+def make_frame(proto, src, dst, seq, length):
+    # the destination, source and sequence number lead the payload so that
+    # every frame is distinct
+    payload = bytearray([dst, src, seq >> 8, seq & 0xff]) + bytearray(i & 0xff for i in range(max(0, length-4)))
+
+    import axis_ep
+    import eth_ep
+    import ip_ep
+    import udp_ep
+
+    if proto == 'axis':
+        return axis_ep.AXIStreamFrame(payload, dest=dst)
+
+    frame = {'eth': eth_ep.EthFrame, 'ip': ip_ep.IPFrame, 'udp': udp_ep.UDPFrame}[proto]()
+    frame.eth_dest_mac = 0x020000000000 | dst
+    frame.eth_src_mac = 0x020000000100 | src
+    frame.eth_type = 0x0800 if proto != 'eth' else 0x8000
+    if proto != 'eth':
+        frame.ip_version = 4
+        frame.ip_ihl = 5
+        frame.ip_dscp = 0
+        frame.ip_ecn = 0
+        frame.ip_length = None
+        frame.ip_identification = seq
+        frame.ip_flags = 2
+        frame.ip_fragment_offset = 0
+        frame.ip_ttl = 64
+        frame.ip_protocol = 0x11
+        frame.ip_header_checksum = None
+        frame.ip_source_ip = 0xc0a80100 | src
+        frame.ip_dest_ip = 0xc0a80200 | dst
+    if proto == 'udp':
+        frame.udp_source_port = 1000 + src
+        frame.udp_dest_port = 2000 + dst
+        frame.udp_length = None
+        frame.udp_checksum = None
+    frame.payload = payload
+    if proto != 'eth':
+        frame.build()
+    return frame
+
+def run_child(kind, ports, width, frames, length):
+    # generate, build and run one configuration and print the result
+    from myhdl import Signal, intbv, always, instance, delay, now, Simulation, StopSimulation
+
+    for d in rtl_dirs:
+        sys.path.insert(0, os.path.join(run_tests.root, d))
+    sys.path.insert(0, os.path.join(run_tests.root, 'tb'))
+
+    import cosim
+    import axis_ep
+    import eth_ep
+    import ip_ep
+    import udp_ep
+    import scoreboard
+
+    name = module_name(kind, ports, width)
+    srcs = []
+    generate(name, srcs)
+    params, port_list = parse_module(name + '.v')
+    testbench = write_testbench(name, port_list)
+    srcs.append(testbench + '.v')
+
+    build_cmd = "iverilog -o %s.vvp %s" % (testbench, ' '.join(srcs))
+
+    if cosim.build(testbench, srcs, build_cmd):
+        raise Exception("Error running build command")
+
+    clk = Signal(bool(0))
+    rst = Signal(bool(0))
+    current_test = Signal(intbv(0)[8:])
+
+    signals = {}
+    for d, n, w in port_list:
+        if n not in ('clk', 'rst'):
+            signals[n] = Signal(bool(0)) if w == 1 else Signal(intbv(0)[w:])
+
+    dut = cosim.Cosimulation(testbench, clk=clk, rst=rst, current_test=current_test, **signals)
+
+    ep = {'axis': axis_ep, 'eth': eth_ep, 'ip': ip_ep, 'udp': udp_ep}
+    cls = {'axis': 'AXIStream', 'eth': 'EthFrame', 'ip': 'IPFrame', 'udp': 'UDPFrame'}
+
+    def connect(prefix, proto, kind, index):
+        e = getattr(ep[proto], cls[proto] + kind)()
+        kw = dict((n[len(prefix):], s) for n, s in signals.items() if n.startswith(prefix))
+        kw['name'] = '%s_%d' % (kind.lower(), index)
+        return e, e.create_logic(clk, rst, **kw)
+
+    ins = interfaces(port_list, 'input')
+    outs = interfaces(port_list, 'output')
+    proto = ins[0][1]
+    sources = [connect(p, t, 'Source', i) for i, (p, t) in enumerate(ins)]
+    sinks = [connect(p, t, 'Sink', i) for i, (p, t) in enumerate(outs)]
+    logic = [e[1] for e in sources + sinks]
+
+    # traffic: every source sends the same number of frames, spread over
+    # all outputs
+    sent = []
+    for seq in range(frames * (len(outs) if len(ins) == 1 else 1)):
+        for src in range(len(ins)):
+            dst = (src + seq) % len(outs)
+            sent.append((src, dst, seq))
+
+    enable = signals.get('enable')
+    select = signals.get('select')
+
+    if select is not None and len(ins) == 1:
+        # demux: route on the destination carried by the frame, which the
+        # demux samples at the start of each frame
+        route = signals[ins[0][0] + 'tdata' if proto == 'axis' else 'input_eth_dest_mac']
+        mask = 2**len(select)-1
+
+        @always(route)
+        def router():
+            select.next = int(route) & 0xff & mask
+
+        logic.append(router)
+
+    elif select is not None:
+        # mux: select each input in turn, moving on when the selected input
+        # finishes a frame
+        valid = [signals[stream(p, t, 'valid')] for p, t in ins]
+        ready = [signals[stream(p, t, 'ready')] for p, t in ins]
+        last = [signals[stream(p, t, 'last')] for p, t in ins]
+
+        @instance
+        def router():
+            while True:
+                yield clk.posedge
+                p = int(select)
+                if valid[p] and ready[p] and last[p]:
+                    select.next = (p + 1) % len(ins)
+
+        logic.append(router)
+
+    @always(delay(4))
+    def clkgen():
+        clk.next = not clk
+
+    result = {'status': 'fail', 'inputs': len(ins), 'outputs': len(outs), 'width': width, 'frames': len(sent)}
+
+    @instance
+    def check():
+        yield delay(100)
+        yield clk.posedge
+        rst.next = 1
+        yield clk.posedge
+        rst.next = 0
+        yield clk.posedge
+        yield delay(100)
+        yield clk.posedge
+
+        if enable is not None:
+            enable.next = 1
+            yield clk.posedge
+
+        board = scoreboard.Scoreboard()
+        for i, (sink, l) in enumerate(sinks):
+            board.add_sink(sink, i)
+
+        total = 0
+        for src, dst, seq in sent:
+            frame = make_frame(proto, src, dst, seq, length)
+            board.expect(frame, src, dst)
+            total += length
+            sources[src][0].send(frame)
+
+        beats = total // (width // 8) + len(sent) * 8
+        start = now()
+
+        yield board.wait(clk, 10 * beats + 1000)
+
+        result['cycles'] = (now() - start) // 8
+        result['bytes'] = board.matched * length
+        result['received'] = board.matched
+        result['errors'] = board.report().splitlines()[1:11]
+        result['status'] = 'pass' if board.passed() else 'fail'
+
+        raise StopSimulation
+
+    sim = Simulation(dut, clkgen, check, *logic)
+    start = time.time()
+    sim.run(quiet=1)
+    result['wall'] = time.time() - start
+
+    print('sweep: ' + json.dumps(result))
+    return 0 if result['status'] == 'pass' else 1
+
+def run_config(kind, ports, width, args, work):
+    name = module_name(kind, ports, width)
+    cwd = os.path.join(work, name)
+    os.makedirs(cwd)
+    # vvp looks for myhdl.vpi in the current directory
+    for f in glob.glob(os.path.join(run_tests.root, 'tb', '*.vpi')):
+        os.symlink(f, os.path.join(cwd, os.path.basename(f)))
+
+    cmd = [sys.executable, os.path.realpath(__file__), '--child', kind, str(ports), str(width), str(args.frames), str(args.length)]
+
+    start = time.time()
+    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        out = p.communicate(timeout=args.timeout)[0].decode()
+    except subprocess.TimeoutExpired:
+        p.kill()
+        out = p.communicate()[0].decode()
+        out += '\ntimeout'
+
+    r = {'status': 'fail'}
+    for l in out.splitlines():
+        if l.startswith('sweep: '):
+            r = json.loads(l[7:])
+
+    r['name'] = name
+    r['kind'] = kind
+    r['ports'] = ports
+    r['width'] = width
+    r['time'] = time.time() - start
+
+    if r.get('cycles'):
+        # best case is every input or output (whichever is fewer) moving one
+        # beat per cycle
+        r['bytes_per_cycle'] = float(r['bytes']) / r['cycles']
+        r['capacity'] = min(r['inputs'], r['outputs']) * width // 8
+        r['efficiency'] = r['bytes_per_cycle'] / r['capacity']
+
+    if r['status'] != 'pass':
+        r['output'] = '\n'.join(out.splitlines()[-30:])
+
+    return r
+
+def report(results):
+    print("%-24s %-6s %8s %10s %8s %6s %7s" % ('module', 'result', 'cycles', 'bytes/cyc', 'capacity', 'eff', 'wall'))
+    for r in results:
+        if 'bytes_per_cycle' in r:
+            print("%-24s %-6s %8d %10.2f %8d %5.0f%% %6.1fs" % (r['name'], r['status'],
+                r['cycles'], r['bytes_per_cycle'], r['capacity'], r['efficiency']*100, r['time']))
+        else:
+            print("%-24s %-6s %8s %10s %8s %6s %6.1fs" % (r['name'], r['status'], '-', '-', '-', '-', r['time']))
+        for e in r.get('errors', []):
+            print("    %s" % e)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run generated muxes, demuxes and switches over a grid of port counts and widths")
+    parser.add_argument('kinds', nargs='*', help="generators to sweep (default: %s)" % ' '.join(kinds))
+    parser.add_argument('-p', '--ports', default='2,4,8,16,32', help="comma separated port counts")
+    parser.add_argument('-w', '--width', default='8,64', help="comma separated datapath widths (8, 64)")
+    parser.add_argument('--frames', type=int, default=16, help="frames sent per input and output")
+    parser.add_argument('--length', type=int, default=64, help="frame payload length")
+    parser.add_argument('-j', '--jobs', type=int, default=run_tests.multiprocessing.cpu_count(), help="number of configurations to run at once")
+    parser.add_argument('--timeout', type=float, default=1800, help="per configuration timeout in seconds")
+    parser.add_argument('--json', help="write the results to this JSON file")
+    parser.add_argument('--keep', action='store_true', help="keep the generated sources and build products")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print the output of failing configurations")
+    parser.add_argument('--child', nargs=5, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        k, p, w, f, l = args.child
+        return run_child(k, int(p), int(w), int(f), int(l))
+
+    for k in args.kinds:
+        if k not in kinds:
+            print("unknown generator %s" % k)
+            return 1
+
+    grid = [(k, int(p), int(w)) for k in args.kinds or kinds
+        for w in args.width.split(',') for p in args.ports.split(',')]
+
+    if args.length < 4:
+        print("frames need at least 4 bytes of payload")
+        return 1
+
+    work = tempfile.mkdtemp(prefix='sweep-')
+    results = [None] * len(grid)
+    lock = threading.Lock()
+    pending = list(enumerate(grid))
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                i, (k, p, w) = pending.pop(0)
+            r = run_config(k, p, w, args, work)
+            with lock:
+                results[i] = r
+                print("%-24s %s" % (r['name'], r['status']))
+                sys.stdout.flush()
+
+    threads = [threading.Thread(target=worker) for i in range(max(1, args.jobs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print('')
+    report(results)
+
+    if args.verbose:
+        for r in results:
+            if r['status'] != 'pass':
+                print('')
+                print("%s:" % r['name'])
+                print(r['output'])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.keep:
+        print("generated files kept in %s" % work)
+    else:
+        shutil.rmtree(work)
+
+    return 0 if all(r['status'] == 'pass' for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
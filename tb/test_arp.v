@@ -113,10 +113,6 @@ initial begin
         arp_response_error,
         arp_response_mac
     );
-
-    // dump file
-    $dumpfile("test_arp.lxt");
-    $dumpvars(0, test_arp);
 end
 
 arp #(
@@ -117,10 +117,6 @@ initial begin
         arp_response_error,
         arp_response_mac
     );
-
-    // dump file
-    $dumpfile("test_arp_64.lxt");
-    $dumpvars(0, test_arp_64);
 end
 
 arp_64 #(
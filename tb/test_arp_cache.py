@@ -26,6 +26,8 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
+
 module = 'arp_cache'
 testbench = 'test_%s' % module
 
@@ -63,11 +65,11 @@ def bench():
     write_complete = Signal(bool(0))
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -73,10 +73,6 @@ initial begin
         write_in_progress,
         write_complete
     );
-
-    // dump file
-    $dumpfile("test_arp_cache.lxt");
-    $dumpvars(0, test_arp_cache);
 end
 
 arp_cache #(
@@ -102,10 +102,6 @@ initial begin
         error_header_early_termination,
         error_invalid_header
     );
-
-    // dump file
-    $dumpfile("test_arp_eth_rx.lxt");
-    $dumpvars(0, test_arp_eth_rx);
 end
 
 arp_eth_rx
@@ -104,10 +104,6 @@ initial begin
         error_header_early_termination,
         error_invalid_header
     );
-
-    // dump file
-    $dumpfile("test_arp_eth_rx_64.lxt");
-    $dumpvars(0, test_arp_eth_rx_64);
 end
 
 arp_eth_rx_64
@@ -94,10 +94,6 @@ initial begin
         output_eth_payload_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_arp_eth_tx.lxt");
-    $dumpvars(0, test_arp_eth_tx);
 end
 
 arp_eth_tx
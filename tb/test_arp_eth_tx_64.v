@@ -96,10 +96,6 @@ initial begin
         output_eth_payload_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_arp_eth_tx_64.lxt");
-    $dumpvars(0, test_arp_eth_tx_64);
 end
 
 arp_eth_tx_64
@@ -64,10 +64,6 @@ initial begin
         output_fcs,
         output_fcs_valid
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs.lxt");
-    $dumpvars(0, test_axis_eth_fcs);
 end
 
 axis_eth_fcs
@@ -66,10 +66,6 @@ initial begin
         output_fcs,
         output_fcs_valid
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_64.lxt");
-    $dumpvars(0, test_axis_eth_fcs_64);
 end
 
 axis_eth_fcs_64
@@ -74,10 +74,6 @@ initial begin
         busy,
         error_bad_fcs
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_check.lxt");
-    $dumpvars(0, test_axis_eth_fcs_check);
 end
 
 axis_eth_fcs_check
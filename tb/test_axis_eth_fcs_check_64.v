@@ -78,10 +78,6 @@ initial begin
         busy,
         error_bad_fcs
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_check_64.lxt");
-    $dumpvars(0, test_axis_eth_fcs_check_64);
 end
 
 axis_eth_fcs_check_64
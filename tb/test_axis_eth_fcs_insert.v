@@ -74,10 +74,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_insert.lxt");
-    $dumpvars(0, test_axis_eth_fcs_insert);
 end
 
 axis_eth_fcs_insert #(
@@ -78,10 +78,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_insert_64.lxt");
-    $dumpvars(0, test_axis_eth_fcs_insert_64);
 end
 
 axis_eth_fcs_insert_64 #(
@@ -78,10 +78,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_insert_64_pad.lxt");
-    $dumpvars(0, test_axis_eth_fcs_insert_64_pad);
 end
 
 axis_eth_fcs_insert_64 #(
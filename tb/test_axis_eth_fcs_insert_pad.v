@@ -74,10 +74,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_axis_eth_fcs_insert_pad.lxt");
-    $dumpvars(0, test_axis_eth_fcs_insert_pad);
 end
 
 axis_eth_fcs_insert #(
@@ -150,10 +150,6 @@ initial begin
         output_eth_payload_tlast,
         output_eth_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_eth_arb_mux_4.lxt");
-    $dumpvars(0, test_eth_arb_mux_4);
 end
 
 eth_arb_mux_4
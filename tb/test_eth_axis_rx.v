@@ -82,10 +82,6 @@ initial begin
         busy,
         error_header_early_termination
     );
-
-    // dump file
-    $dumpfile("test_eth_axis_rx.lxt");
-    $dumpvars(0, test_eth_axis_rx);
 end
 
 eth_axis_rx
@@ -86,10 +86,6 @@ initial begin
         busy,
         error_header_early_termination
     );
-
-    // dump file
-    $dumpfile("test_eth_axis_rx_64.lxt");
-    $dumpvars(0, test_eth_axis_rx_64);
 end
 
 eth_axis_rx_64
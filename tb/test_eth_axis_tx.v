@@ -80,10 +80,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_eth_axis_tx.lxt");
-    $dumpvars(0, test_eth_axis_tx);
 end
 
 eth_axis_tx
@@ -84,10 +84,6 @@ initial begin
         output_axis_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_eth_axis_tx_64.lxt");
-    $dumpvars(0, test_eth_axis_tx_64);
 end
 
 eth_axis_tx_64
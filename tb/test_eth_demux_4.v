@@ -155,10 +155,6 @@ initial begin
         output_3_eth_payload_tlast,
         output_3_eth_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_eth_demux_4.lxt");
-    $dumpvars(0, test_eth_demux_4);
 end
 
 eth_demux_4
@@ -165,10 +165,6 @@ initial begin
         output_3_eth_payload_tlast,
         output_3_eth_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_eth_demux_64_4.lxt");
-    $dumpvars(0, test_eth_demux_64_4);
 end
 
 eth_demux_64_4
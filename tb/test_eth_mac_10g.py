@@ -26,9 +26,11 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
 import eth_ep
 import xgmii_ep
+import throughput
 
 module = 'eth_mac_10g'
 testbench = 'test_%s' % module
@@ -79,6 +81,10 @@ def bench():
     rx_axis_tuser = Signal(bool(0))
     xgmii_txd = Signal(intbv(0x0707070707070707)[64:])
     xgmii_txc = Signal(intbv(0xff)[8:])
+
+    # loopback bus driven directly by the check, for the sink counters
+    lb_xgmii_d = Signal(intbv(0x0707070707070707)[64:])
+    lb_xgmii_c = Signal(intbv(0xff)[8:])
     rx_error_bad_frame = Signal(bool(0))
     rx_error_bad_fcs = Signal(bool(0))
 
@@ -105,6 +111,17 @@ def bench():
         name='xgmii_sink'
     )
 
+    lb_xgmii_sink = xgmii_ep.XGMIISink()
+
+    lb_xgmii_sink_logic = lb_xgmii_sink.create_logic(
+        clk,
+        rst,
+        rxd=lb_xgmii_d,
+        rxc=lb_xgmii_c,
+        stats=True,
+        name='lb_xgmii_sink'
+    )
+
     axis_source = axis_ep.AXIStreamSource()
 
     axis_source_logic = axis_source.create_logic(
@@ -134,11 +151,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -198,6 +215,21 @@ def bench():
 
         # testbench stimulus
 
+        if throughput.enabled():
+            # both directions at once
+            test_frame = eth_ep.EthFrame()
+            test_frame.eth_dest_mac = 0xDAD1D2D3D4D5
+            test_frame.eth_src_mac = 0x5A5152535455
+            test_frame.eth_type = 0x8000
+            test_frame.payload = bytearray(range(256))
+            test_frame.update_fcs()
+
+            def send(k):
+                xgmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+bytearray(test_frame.build_axis_fcs()))
+                axis_source.send(test_frame.build_axis())
+
+            yield throughput.stage(send, [axis_sink, xgmii_sink])
+
         yield clk.posedge
         print("test 1: test rx packet")
         current_test.next = 1
@@ -273,9 +305,58 @@ def bench():
 
         yield delay(100)
 
+        yield clk.posedge
+        print("test 3: sink counters")
+        current_test.next = 3
+
+        words = [
+            # frame with an /E/ in lane 3 of its second word
+            (0xd5555555555555fb, 0x01),
+            (0x03020100fe030201, 0x08),
+            (0x0707070707fd0504, 0xfc),
+            # local fault, then remote fault, in both columns
+            (0x0100009c0100009c, 0x11),
+            (0x0200009c0200009c, 0x11),
+            # sequence character outside a column start lane
+            (0x0707070707079c07, 0xff),
+        ]
+
+        yield clk.negedge
+        lb_xgmii_sink.reset_stats()
+
+        for d, c in words:
+            lb_xgmii_d.next = d
+            lb_xgmii_c.next = c
+            yield clk.posedge
+
+        lb_xgmii_d.next = 0x0707070707070707
+        lb_xgmii_c.next = 0xff
+        yield clk.negedge
+
+        stats = lb_xgmii_sink.get_stats()
+        print(stats)
+
+        assert stats == {
+            'words': len(words),
+            'frames': 1,
+            'errors': 1,
+            'ordered_sets': 4,
+            'local_faults': 2,
+            'remote_faults': 2,
+            'lane_faults': 1
+        }
+
+        rx_frame = lb_xgmii_sink.recv()
+
+        assert rx_frame.error.index(1) == 11
+        assert len(rx_frame.data) == 18
+        assert lb_xgmii_sink.empty()
+
+        yield delay(100)
+
         raise StopSimulation
 
-    return dut, axis_source_logic, axis_sink_logic, xgmii_source_logic, xgmii_sink_logic, clkgen, check
+    return dut, axis_source_logic, axis_sink_logic, xgmii_source_logic, xgmii_sink_logic, lb_xgmii_sink_logic, clkgen, check
 
 def test_bench():
     sim = Simulation(bench())
@@ -97,10 +97,6 @@ initial begin
         rx_error_bad_frame,
         rx_error_bad_fcs
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_10g.lxt");
-    $dumpvars(0, test_eth_mac_10g);
 end
 
 eth_mac_10g #(
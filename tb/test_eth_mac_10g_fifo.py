@@ -25,10 +25,13 @@ THE SOFTWARE.
 
 from myhdl import *
 import os
+import struct
 
+import cosim
 import axis_ep
 import eth_ep
 import xgmii_ep
+import latency
 
 module = 'eth_mac_10g_fifo'
 testbench = 'test_%s' % module
@@ -150,11 +153,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -311,6 +314,52 @@ def bench():
 
         yield delay(100)
 
+        yield clk.posedge
+        print("test 3: rx latency under load")
+        current_test.next = 3
+
+        # frames carry a sequence number after the Ethernet header; the MAC
+        # strips the preamble before the FIFO
+        tracker = latency.LatencyTracker(key=lambda f: struct.unpack('>L', f.data[14:18])[0], period=8)
+        tracker.add_source(xgmii_source, key=lambda f: struct.unpack('>L', f.data[22:26])[0])
+        tracker.add_sink(axis_sink)
+
+        for i in range(32):
+            test_frame = eth_ep.EthFrame()
+            test_frame.eth_dest_mac = 0xDAD1D2D3D4D5
+            test_frame.eth_src_mac = 0x5A5152535455
+            test_frame.eth_type = 0x8000
+            test_frame.payload = bytearray(struct.pack('>L', i) + bytearray(range(60)))
+            test_frame.update_fcs()
+
+            xgmii_source.send(b'\x55\x55\x55\x55\x55\x55\x55\xD5'+bytearray(test_frame.build_axis_fcs()))
+
+        yield axis_sink.wait(32, timeout=2000)
+
+        print(tracker.report())
+
+        for i in range(32):
+            rx_frame = axis_sink.recv()
+
+            eth_frame = eth_ep.EthFrame()
+            eth_frame.parse_axis(rx_frame)
+
+            assert struct.unpack('>L', eth_frame.payload.data[0:4])[0] == i
+
+        assert axis_sink.empty()
+
+        stats = tracker.get_stats()
+
+        assert stats['count'] == 32
+        assert stats['outstanding'] == 0
+        assert stats['unmatched'] == 0
+        # the frame FIFO stores each 12 word frame before forwarding it
+        assert stats['min'] >= 11
+        # and does not hold frames back while the MAC keeps it busy
+        assert stats['max'] < 100
+
+        yield delay(100)
+
         raise StopSimulation
 
     return dut, axis_source_logic, axis_sink_logic, xgmii_source_logic, xgmii_sink_logic, clkgen, check
@@ -117,10 +117,6 @@ initial begin
         rx_fifo_bad_frame,
         rx_fifo_good_frame
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_10g_fifo.lxt");
-    $dumpvars(0, test_eth_mac_10g_fifo);
 end
 
 eth_mac_10g_fifo #(
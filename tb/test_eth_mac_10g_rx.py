@@ -26,9 +26,13 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
 import eth_ep
 import xgmii_ep
+import traffic
+import udp_ep
+import decode
 
 axis_ep.skip_assert = True
 
@@ -92,11 +96,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -397,6 +401,71 @@ def bench():
 
             yield delay(100)
 
+        yield clk.posedge
+        print("test 6: line rate, minimum size frames")
+        current_test.next = 6
+
+        gen = traffic.TrafficGenerator(source, size=64, count=200, seed=1, period=8)
+        # the MAC strips the preamble and FCS
+        meter = traffic.RateMeter(sink, bw=8, overhead=12, period=8)
+        gen.start()
+
+        yield sink.wait(200, timeout=10000)
+
+        print(gen.report())
+        print(meter.report())
+
+        assert sink.count() == 200
+        assert gen.done()
+        assert meter.get_stats()['efficiency'] > 0.99
+
+        for i in range(200):
+            rx_frame = sink.recv()
+            assert not rx_frame.user[-1]
+
+        assert sink.empty()
+
+        yield delay(100)
+
+        yield clk.posedge
+        print("test 7: line rate, UDP frames from a template")
+        current_test.next = 7
+
+        template = udp_ep.UDPFrameTemplate(udp_ep.UDPFrame(
+                eth_dest_mac=0xDAD1D2D3D4D5,
+                eth_src_mac=0x5A5152535455,
+                eth_type=0x0800,
+                ip_source_ip=0xc0a80165,
+                ip_dest_ip=0xc0a80164,
+                udp_source_port=1234,
+                udp_dest_port=5678
+            ))
+
+        gen = traffic.TrafficGenerator(source, size='imix', count=100, seed=1, period=8, template=template)
+        gen.start()
+
+        yield sink.wait(100, timeout=10000)
+
+        print(gen.report())
+
+        assert sink.count() == 100
+        assert gen.done()
+
+        for i in range(100):
+            rx_frame = sink.recv()
+            assert not rx_frame.user[-1]
+
+            check_frame = decode.decode(rx_frame, lazy=True)
+
+            assert check_frame.ip_identification == i
+            assert check_frame.ip_header_checksum == check_frame.calc_ip_checksum()
+            assert check_frame.udp_checksum == check_frame.calc_udp_checksum()
+            assert check_frame.udp_dest_port == 5678
+
+        assert sink.empty()
+
+        yield delay(100)
+
         raise StopSimulation
 
     return dut, monitor, source_logic, sink_logic, clkgen, check
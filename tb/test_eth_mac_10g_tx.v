@@ -70,10 +70,6 @@ initial begin
         xgmii_txd,
         xgmii_txc
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_10g_tx.lxt");
-    $dumpvars(0, test_eth_mac_10g_tx);
 end
 
 eth_mac_10g_tx #(
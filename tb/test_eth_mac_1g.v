@@ -96,10 +96,6 @@ initial begin
         rx_error_bad_frame,
         rx_error_bad_fcs
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_1g.lxt");
-    $dumpvars(0, test_eth_mac_1g);
 end
 
 eth_mac_1g #(
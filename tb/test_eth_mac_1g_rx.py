@@ -26,9 +26,11 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import axis_ep
 import eth_ep
 import gmii_ep
+import traffic
 
 module = 'eth_mac_1g_rx'
 testbench = 'test_%s' % module
@@ -90,11 +92,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -364,6 +366,32 @@ def bench():
 
             yield delay(100)
 
+        yield clk.posedge
+        print("test 5: line rate, minimum size frames")
+        current_test.next = 5
+
+        gen = traffic.TrafficGenerator(source, size=64, count=200, seed=1, period=8)
+        # the MAC strips the preamble and FCS
+        meter = traffic.RateMeter(sink, bw=1, overhead=12, period=8)
+        gen.start()
+
+        yield sink.wait(200, timeout=20000)
+
+        print(gen.report())
+        print(meter.report())
+
+        assert sink.count() == 200
+        assert gen.done()
+        assert meter.get_stats()['efficiency'] > 0.99
+
+        for i in range(200):
+            rx_frame = sink.recv()
+            assert not rx_frame.user[-1]
+
+        assert sink.empty()
+
+        yield delay(100)
+
         raise StopSimulation
 
     return dut, monitor, source_logic, sink_logic, clkgen, check
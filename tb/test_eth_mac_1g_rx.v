@@ -68,10 +68,6 @@ initial begin
         error_bad_frame,
         error_bad_fcs
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_1g_rx.lxt");
-    $dumpvars(0, test_eth_mac_1g_rx);
 end
 
 eth_mac_1g_rx
@@ -25,10 +25,13 @@ THE SOFTWARE.
 
 from myhdl import *
 import os
+import struct
 
+import cosim
 import axis_ep
 import eth_ep
 import gmii_ep
+import traffic
 
 module = 'eth_mac_1g_tx'
 testbench = 'test_%s' % module
@@ -95,11 +98,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -314,6 +317,44 @@ def bench():
 
             yield delay(100)
 
+        yield clk.posedge
+        print("test 4: line rate, minimum size frames")
+        current_test.next = 4
+
+        meter = traffic.RateMeter(sink, bw=1, period=8)
+
+        for i in range(200):
+            test_frame = eth_ep.EthFrame()
+            test_frame.eth_dest_mac = 0xDAD1D2D3D4D5
+            test_frame.eth_src_mac = 0x5A5152535455
+            test_frame.eth_type = 0x8000
+            test_frame.payload = bytearray(struct.pack('>L', i) + bytearray(range(42)))
+            test_frame.update_fcs()
+
+            source.send(test_frame.build_axis())
+
+        yield sink.wait(200, timeout=20000)
+
+        print(meter.report())
+
+        assert sink.count() == 200
+        assert meter.get_stats()['efficiency'] > 0.99
+
+        for i in range(200):
+            rx_frame = sink.recv()
+
+            assert rx_frame.data[0:8] == bytearray(b'\x55\x55\x55\x55\x55\x55\x55\xD5')
+
+            eth_frame = eth_ep.EthFrame()
+            eth_frame.parse_axis_fcs(rx_frame.data[8:])
+
+            assert eth_frame.eth_fcs == eth_frame.calc_fcs()
+            assert struct.unpack('>L', eth_frame.payload.data[0:4])[0] == i
+
+        assert sink.empty()
+
+        yield delay(100)
+
         raise StopSimulation
 
     return dut, source_logic, sink_logic, clkgen, check
@@ -70,10 +70,6 @@ initial begin
         gmii_tx_en,
         gmii_tx_er
     );
-
-    // dump file
-    $dumpfile("test_eth_mac_1g_tx.lxt");
-    $dumpvars(0, test_eth_mac_1g_tx);
 end
 
 eth_mac_1g_tx #(
@@ -155,10 +155,6 @@ initial begin
         output_eth_payload_tlast,
         output_eth_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_eth_mux_4.lxt");
-    $dumpvars(0, test_eth_mux_4);
 end
 
 eth_mux_4
@@ -192,10 +192,6 @@ initial begin
         tx_error_payload_early_termination,
         tx_error_arp_failed
     );
-
-    // dump file
-    $dumpfile("test_ip.lxt");
-    $dumpvars(0, test_ip);
 end
 
 ip
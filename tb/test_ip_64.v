@@ -199,10 +199,6 @@ initial begin
         tx_error_payload_early_termination,
         tx_error_arp_failed
     );
-
-    // dump file
-    $dumpfile("test_ip_64.lxt");
-    $dumpvars(0, test_ip_64);
 end
 
 ip_64
@@ -26,6 +26,7 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import eth_ep
 import arp_ep
 import ip_ep
@@ -233,11 +234,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -442,8 +443,7 @@ def bench():
         ip_source.send(test_frame)
 
         # wait for ARP request packet
-        while eth_sink.empty():
-            yield clk.posedge
+        yield eth_sink.wait()
 
         rx_frame = eth_sink.recv()
         check_frame = arp_ep.ARPFrame()
@@ -285,10 +285,6 @@ initial begin
         output_3_ip_payload_tlast,
         output_3_ip_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_ip_demux_4.lxt");
-    $dumpvars(0, test_ip_demux_4);
 end
 
 ip_demux_4
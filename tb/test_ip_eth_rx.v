@@ -124,10 +124,6 @@ initial begin
         error_invalid_header,
         error_invalid_checksum
     );
-
-    // dump file
-    $dumpfile("test_ip_eth_rx.lxt");
-    $dumpvars(0, test_ip_eth_rx);
 end
 
 ip_eth_rx
@@ -128,10 +128,6 @@ initial begin
         error_invalid_header,
         error_invalid_checksum
     );
-
-    // dump file
-    $dumpfile("test_ip_eth_rx_64.lxt");
-    $dumpvars(0, test_ip_eth_rx_64);
 end
 
 ip_eth_rx_64
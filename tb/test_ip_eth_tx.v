@@ -112,10 +112,6 @@ initial begin
         busy,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_ip_eth_tx.lxt");
-    $dumpvars(0, test_ip_eth_tx);
 end
 
 ip_eth_tx
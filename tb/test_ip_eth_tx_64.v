@@ -116,10 +116,6 @@ initial begin
         busy,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_ip_eth_tx_64.lxt");
-    $dumpvars(0, test_ip_eth_tx_64);
 end
 
 ip_eth_tx_64
@@ -295,10 +295,6 @@ initial begin
         output_ip_payload_tlast,
         output_ip_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_ip_mux_64_4.lxt");
-    $dumpvars(0, test_ip_mux_64_4);
 end
 
 ip_mux_64_4
@@ -259,10 +259,6 @@ initial begin
         rx_error_payload_early_termination,
         tx_error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp.lxt");
-    $dumpvars(0, test_udp);
 end
 
 udp #(
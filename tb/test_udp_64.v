@@ -267,10 +267,6 @@ initial begin
         rx_error_payload_early_termination,
         tx_error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_64.lxt");
-    $dumpvars(0, test_udp_64);
 end
 
 udp_64 #(
@@ -320,10 +320,6 @@ initial begin
         output_udp_payload_tlast,
         output_udp_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_udp_arb_mux_4.lxt");
-    $dumpvars(0, test_udp_arb_mux_4);
 end
 
 udp_arb_mux_4
@@ -26,7 +26,9 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import udp_ep
+import scoreboard
 
 module = 'udp_arb_mux_64_4'
 testbench = 'test_%s' % module
@@ -388,11 +390,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -1036,6 +1038,57 @@ def bench():
 
         assert rx_frame == test_frame2
 
+        yield sink.wait(1, timeout=100)
+        rx_frame = sink.recv()
+
+        assert rx_frame == test_frame2
+
+        assert sink.empty()
+
+        yield delay(100)
+
+        yield clk.posedge
+        print("test 8: all ports, full load")
+        current_test.next = 8
+
+        sources = [source_0, source_1, source_2, source_3]
+        assert sink.empty()
+
+        board = scoreboard.Scoreboard()
+        board.add_sink(sink)
+
+        for k in range(16):
+            for i in range(4):
+                test_frame = udp_ep.UDPFrame()
+                test_frame.eth_dest_mac = 0xDAD1D2D3D4D5
+                test_frame.eth_src_mac = 0x5A0052535455 | (i << 32)
+                test_frame.eth_type = 0x8000
+                test_frame.ip_version = 4
+                test_frame.ip_ihl = 5
+                test_frame.ip_dscp = 0
+                test_frame.ip_ecn = 0
+                test_frame.ip_length = None
+                test_frame.ip_identification = k
+                test_frame.ip_flags = 2
+                test_frame.ip_fragment_offset = 0
+                test_frame.ip_ttl = 64
+                test_frame.ip_protocol = 0x11
+                test_frame.ip_header_checksum = None
+                test_frame.ip_source_ip = 0xc0a80165
+                test_frame.ip_dest_ip = 0xc0a80164
+                test_frame.udp_source_port = 1
+                test_frame.udp_dest_port = 2
+                test_frame.udp_length = None
+                test_frame.udp_checksum = None
+                test_frame.payload = bytearray(range(k+8))
+                test_frame.build()
+                board.expect(test_frame, i)
+                sources[i].send(test_frame)
+
+        yield board.wait(clk, 10000)
+
+        assert board.passed()
+
         yield delay(100)
 
         raise StopSimulation
@@ -26,10 +26,12 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import eth_ep
 import arp_ep
 import ip_ep
 import udp_ep
+import checksum
 
 module = 'udp_checksum_gen'
 testbench = 'test_%s' % module
@@ -185,11 +187,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -341,6 +343,7 @@ def bench():
                 rx_frame = sink.recv()
 
                 assert rx_frame == test_frame
+                assert rx_frame.udp_checksum == checksum.udp_checksum(rx_frame)
 
                 assert sink.empty()
 
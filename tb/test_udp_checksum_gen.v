@@ -154,10 +154,6 @@ initial begin
         output_udp_payload_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_udp_checksum_gen.lxt");
-    $dumpvars(0, test_udp_checksum_gen);
 end
 
 udp_checksum_gen #(
@@ -158,10 +158,6 @@ initial begin
         output_udp_payload_tuser,
         busy
     );
-
-    // dump file
-    $dumpfile("test_udp_checksum_gen_64.lxt");
-    $dumpvars(0, test_udp_checksum_gen_64);
 end
 
 udp_checksum_gen_64 #(
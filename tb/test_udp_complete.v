@@ -298,10 +298,6 @@ initial begin
         udp_rx_error_payload_early_termination,
         udp_tx_error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_complete.lxt");
-    $dumpvars(0, test_udp_complete);
 end
 
 udp_complete #(
@@ -26,10 +26,12 @@ THE SOFTWARE.
 from myhdl import *
 import os
 
+import cosim
 import eth_ep
 import arp_ep
 import ip_ep
 import udp_ep
+import throughput
 
 module = 'udp_complete_64'
 testbench = 'test_%s' % module
@@ -365,11 +367,11 @@ def bench():
     )
 
     # DUT
-    if os.system(build_cmd):
+    if cosim.build(testbench, srcs, build_cmd):
         raise Exception("Error running build command")
 
-    dut = Cosimulation(
-        "vvp -m myhdl %s.vvp -lxt2" % testbench,
+    dut = cosim.Cosimulation(
+        testbench,
         clk=clk,
         rst=rst,
         current_test=current_test,
@@ -569,6 +571,32 @@ def bench():
         gateway_ip.next = 0xc0a80101
         subnet_mask.next = 0xffffff00
 
+        if throughput.enabled():
+            # UDP receive path
+            test_frame = udp_ep.UDPFrame()
+            test_frame.eth_dest_mac = 0x5A5152535455
+            test_frame.eth_src_mac = 0xDAD1D2D3D4D5
+            test_frame.eth_type = 0x0800
+            test_frame.ip_version = 4
+            test_frame.ip_ihl = 5
+            test_frame.ip_dscp = 0
+            test_frame.ip_ecn = 0
+            test_frame.ip_length = None
+            test_frame.ip_identification = 0
+            test_frame.ip_flags = 2
+            test_frame.ip_fragment_offset = 0
+            test_frame.ip_ttl = 64
+            test_frame.ip_protocol = 0x11
+            test_frame.ip_header_checksum = None
+            test_frame.ip_source_ip = 0xc0a80165
+            test_frame.ip_dest_ip = 0xc0a80164
+            test_frame.udp_source_port = 1234
+            test_frame.udp_dest_port = 5678
+            test_frame.payload = bytearray(range(256))
+            test_frame.build()
+
+            yield throughput.stage(lambda k: eth_source.send(test_frame.build_eth()), [udp_sink])
+
         yield clk.posedge
         print("test 1: test IP RX packet")
         current_test.next = 1
@@ -643,8 +671,7 @@ def bench():
         ip_source.send(test_frame)
 
         # wait for ARP request packet
-        while eth_sink.empty():
-            yield clk.posedge
+        yield eth_sink.wait()
 
         rx_frame = eth_sink.recv()
         check_frame = arp_ep.ARPFrame()
@@ -310,10 +310,6 @@ initial begin
         udp_rx_error_payload_early_termination,
         udp_tx_error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_complete_64.lxt");
-    $dumpvars(0, test_udp_complete_64);
 end
 
 udp_complete_64 #(
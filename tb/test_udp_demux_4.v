@@ -325,10 +325,6 @@ initial begin
         output_3_udp_payload_tlast,
         output_3_udp_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_udp_demux_4.lxt");
-    $dumpvars(0, test_udp_demux_4);
 end
 
 udp_demux_4
@@ -154,10 +154,6 @@ initial begin
         error_header_early_termination,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_ip_rx.lxt");
-    $dumpvars(0, test_udp_ip_rx);
 end
 
 udp_ip_rx
@@ -158,10 +158,6 @@ initial begin
         error_header_early_termination,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_ip_rx_64.lxt");
-    $dumpvars(0, test_udp_ip_rx_64);
 end
 
 udp_ip_rx_64
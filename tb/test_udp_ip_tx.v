@@ -150,10 +150,6 @@ initial begin
         busy,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_ip_tx.lxt");
-    $dumpvars(0, test_udp_ip_tx);
 end
 
 udp_ip_tx
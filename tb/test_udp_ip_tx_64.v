@@ -154,10 +154,6 @@ initial begin
         busy,
         error_payload_early_termination
     );
-
-    // dump file
-    $dumpfile("test_udp_ip_tx_64.lxt");
-    $dumpvars(0, test_udp_ip_tx_64);
 end
 
 udp_ip_tx_64
@@ -334,10 +334,6 @@ initial begin
         output_udp_payload_tlast,
         output_udp_payload_tuser
     );
-
-    // dump file
-    $dumpfile("test_udp_mux_64_4.lxt");
-    $dumpvars(0, test_udp_mux_64_4);
 end
 
 udp_mux_64_4
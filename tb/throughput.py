@@ -0,0 +1 @@
+../lib/axis/tb/throughput.py
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+
+Copyright (c) 2017 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+import random
+import struct
+import zlib
+
+PREAMBLE = b'\x55\x55\x55\x55\x55\x55\x55\xd5'
+
+# simple IMIX: 7:4:1 mix of 64, 594 and 1518 byte frames
+IMIX = ((64, 7), (594, 4), (1518, 1))
+
+def rate_stats(frames, wire_bytes, last_size, first_time, last_time, bw, ifg, period):
+    # achieved and theoretical rate in bytes per clock cycle, measured
+    # from the start of the first frame to the start of the last one
+    stats = {'frames': frames, 'wire_bytes': wire_bytes, 'rate': 0.0, 'max_rate': 0.0, 'efficiency': 0.0}
+    if frames < 2 or last_time == first_time:
+        return stats
+    cycles = float(last_time - first_time) / period
+    b = wire_bytes - last_size
+    stats['rate'] = b / cycles
+    stats['max_rate'] = bw * float(b) / (b + ifg*(frames-1))
+    stats['efficiency'] = stats['rate'] / stats['max_rate']
+    return stats
+
+def rate_report(stats):
+    return "%d frames, %.3f of %.3f bytes per cycle (%.2f%% of line rate)" % (
+        stats['frames'], stats['rate'], stats['max_rate'], stats['efficiency']*100)
+
+class TrafficGenerator(object):
+    def __init__(self, source, size=64, count=None, seed=None, period=1, depth=2, template=None):
+        # size is a frame length in bytes including the FCS: an int for
+        # fixed size, 'imix', 'random' for 64 to 1518 bytes, a (min, max)
+        # tuple, or a list of (size, weight) pairs.  count limits the number
+        # of frames, None runs until stop().  depth frames are kept queued
+        # on the source so that it never runs dry between frames.  Rates
+        # are reported per period, normally the clock period.  With a
+        # udp_ep.UDPFrameTemplate, frames are UDP datagrams built from the
+        # template with the sequence number in ip_identification.
+        self.source = source
+        self.template = template
+        self.size = size
+        self.count = count
+        self.period = period
+        self.depth = depth
+        self.rand = random.Random(seed)
+        self.reset()
+
+        source.sent_hooks.append(self.sent)
+
+    def reset(self):
+        self.queued = 0
+        self.frames = 0
+        self.wire_bytes = 0
+        self.last_size = 0
+        self.first_time = None
+        self.last_time = None
+        self.running = False
+
+    def next_size(self):
+        size = self.size
+        if size == 'imix':
+            size = IMIX
+        elif size == 'random':
+            size = (64, 1518)
+
+        if type(size) is int:
+            return size
+        if type(size[0]) is int:
+            return self.rand.randint(size[0], size[1])
+
+        r = self.rand.uniform(0, sum(w for s, w in size))
+        for s, w in size:
+            r -= w
+            if r <= 0:
+                return s
+        return size[-1][0]
+
+    def build_frame(self, size):
+        # Ethernet frame of size bytes (at least 46 with a template) with
+        # incrementing sequence number, random payload and valid FCS
+        assert size >= 18
+        if self.template is not None:
+            n = max(size-4-self.template.header_length, 0)
+            payload = self.rand.getrandbits(8*n).to_bytes(n, 'big') if n else b''
+            data = self.template.build(payload, ip_identification=self.queued & 0xffff, fcs=True)
+        else:
+            data = bytearray(struct.pack('>6s6sHL', b'\xda\xd1\xd2\xd3\xd4\xd5', b'\x5a\x51\x52\x53\x54\x55', 0x88b5, self.queued))
+            data += bytearray(self.rand.getrandbits(8) for i in range(size-4-len(data)))
+            data = data[:size-4]
+            data += struct.pack('<L', zlib.crc32(bytes(data)) & 0xffffffff)
+        if not self.source.insert_preamble:
+            data = bytearray(PREAMBLE) + data
+        return data
+
+    def start(self):
+        self.running = True
+        while self.running and self.source.count() < self.depth:
+            self.queue_frame()
+
+    def stop(self):
+        self.running = False
+
+    def done(self):
+        return self.count is not None and self.frames >= self.count
+
+    def queue_frame(self):
+        if self.count is not None and self.queued >= self.count:
+            self.running = False
+            return
+        self.source.send(self.build_frame(self.next_size()))
+        self.queued += 1
+
+    def sent(self, frame):
+        n = len(frame.data)
+        if self.source.insert_preamble:
+            n += len(PREAMBLE)
+        if self.frames == 0:
+            self.first_time = frame.first_beat_time
+        self.frames += 1
+        self.wire_bytes += n
+        self.last_size = n
+        self.last_time = frame.first_beat_time
+
+        if self.running and self.source.count() < self.depth:
+            self.queue_frame()
+
+    def get_stats(self):
+        # offered load; the DUT can only be judged by a RateMeter on its
+        # output
+        return rate_stats(self.frames, self.wire_bytes, self.last_size, self.first_time, self.last_time,
+            self.source.bw, self.source.ifg, self.period)
+
+    def report(self):
+        return rate_report(self.get_stats())
+
+
+class RateMeter(object):
+    def __init__(self, sink, bw, ifg=12, overhead=0, period=1):
+        # measures the rate of the frames received on sink against a line
+        # of bw bytes per cycle with ifg bytes between frames.  overhead is
+        # added to each frame length to count the preamble and FCS where
+        # the sink does not see them, e.g. 12 on the AXI side of a MAC
+        self.bw = bw
+        self.ifg = ifg
+        self.overhead = overhead
+        self.period = period
+        self.reset()
+
+        sink.recv_hooks.append(self.received)
+
+    def reset(self):
+        self.frames = 0
+        self.wire_bytes = 0
+        self.last_size = 0
+        self.first_time = None
+        self.last_time = None
+
+    def received(self, frame):
+        n = len(frame.data) + self.overhead
+        if self.frames == 0:
+            self.first_time = frame.first_beat_time
+        self.frames += 1
+        self.wire_bytes += n
+        self.last_size = n
+        self.last_time = frame.first_beat_time
+
+    def get_stats(self):
+        return rate_stats(self.frames, self.wire_bytes, self.last_size, self.first_time, self.last_time,
+            self.bw, self.ifg, self.period)
+
+    def report(self):
+        return rate_report(self.get_stats())
@@ -23,10 +23,18 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
 import axis_ep
 import eth_ep
 import ip_ep
+import checksum
 import struct
+import zlib
+from collections import deque
+
+# patch header checksums incrementally in set_fields(); set to False to
+# recompute them in full instead, e.g. to cross check the patched values
+incremental_checksum = True
 
 class UDPFrame(object):
     def __init__(self,
@@ -101,7 +109,7 @@ class UDPFrame(object):
             payload = bytearray(payload)
         if type(payload) is bytearray or type(payload) is axis_ep.AXIStreamFrame:
             self.payload = axis_ep.AXIStreamFrame(payload)
-        if type(payload) is UDPFrame:
+        if isinstance(payload, UDPFrame):
             self.payload = axis_ep.AXIStreamFrame(payload.payload)
             self.eth_dest_mac = payload.eth_dest_mac
             self.eth_src_mac = payload.eth_src_mac
@@ -143,39 +151,10 @@ class UDPFrame(object):
         self.update_ip_length()
 
     def calc_ip_checksum(self):
-        cksum = self.ip_version << 12 | self.ip_ihl << 8 | self.ip_dscp << 2 | self.ip_ecn
-        cksum += self.ip_length
-        cksum += self.ip_identification
-        cksum += self.ip_flags << 13 | self.ip_fragment_offset
-        cksum += self.ip_ttl << 8 | self.ip_protocol
-        cksum += self.ip_source_ip & 0xffff
-        cksum += (self.ip_source_ip >> 16) & 0xffff
-        cksum += self.ip_dest_ip & 0xffff
-        cksum += (self.ip_dest_ip >> 16) & 0xffff
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        return ~cksum & 0xffff
+        return checksum.ip_header_checksum(self)
 
     def calc_udp_checksum(self):
-        cksum = self.ip_source_ip & 0xffff
-        cksum += (self.ip_source_ip >> 16) & 0xffff
-        cksum += self.ip_dest_ip & 0xffff
-        cksum += (self.ip_dest_ip >> 16) & 0xffff
-        cksum += self.ip_protocol
-        cksum += self.udp_length
-        cksum += self.udp_source_port
-        cksum += self.udp_dest_port
-        cksum += self.udp_length
-        odd = False
-        for d in self.payload.data:
-            if odd:
-                cksum += d
-            else:
-                cksum += d << 8
-            odd = not odd
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        cksum = (cksum & 0xffff) + (cksum >> 16)
-        return ~cksum & 0xffff
+        return checksum.udp_checksum(self)
 
     def update_ip_checksum(self):
         self.ip_header_checksum = self.calc_ip_checksum()
@@ -187,6 +166,30 @@ class UDPFrame(object):
         self.update_udp_checksum()
         self.update_ip_checksum()
 
+    def set_fields(self, full=False, **fields):
+        # set header fields by keyword, patching the IP header and UDP
+        # checksums that are already set for the changes (RFC 1624) rather
+        # than leaving them stale; full=True recomputes them in full instead,
+        # as does a new payload.  A UDP checksum of zero means the frame has
+        # none (RFC 768) and is left at zero
+        old = {}
+        for name, value in fields.items():
+            if not hasattr(self, name):
+                raise Exception("Unknown field %s" % name)
+            old[name] = getattr(self, name)
+            setattr(self, name, value)
+        full = full or not incremental_checksum or None in old.values() or 'payload' in fields
+        if self.udp_checksum and 'udp_checksum' not in fields:
+            if full:
+                self.update_udp_checksum()
+            else:
+                self.udp_checksum = checksum.update_udp_checksum(self.udp_checksum, old, fields)
+        if self.ip_header_checksum is not None and 'ip_header_checksum' not in fields:
+            if full:
+                self.update_ip_checksum()
+            else:
+                self.ip_header_checksum = checksum.update_ip_header_checksum(self.ip_header_checksum, old, fields)
+
     def build(self):
         if self.udp_length is None:
             self.update_udp_length()
@@ -270,7 +273,7 @@ class UDPFrame(object):
         self.payload = axis_ep.AXIStreamFrame(data.payload.data[8:self.udp_length])
 
     def __eq__(self, other):
-        if type(other) is UDPFrame:
+        if isinstance(other, UDPFrame):
             return (
                     self.eth_src_mac == other.eth_src_mac and
                     self.eth_dest_mac == other.eth_dest_mac and
@@ -322,12 +325,105 @@ class UDPFrame(object):
             )
 
 
-class UDPFrameSource():
+class UDPFrameTemplate(object):
+    # Eth+IP+UDP header packed once from a UDPFrame; build() copies it and
+    # stamps the per-packet fields at fixed offsets, for generating frames
+    # at line rate without building an EthFrame, IPFrame and AXIStreamFrame
+    # for each one
+
+    mac_struct = struct.Struct('>HL')     # eth_dest_mac at 0
+    ip_struct = struct.Struct('>HH')      # ip_length, ip_identification at 16
+    addr_struct = struct.Struct('>HLL')   # ip_header_checksum, ip_source_ip, ip_dest_ip at 24
+    udp_struct = struct.Struct('>HHHH')   # udp_source_port, udp_dest_port, udp_length, udp_checksum at 34
+    fcs_struct = struct.Struct('<L')
+
+    header_length = 42
+
+    def __init__(self, frame=None, udp_checksum=True):
+        # frame supplies the default header fields, its payload, lengths and
+        # checksums are ignored; udp_checksum=False sends a zero UDP checksum
+        frame = UDPFrame(frame if frame is not None else b'')
+        assert frame.ip_ihl == 5
+        frame.payload = b''
+        frame.ip_length = None
+        frame.ip_header_checksum = None
+        frame.udp_length = None
+        frame.udp_checksum = None
+
+        self.header = bytearray(frame.build_axis().data)
+        self.udp_checksum = udp_checksum
+
+        self.eth_dest_mac = frame.eth_dest_mac
+        self.ip_identification = frame.ip_identification
+        self.ip_source_ip = frame.ip_source_ip
+        self.ip_dest_ip = frame.ip_dest_ip
+        self.udp_source_port = frame.udp_source_port
+        self.udp_dest_port = frame.udp_dest_port
+        self.ip_protocol = frame.ip_protocol
+
+        # sum of the IP header words that build() does not stamp
+        frame.ip_length = 0
+        frame.ip_identification = 0
+        frame.ip_source_ip = 0
+        frame.ip_dest_ip = 0
+        self.ip_sum = checksum.ip_header_sum(frame)
+
+    def build(self,
+                payload=b'',
+                eth_dest_mac=None,
+                ip_identification=None,
+                ip_source_ip=None,
+                ip_dest_ip=None,
+                udp_source_port=None,
+                udp_dest_port=None,
+                fcs=False
+            ):
+        # frame bytes with payload and the given fields, the rest from the
+        # template; fcs=True appends the Ethernet FCS
+        if ip_identification is None:
+            ip_identification = self.ip_identification
+        if ip_source_ip is None:
+            ip_source_ip = self.ip_source_ip
+        if ip_dest_ip is None:
+            ip_dest_ip = self.ip_dest_ip
+        if udp_source_port is None:
+            udp_source_port = self.udp_source_port
+        if udp_dest_port is None:
+            udp_dest_port = self.udp_dest_port
+
+        udp_length = len(payload) + 8
+        ip_length = udp_length + 20
+        addr_sum = (ip_source_ip >> 16) + (ip_source_ip & 0xffff) + (ip_dest_ip >> 16) + (ip_dest_ip & 0xffff)
+
+        ip_header_checksum = ~checksum.fold(self.ip_sum + ip_length + ip_identification + addr_sum) & 0xffff
+        udp_checksum = 0
+        if self.udp_checksum:
+            s = addr_sum + self.ip_protocol + udp_source_port + udp_dest_port + 2*udp_length
+            udp_checksum = checksum.inet_checksum(payload, s)
+
+        data = self.header + payload
+        if eth_dest_mac is not None:
+            self.mac_struct.pack_into(data, 0, eth_dest_mac >> 32, eth_dest_mac & 0xffffffff)
+        self.ip_struct.pack_into(data, 16, ip_length, ip_identification)
+        self.addr_struct.pack_into(data, 24, ip_header_checksum, ip_source_ip, ip_dest_ip)
+        self.udp_struct.pack_into(data, 34, udp_source_port, udp_dest_port, udp_length, udp_checksum)
+        if fcs:
+            data += self.fcs_struct.pack(zlib.crc32(data) & 0xffffffff)
+        return data
+
+    def send(self, source, payload=b'', **kwargs):
+        # build a frame and queue it on an AXIStreamSource, GMIISource or
+        # XGMIISource
+        source.send(self.build(payload, **kwargs))
+
+
+class UDPFrameSource(axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
         self.payload_source = axis_ep.AXIStreamSource()
         self.header_queue = []
+        self.wake = Signal(bool(0))
 
     def send(self, frame):
         frame = UDPFrame(frame)
@@ -336,6 +432,7 @@ class UDPFrameSource():
             self.payload_source.send(frame.payload)
         else:
             self.queue.append(frame)
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -375,12 +472,14 @@ class UDPFrameSource():
                 udp_payload_tlast=Signal(bool(False)),
                 udp_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         udp_hdr_ready_int = Signal(bool(False))
         udp_hdr_valid_int = Signal(bool(False))
@@ -396,6 +495,7 @@ class UDPFrameSource():
             tlast=udp_payload_tlast,
             tuser=udp_payload_tuser,
             pause=udp_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -406,14 +506,23 @@ class UDPFrameSource():
 
         @instance
         def logic():
+            active = False
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     udp_hdr_valid_int.next = False
+                    active = False
                 else:
                     if udp_hdr_ready_int:
                         udp_hdr_valid_int.next = False
+                        active = False
                     if (udp_hdr_ready_int and udp_hdr_valid) or not udp_hdr_valid_int:
                         if len(self.header_queue) > 0:
                             frame = self.header_queue.pop(0)
@@ -443,19 +552,26 @@ class UDPFrameSource():
                                 print("[%s] Sending frame %s" % (name, repr(frame)))
 
                             udp_hdr_valid_int.next = True
+                            active = True
 
                     if len(self.queue) > 0 and len(self.header_queue) == 0:
                         frame = self.queue.pop(0)
                         self.header_queue.append(frame)
                         self.payload_source.send(frame.payload)
 
-        return logic, pause_logic, udp_payload_source
+                idle = (suspend.enabled and not rst and not active and
+                        len(self.header_queue) == 0 and len(self.queue) == 0)
+
+        return logic, pause_logic, udp_payload_source, edge.logic()
 
 
-class UDPFrameSink():
+class UDPFrameSink(axis_ep.SinkMixin, axis_ep.PayloadStatsMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
         self.payload_sink = axis_ep.AXIStreamSink()
         self.header_queue = []
 
@@ -502,12 +618,14 @@ class UDPFrameSink():
                 udp_payload_tlast=Signal(bool(True)),
                 udp_payload_tuser=Signal(bool(False)),
                 pause=0,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         udp_hdr_ready_int = Signal(bool(False))
         udp_hdr_valid_int = Signal(bool(False))
@@ -522,7 +640,8 @@ class UDPFrameSink():
             tready=udp_payload_tready,
             tlast=udp_payload_tlast,
             tuser=udp_payload_tuser,
-            pause=udp_payload_pause
+            pause=udp_payload_pause,
+            stats=stats
         )
 
         @always_comb
@@ -533,8 +652,14 @@ class UDPFrameSink():
 
         @instance
         def logic():
+            idle = False
+
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing pending; wait for a header, a payload or reset
+                    yield suspend.wait(clk, rst, udp_hdr_valid_int.posedge, self.payload_sink.sync)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     udp_hdr_ready_int.next = False
@@ -569,7 +694,12 @@ class UDPFrameSink():
                     if not self.payload_sink.empty() and len(self.header_queue) > 0:
                         frame = self.header_queue.pop(0)
                         frame.payload = self.payload_sink.recv()
-                        self.queue.append(frame)
+                        if self.consumer is None:
+                            self.queue.append(frame)
+                        else:
+                            self.consumer(frame)
+                            self.history.append(frame)
+                        self.sync.next = not self.sync
 
                         if name is not None:
                             print("[%s] Got frame %s" % (name, repr(frame)))
@@ -578,5 +708,8 @@ class UDPFrameSink():
                         if len(self.header_queue) == 0:
                             assert self.payload_sink.empty()
 
+                idle = (suspend.enabled and not rst and udp_hdr_ready_int and not udp_hdr_valid_int and
+                        (len(self.header_queue) == 0 or self.payload_sink.empty()))
+
         return logic, pause_logic, udp_payload_sink
 
@@ -0,0 +1 @@
+../lib/axis/tb/verilator.py
\ No newline at end of file
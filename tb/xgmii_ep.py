@@ -23,17 +23,37 @@ THE SOFTWARE.
 """
 
 from myhdl import *
+import suspend
+import axis_ep
+from collections import deque
+
+STATS_KEYS = ('words', 'frames', 'errors', 'ordered_sets', 'local_faults', 'remote_faults', 'lane_faults')
+
+def match_lanes(d, ch, bw=8):
+    # bit mask of the lanes of word d that hold character ch
+    lo = 0x7f7f7f7f7f7f7f7f if bw == 8 else 0x7f7f7f7f
+    x = d ^ (ch * (0x0101010101010101 if bw == 8 else 0x01010101))
+    # top bit set in each byte of x that is zero
+    z = ~(((x & lo) + lo) | x | lo) & (0x8080808080808080 if bw == 8 else 0x80808080)
+    # gather the top bit of each byte into one bit per lane
+    if bw == 8:
+        return (((z >> 7) * 0x0102040810204080) >> 56) & 0xff
+    return (((z >> 7) * 0x01020408) >> 24) & 0xf
 
 class XGMIIFrame(object):
     def __init__(self, data=b'', error=None, ctrl=None):
         self.data = b''
         self.error = None
         self.ctrl = None
+        self.first_beat_time = None
+        self.last_beat_time = None
 
         if type(data) is XGMIIFrame:
             self.data = data.data
             self.error = data.error
             self.ctrl = data.ctrl
+            self.first_beat_time = data.first_beat_time
+            self.last_beat_time = data.last_beat_time
         else:
             self.data = bytearray(data)
 
@@ -71,13 +91,111 @@ class XGMIIFrame(object):
                 f[i] = 0xfe
                 ctrl[i] = 1
 
-        i = 0
-        while len(f) > 0:
-            d.append(f.pop(0))
-            c.append(ctrl[i])
-            i += 1
+        return f, ctrl
+
+    def build_words(self, bw=8, ifg_cnt=0, deficit_idle_cnt=0, ifg=12, enable_dic=True, preamble=False):
+        # compile the frame into (txd, txc) words for a bw lane interface,
+        # starting from the given IFG and deficit idle state.  Returns the
+        # words, the number of words up to and including the terminate,
+        # and the IFG and deficit idle state left for the next frame.
+        d, c = self.build()
+        idle_d = 0x0707070707070707 if bw == 8 else 0x07070707
+        idle_c = 0xff if bw == 8 else 0xf
 
-        return d, c
+        if preamble:
+            d = [0x55]*7 + [0xd5] + d
+            c = [0]*8 + c
+
+        if not enable_dic:
+            deficit_idle_cnt = 0
+        elif ifg_cnt >= 4:
+            deficit_idle_cnt = ifg_cnt - 4
+        else:
+            deficit_idle_cnt = ifg_cnt
+            ifg_cnt = 0
+
+        assert len(d) > 0
+        assert d[0] == 0x55
+
+        db = bytes(bytearray(d))
+        n = len(d)
+        p = 1
+        nt = False
+        words = []
+
+        # start character in lane 0, or lane 4 when idles are still owed
+        k = 1
+        wd = 0xfb
+        wc = 1
+
+        if ifg_cnt > 0:
+            k = 5
+            wd = 0xfb07070707
+            wc = 0x1f
+
+        for i in range(k, bw):
+            if p < n:
+                wd |= d[p] << (8*i)
+                wc |= c[p] << i
+                p += 1
+                nt = True
+            else:
+                if nt:
+                    wd |= 0xfd << (8*i)
+                    nt = False
+                else:
+                    wd |= 0x07 << (8*i)
+                wc |= 1 << i
+
+        words.append((wd, wc))
+
+        # full data words
+        while n - p >= bw:
+            wd = int.from_bytes(db[p:p+bw], 'little')
+            wc = 0
+            for i in range(bw):
+                wc |= c[p+i] << i
+            words.append((wd, wc))
+            p += bw
+            nt = True
+
+        # remaining data and terminate
+        if p < n or nt:
+            wd = 0
+            wc = 0
+
+            for i in range(bw):
+                if p < n:
+                    wd |= d[p] << (8*i)
+                    wc |= c[p] << i
+                    p += 1
+                    nt = True
+                else:
+                    if nt:
+                        wd |= 0xfd << (8*i)
+                        nt = False
+                        ifg_cnt = max(ifg - (bw-i) + deficit_idle_cnt, 0)
+                    else:
+                        wd |= 0x07 << (8*i)
+                    wc |= 1 << i
+
+            words.append((wd, wc))
+
+        nf = len(words)
+
+        if enable_dic:
+            while ifg_cnt > bw-1:
+                ifg_cnt -= bw
+                words.append((idle_d, idle_c))
+        else:
+            # no deficit allowed, so round the gap up to the next start
+            # position in lane 0 or lane 4
+            while ifg_cnt > (4 if bw == 8 else 0):
+                ifg_cnt -= bw
+                words.append((idle_d, idle_c))
+            ifg_cnt = max(ifg_cnt, 0)
+
+        return words, nf, ifg_cnt, deficit_idle_cnt
 
     def parse(self, d, c):
         if d is None or c is None:
@@ -88,9 +206,10 @@ class XGMIIFrame(object):
 
         self.error = [0]*len(self.data)
 
-        for i in range(len(self.data)):
-            if c[i] and d[i] == 0xfe:
-                self.error[i] = 1
+        if any(c):
+            for i in range(len(self.data)):
+                if c[i] and d[i] == 0xfe:
+                    self.error[i] = 1
 
     def __eq__(self, other):
         if type(other) is XGMIIFrame:
@@ -107,9 +226,12 @@ class XGMIISource(object):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.wake = Signal(bool(0))
+        self.sent_hooks = []
 
     def send(self, frame):
         self.queue.append(XGMIIFrame(frame))
+        self.wake.next = not self.wake
 
     def count(self):
         return len(self.queue)
@@ -122,116 +244,99 @@ class XGMIISource(object):
                 rst,
                 txd,
                 txc,
+                ifg=12,
+                enable_dic=True,
+                insert_preamble=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        edge = suspend.EdgeRecorder(clk)
 
         assert len(txd) in [32, 64]
 
         bw = int(len(txd)/8)
 
+        # minimum IFG in bytes, deficit idle count, and whether send() data
+        # starts at the destination MAC instead of the preamble
+        self.bw = bw
+        self.ifg = ifg
+        self.enable_dic = enable_dic
+        self.insert_preamble = insert_preamble
+
         @instance
         def logic():
             frame = None
-            dl = []
-            cl = []
+            words = []
+            ptr = 0
+            nf = 0
             ifg_cnt = 0
             deficit_idle_cnt = 0
-            nt = False
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # nothing queued or in flight; wait for send() or reset
+                    yield suspend.wait(clk, rst, self.wake, edge=edge)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame = None
                     txd.next = 0x0707070707070707 if bw == 8 else 0x07070707
                     txc.next = 0xff if bw == 8 else 0xf
-                    dl = []
-                    cl = []
+                    words = []
+                    ptr = 0
+                    nf = 0
                     ifg_cnt = 0
                     deficit_idle_cnt = 0
-                    nt = False
                 else:
-                    if ifg_cnt > bw-1:
-                        ifg_cnt -= bw
-                        txd.next = 0x0707070707070707 if bw == 8 else 0x07070707
-                        txc.next = 0xff if bw == 8 else 0xf
-                    elif len(dl) > 0 or nt:
-                        d = 0
-                        c = 0
-
-                        for i in range(bw):
-                            if len(dl) > 0:
-                                d |= dl.pop(0) << (8*i)
-                                c |= cl.pop(0) << i
-                                nt = True
-                            else:
-                                if nt:
-                                    d |= 0xfd << (8*i)
-                                    nt = False
-                                    ifg_cnt = 12 - (bw-i) + deficit_idle_cnt
-                                else:
-                                    d |= 0x07 << (8*i)
-                                c |= 1 << i
-
-                        txd.next = d
-                        txc.next = c
+                    if frame is not None:
+                        # the word driven at the previous edge is sampled now
+                        if ptr == 1:
+                            frame.first_beat_time = now()
+                        if ptr == nf:
+                            frame.last_beat_time = now()
+                            for hook in self.sent_hooks:
+                                hook(frame)
+                            frame = None
+
+                    if ptr < len(words):
+                        txd.next, txc.next = words[ptr]
+                        ptr += 1
                     elif len(self.queue) > 0:
                         frame = self.queue.pop(0)
-                        dl, cl = frame.build()
+                        frame.first_beat_time = None
+                        words, nf, ifg_cnt, deficit_idle_cnt = frame.build_words(bw, ifg_cnt, deficit_idle_cnt, ifg, enable_dic, insert_preamble)
                         if name is not None:
                             print("[%s] Sending frame %s" % (name, repr(frame)))
 
-                        if ifg_cnt >= 4:
-                            deficit_idle_cnt = ifg_cnt - 4
-                        else:
-                            deficit_idle_cnt = ifg_cnt
-                            ifg_cnt = 0
-
-                        assert len(dl) > 0
-                        assert dl.pop(0) == 0x55
-                        cl.pop(0)
-
-                        k = 1
-                        d = 0xfb
-                        c = 1
-
-                        if ifg_cnt > 0:
-                            k = 5
-                            d = 0xfb07070707
-                            c = 0x1f
-
-                        for i in range(k,bw):
-                            if len(dl) > 0:
-                                d |= dl.pop(0) << (8*i)
-                                c |= cl.pop(0) << i
-                                nt = True
-                            else:
-                                if nt:
-                                    d |= 0xfd << (8*i)
-                                    nt = False
-                                else:
-                                    d |= 0x07 << (8*i)
-                                c |= 1 << i
-
-                        txd.next = d
-                        txc.next = c
+                        txd.next, txc.next = words[0]
+                        ptr = 1
                     else:
                         ifg_cnt = 0
                         deficit_idle_cnt = 0
                         txd.next = 0x0707070707070707 if bw == 8 else 0x07070707
                         txc.next = 0xff if bw == 8 else 0xf
 
-        return logic
+                idle = (suspend.enabled and not rst and
+                        ifg_cnt == 0 and deficit_idle_cnt == 0 and ptr >= len(words) and
+                        frame is None and len(self.queue) == 0)
 
+        return logic, edge.logic()
 
-class XGMIISink(object):
+
+class XGMIISink(axis_ep.SinkMixin):
     def __init__(self):
         self.has_logic = False
         self.queue = []
+        self.sync = Signal(bool(0))
+        self.consumer = None
+        self.history = deque(maxlen=0)
+        self.recv_hooks = []
+        self.stats_count = [0]*len(STATS_KEYS)
 
     def recv(self):
         if len(self.queue) > 0:
@@ -244,68 +349,134 @@ class XGMIISink(object):
     def empty(self):
         return self.count() == 0
 
+    def get_stats(self):
+        # counts cover the words sampled since the last reset_stats();
+        # only collected when create_logic() is called with stats=True
+        return dict(zip(STATS_KEYS, self.stats_count))
+
+    def reset_stats(self):
+        self.stats_count = [0]*len(STATS_KEYS)
+
     def create_logic(self,
                 clk,
                 rst,
                 rxd,
                 rxc,
+                stats=False,
                 name=None
             ):
 
         assert not self.has_logic
 
         self.has_logic = True
+        self.clk = clk
 
         assert len(rxd) in [32, 64]
 
         bw = int(len(rxd)/8)
 
+        # per lane control flags for each value of rxc
+        ctrl_lanes = [bytes(bytearray((m >> i) & 1 for i in range(bw))) for m in range(2**bw)]
+        lane_mask = 2**bw-1
+        # lanes that can hold start and ordered set characters
+        col_mask = 0x11 if bw == 8 else 0x01
+
         @instance
         def logic():
             frame = None
-            d = []
-            c = []
+            d = bytearray(2048)
+            c = bytearray(2048)
+            p = 0
+            idle = False
 
             while True:
-                yield clk.posedge, rst.posedge
+                if idle:
+                    # no frame in progress; wait for the bus to change or reset
+                    yield suspend.wait(clk, rst, rxd, rxc)
+                else:
+                    yield clk.posedge, rst.posedge
 
                 if rst:
                     frame = None
-                    d = []
-                    c = []
+                    p = 0
                 else:
+                    wd = int(rxd)
+                    wc = int(rxc)
+
+                    if stats:
+                        self.stats_count[0] += 1
+                        if wc:
+                            cnt = self.stats_count
+                            cnt[2] += bin(match_lanes(wd, 0xfe, bw) & wc).count('1')
+                            os = (match_lanes(wd, 0x9c, bw) | match_lanes(wd, 0x5c, bw)) & wc
+                            cnt[6] += bin((os | match_lanes(wd, 0xfb, bw) & wc) & ~col_mask & lane_mask).count('1')
+                            os &= col_mask
+                            while os:
+                                i = (os & -os).bit_length()-1
+                                os &= os-1
+                                cnt[3] += 1
+                                if (wd >> (8*i)) & 0xff == 0x9c:
+                                    seq = (wd >> (8*i+8)) & 0xffffff
+                                    if seq == 0x010000:
+                                        cnt[4] += 1
+                                    elif seq == 0x020000:
+                                        cnt[5] += 1
+
                     if frame is None:
-                        if rxc & 1 and rxd & 0xff == 0xfb:
+                        if wc & 1 and wd & 0xff == 0xfb:
                             # start in lane 0
                             frame = XGMIIFrame()
-                            d = [0x55]
-                            c = [0]
-                            for i in range(1,bw):
-                                d.append((int(rxd) >> (8*i)) & 0xff)
-                                c.append((int(rxc) >> i) & 1)
-                        elif bw == 8 and (rxc >> 4) & 1 and (rxd >> 32) & 0xff == 0xfb:
+                            frame.first_beat_time = now()
+                            d[0:bw] = wd.to_bytes(bw, 'little')
+                            c[0:bw] = ctrl_lanes[wc]
+                            d[0] = 0x55
+                            c[0] = 0
+                            p = bw
+                        elif bw == 8 and wc & 0x10 and (wd >> 32) & 0xff == 0xfb:
                             # start in lane 4
                             frame = XGMIIFrame()
-                            d = [0x55]
-                            c = [0]
-                            for i in range(5,8):
-                                d.append((int(rxd) >> (8*i)) & 0xff)
-                                c.append((int(rxc) >> i) & 1)
+                            frame.first_beat_time = now()
+                            d[0:4] = (wd >> 32).to_bytes(4, 'little')
+                            c[0:4] = ctrl_lanes[wc >> 4][:4]
+                            d[0] = 0x55
+                            c[0] = 0
+                            p = 4
                     else:
-                        for i in range(bw):
-                            if (rxc >> i) & 1 and (rxd >> (8*i)) & 0xff == 0xfd:
-                                # terminate
-                                frame.parse(d, c)
+                        if p + bw > len(d):
+                            d.extend(bytearray(len(d)))
+                            c.extend(bytearray(len(c)))
+
+                        # terminate is the lowest control lane holding 0xfd
+                        t = match_lanes(wd, 0xfd, bw) & wc if wc else 0
+
+                        if t:
+                            i = (t & -t).bit_length()-1
+                            d[p:p+i] = wd.to_bytes(bw, 'little')[:i]
+                            c[p:p+i] = ctrl_lanes[wc][:i]
+                            p += i
+
+                            frame.last_beat_time = now()
+                            frame.parse(d[:p], list(c[:p]))
+                            for hook in self.recv_hooks:
+                                hook(frame)
+                            if self.consumer is None:
                                 self.queue.append(frame)
-                                if name is not None:
-                                    print("[%s] Got frame %s" % (name, repr(frame)))
-                                frame = None
-                                d = []
-                                c = []
-                                break
                             else:
-                                d.append((int(rxd) >> (8*i)) & 0xff)
-                                c.append((int(rxc) >> i) & 1)
+                                self.consumer(frame)
+                                self.history.append(frame)
+                            self.sync.next = not self.sync
+                            if stats:
+                                self.stats_count[1] += 1
+                            if name is not None:
+                                print("[%s] Got frame %s" % (name, repr(frame)))
+                            frame = None
+                            p = 0
+                        else:
+                            d[p:p+bw] = wd.to_bytes(bw, 'little')
+                            c[p:p+bw] = ctrl_lanes[wc]
+                            p += bw
+
+                idle = suspend.enabled and not stats and not rst and frame is None
 
         return logic
 